@@ -7,9 +7,12 @@ import tempfile
 import aiofiles
 
 import posixpath
+from contextlib import asynccontextmanager
 from unittest import TestCase
 from io import BytesIO
 
+import aiohttp.web
+
 import yadisk_async
 import yadisk_async.settings
 from yadisk_async.common import is_operation_link, ensure_path_has_schema
@@ -28,6 +31,23 @@ def async_test(f):
 
     return wrapper
 
+@asynccontextmanager
+async def local_upload_server(handler):
+    # Serves PUT requests with the handler on a random local port, yields the upload URL
+    app = aiohttp.web.Application()
+    app.router.add_put("/upload", handler)
+
+    runner = aiohttp.web.AppRunner(app)
+    await runner.setup()
+
+    try:
+        site = aiohttp.web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+
+        yield "http://127.0.0.1:%d/upload" % (runner.addresses[0][1],)
+    finally:
+        await runner.cleanup()
+
 class YaDiskTestCase(TestCase):
     def __init__(self, *args, **kwargs):
         self.yadisk = None
@@ -216,11 +236,473 @@ class YaDiskTestCase(TestCase):
             self.assertEqual(content, await destination.read())
             await self.yadisk.remove(path2, permanently=True)
 
+    @async_test
+    async def test_upload_from_path(self):
+        content = b"0" * 1024 ** 2
+        path = posixpath.join(self.path, "zeroes.txt")
+
+        with tempfile.TemporaryDirectory() as local_dir:
+            local_path = os.path.join(local_dir, "zeroes.txt")
+
+            with open(local_path, "wb") as f:
+                f.write(content)
+
+            await self.yadisk.upload(local_path, path, overwrite=True, n_retries=50)
+
+        buf = BytesIO()
+        await self.yadisk.download(path, buf, n_retries=50)
+        await self.yadisk.remove(path, permanently=True)
+
+        self.assertEqual(buf.getvalue(), content)
+
+    @async_test
+    async def test_upload_spool(self):
+        content = b"0" * 1024 ** 2
+        path = posixpath.join(self.path, "zeroes.txt")
+
+        async def generator():
+            for i in range(0, len(content), 64 * 1024):
+                yield content[i:i + 64 * 1024]
+
+        await self.yadisk.upload(generator, path, overwrite=True, n_retries=50,
+                                 spool=True, spool_max_memory=256 * 1024)
+
+        buf = BytesIO()
+        await self.yadisk.download(path, buf, n_retries=50)
+        await self.yadisk.remove(path, permanently=True)
+
+        self.assertEqual(buf.getvalue(), content)
+
+    @async_test
+    async def test_upload_spool_connection_dropped(self):
+        content = os.urandom(100 * 1024)
+        received = []
+
+        async def handler(request):
+            if not received:
+                # Drop the connection in the middle of the body
+                received.append(await request.content.read(100))
+                request.transport.close()
+            else:
+                received.append(await request.read())
+
+            return aiohttp.web.Response(status=201)
+
+        async def generator():
+            for i in range(0, len(content), 1024):
+                await asyncio.sleep(0.001)
+                yield content[i:i + 1024]
+
+        async with local_upload_server(handler) as url:
+            await self.yadisk.upload_by_link(generator, url, spool=True, n_retries=2, retry_interval=0.0)
+
+        self.assertEqual(len(received), 2)
+        self.assertEqual(received[-1], content)
+
+    @async_test
+    async def test_upload_bytes(self):
+        content = b"0" * 1024 ** 2
+        path = posixpath.join(self.path, "zeroes.txt")
+
+        await self.yadisk.upload_bytes(content, path, overwrite=True, n_retries=50)
+
+        buf = BytesIO()
+        await self.yadisk.download(path, buf, n_retries=50)
+        await self.yadisk.remove(path, permanently=True)
+
+        self.assertEqual(buf.getvalue(), content)
+
+    @async_test
+    async def test_upload_and_download_keep_alive(self):
+        content = b"0" * 1024
+        path = posixpath.join(self.path, "zeroes.txt")
+
+        self.yadisk.connection_stats.reset()
+
+        await self.yadisk.upload_bytes(content, path, overwrite=True, keep_alive=True, n_retries=50)
+
+        buf = BytesIO()
+        await self.yadisk.download(path, buf, keep_alive=True, n_retries=50)
+        await self.yadisk.remove(path, permanently=True)
+
+        self.assertEqual(buf.getvalue(), content)
+        self.assertGreaterEqual(self.yadisk.connection_stats.connections, 2)
+
+    @async_test
+    async def test_upload_and_download_stall_detection(self):
+        content = b"0" * 1024 ** 2
+        path = posixpath.join(self.path, "zeroes.txt")
+
+        await self.yadisk.upload_bytes(content, path, overwrite=True, n_retries=50,
+                                       stall_min_rate=1024, stall_window=10.0)
+
+        buf = BytesIO()
+        await self.yadisk.download(path, buf, n_retries=50, stall_min_rate=1024, stall_window=10.0)
+        await self.yadisk.remove(path, permanently=True)
+
+        self.assertEqual(buf.getvalue(), content)
+
+    @async_test
+    async def test_upload_stall_detection_slow_response(self):
+        content = b"0" * 64 * 1024
+
+        async def handler(request):
+            await request.read()
+            # Processing the uploaded data is not a stall
+            await asyncio.sleep(3.0)
+
+            return aiohttp.web.Response(status=201)
+
+        async def generator():
+            for i in range(0, len(content), 1024):
+                yield content[i:i + 1024]
+
+        async with local_upload_server(handler) as url:
+            await self.yadisk.upload_by_link(generator, url, n_retries=0,
+                                             stall_min_rate=1000, stall_window=1.0)
+
+            # Empty uploads don't send any chunks at all
+            await self.yadisk.upload_by_link(bytearray(), url, n_retries=0,
+                                             stall_min_rate=1000, stall_window=1.0)
+
+    @async_test
+    async def test_download_bandwidth_limiter(self):
+        content = b"0" * 256 * 1024
+        path = posixpath.join(self.path, "zeroes.txt")
+
+        await self.yadisk.upload_bytes(content, path, overwrite=True, n_retries=50)
+
+        limiter = yadisk_async.transfers.BandwidthLimiter(128 * 1024)
+        buf = BytesIO()
+
+        start = loop.time()
+        await self.yadisk.download(path, buf, bandwidth_limiter=limiter, n_retries=50)
+        duration = loop.time() - start
+
+        await self.yadisk.remove(path, permanently=True)
+
+        self.assertEqual(buf.getvalue(), content)
+        self.assertGreaterEqual(duration, 1.5)
+
+    @async_test
+    async def test_upload_and_download_progress(self):
+        content = b"0" * 1024 ** 2
+        path = posixpath.join(self.path, "zeroes.txt")
+
+        upload_reports = []
+        download_reports = []
+
+        await self.yadisk.upload_bytes(content, path, overwrite=True, n_retries=50,
+                                       progress=upload_reports.append, progress_interval=0.0)
+
+        await self.yadisk.download(path, BytesIO(), n_retries=50,
+                                   progress=download_reports.append, progress_interval=0.0)
+        await self.yadisk.remove(path, permanently=True)
+
+        for reports in (upload_reports, download_reports):
+            self.assertTrue(reports[-1].done)
+            self.assertEqual(reports[-1].bytes_transferred, len(content))
+            self.assertEqual(reports[-1].total, len(content))
+
+    @async_test
+    async def test_upload_progress_from_generator(self):
+        content = b"0" * 64 * 1024
+        received = []
+        reports = []
+
+        async def handler(request):
+            received.append(await request.read())
+
+            return aiohttp.web.Response(status=201)
+
+        async def generator():
+            for i in range(0, len(content), 1024):
+                yield content[i:i + 1024]
+
+        async with local_upload_server(handler) as url:
+            await self.yadisk.upload_by_link(generator, url, n_retries=0,
+                                             progress=reports.append, progress_interval=0.0)
+
+        self.assertEqual(received, [content])
+        self.assertTrue(reports[-1].done)
+        self.assertEqual(reports[-1].bytes_transferred, len(content))
+
+    @async_test
+    async def test_upload_and_download_stats(self):
+        content = b"0" * 1024 ** 2
+        path = posixpath.join(self.path, "zeroes.txt")
+
+        upload_stats = yadisk_async.transfers.TransferStats()
+        download_stats = yadisk_async.transfers.TransferStats()
+
+        await self.yadisk.upload_bytes(content, path, overwrite=True, n_retries=50, stats=upload_stats)
+        await self.yadisk.download(path, BytesIO(), n_retries=50, stats=download_stats)
+        await self.yadisk.remove(path, permanently=True)
+
+        for stats in (upload_stats, download_stats):
+            self.assertEqual(stats.bytes_transferred, len(content))
+            self.assertIsNotNone(stats.host)
+            self.assertIsNotNone(stats.link_latency)
+            self.assertIsNotNone(stats.time_to_first_byte)
+            self.assertGreaterEqual(stats.duration, stats.link_latency)
+
+    @async_test
+    async def test_upload_and_download_if_changed(self):
+        content = b"0" * 1024
+        path = posixpath.join(self.path, "zeroes.txt")
+
+        with tempfile.TemporaryDirectory() as local_dir:
+            local_path = os.path.join(local_dir, "zeroes.txt")
+
+            with open(local_path, "wb") as f:
+                f.write(content)
+
+            await self.yadisk.upload(local_path, path, overwrite=True, if_changed=True, n_retries=50)
+            modified = (await self.yadisk.get_meta(path)).modified
+
+            await self.yadisk.upload(local_path, path, overwrite=True, if_changed=True, n_retries=50)
+            self.assertEqual((await self.yadisk.get_meta(path)).modified, modified)
+
+            mtime = os.stat(local_path).st_mtime_ns
+            await self.yadisk.download(path, local_path, if_changed=True, n_retries=50)
+            self.assertEqual(os.stat(local_path).st_mtime_ns, mtime)
+
+        await self.yadisk.remove(path, permanently=True)
+
+    @async_test
+    async def test_download_stream(self):
+        content = b"0" * 1024 ** 2
+        path = posixpath.join(self.path, "zeroes.txt")
+
+        await self.yadisk.upload(BytesIO(content), path, overwrite=True, n_retries=50)
+
+        chunks = [chunk async for chunk in self.yadisk.download_stream(path, chunk_size=1024, n_retries=50)]
+
+        await self.yadisk.remove(path, permanently=True)
+
+        self.assertTrue(all(len(chunk) <= 1024 for chunk in chunks))
+        self.assertEqual(b"".join(chunks), content)
+
+    @async_test
+    async def test_upload_and_download_verify_checksum(self):
+        content = b"0" * 1024 ** 2
+        path = posixpath.join(self.path, "zeroes.txt")
+
+        await self.yadisk.upload(BytesIO(content), path, overwrite=True,
+                                 verify_checksum=True, n_retries=50)
+
+        buf = BytesIO()
+        await self.yadisk.download(path, buf, verify_checksum=True, n_retries=50)
+
+        with self.assertRaises(yadisk_async.exceptions.ChecksumMismatchError):
+            await self.yadisk.download(path, BytesIO(), verify_checksum=True,
+                                       md5="0" * 32, n_retries=0)
+
+        await self.yadisk.remove(path, permanently=True)
+
+        self.assertEqual(buf.getvalue(), content)
+
+    @async_test
+    async def test_download_many(self):
+        paths = [posixpath.join(self.path, "file%d.txt" % (i,)) for i in range(3)]
+
+        await asyncio.gather(*(self.yadisk.upload(BytesIO(b"%d" % (i,) * 1000), path, n_retries=50)
+                               for i, path in enumerate(paths)))
+
+        buffers = [BytesIO() for _ in paths]
+        jobs = list(zip(paths, buffers)) + [(posixpath.join(self.path, "nonexistent.txt"), BytesIO())]
+
+        results = await self.yadisk.download_many(jobs, max_concurrency=2, n_retries=50)
+
+        await asyncio.gather(*(self.yadisk.remove(path, permanently=True) for path in paths))
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(sum(not result.success for result in results), 1)
+
+        for i, buf in enumerate(buffers):
+            self.assertEqual(buf.getvalue(), b"%d" % (i,) * 1000)
+
+    @async_test
+    async def test_download_dir(self):
+        remote_dir = posixpath.join(self.path, "dir")
+        remote_subdir = posixpath.join(remote_dir, "subdir")
+
+        await self.yadisk.mkdir(remote_dir)
+        await self.yadisk.mkdir(remote_subdir)
+        await self.yadisk.upload(BytesIO(b"1" * 1000), posixpath.join(remote_dir, "1.txt"), n_retries=50)
+        await self.yadisk.upload(BytesIO(b"2" * 1000), posixpath.join(remote_subdir, "2.txt"), n_retries=50)
+
+        with tempfile.TemporaryDirectory() as local_dir:
+            results = await self.yadisk.download_dir(remote_dir, local_dir, n_retries=50)
+            second_results = await self.yadisk.download_dir(remote_dir, local_dir, n_retries=50)
+
+            with open(os.path.join(local_dir, "1.txt"), "rb") as f:
+                content1 = f.read()
+
+            with open(os.path.join(local_dir, "subdir", "2.txt"), "rb") as f:
+                content2 = f.read()
+
+        await self.yadisk.remove(remote_dir, permanently=True)
+
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(len(results), 2)
+        self.assertEqual(len(second_results), 0)
+        self.assertEqual(content1, b"1" * 1000)
+        self.assertEqual(content2, b"2" * 1000)
+
+    @async_test
+    async def test_upload_many(self):
+        remote_dir = posixpath.join(self.path, "dir")
+        jobs = [(BytesIO(b"%d" % (i,) * 1000), posixpath.join(remote_dir, "subdir", "file%d.txt" % (i,)))
+                for i in range(3)]
+
+        results = await self.yadisk.upload_many(jobs, max_concurrency=2, n_retries=50)
+
+        names = sorted([i.name async for i in await self.yadisk.listdir(posixpath.join(remote_dir, "subdir"))])
+
+        await self.yadisk.remove(remote_dir, permanently=True)
+
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(names, ["file0.txt", "file1.txt", "file2.txt"])
+
+    @async_test
+    async def test_upload_dir(self):
+        remote_dir = posixpath.join(self.path, "dir")
+
+        with tempfile.TemporaryDirectory() as local_dir:
+            os.makedirs(os.path.join(local_dir, "subdir", "empty"))
+
+            with open(os.path.join(local_dir, "1.txt"), "wb") as f:
+                f.write(b"1" * 1000)
+
+            with open(os.path.join(local_dir, "subdir", "2.txt"), "wb") as f:
+                f.write(b"2" * 1000)
+
+            results = await self.yadisk.upload_dir(local_dir, remote_dir, n_retries=50)
+            second_results = await self.yadisk.upload_dir(local_dir, remote_dir, n_retries=50)
+
+            with open(os.path.join(local_dir, "subdir", "3.txt"), "wb") as f:
+                f.write(b"3" * 1000)
+
+            # Bytes paths are accepted as well
+            bytes_results = await self.yadisk.upload_dir(os.fsencode(local_dir), remote_dir, n_retries=50)
+
+        empty_dir_exists = await self.yadisk.is_dir(posixpath.join(remote_dir, "subdir", "empty"))
+        file_exists = await self.yadisk.is_file(posixpath.join(remote_dir, "subdir", "2.txt"))
+        bytes_file_exists = await self.yadisk.is_file(posixpath.join(remote_dir, "subdir", "3.txt"))
+
+        await self.yadisk.remove(remote_dir, permanently=True)
+
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(len(results), 2)
+        self.assertEqual(len(second_results), 0)
+        self.assertEqual(len(bytes_results), 1)
+        self.assertTrue(bytes_results[0].success)
+        self.assertTrue(empty_dir_exists)
+        self.assertTrue(file_exists)
+        self.assertTrue(bytes_file_exists)
+
     @async_test
     async def test_check_token(self):
         self.assertTrue(await self.yadisk.check_token())
         self.assertFalse(await self.yadisk.check_token("asdasdasd"))
 
+    @async_test
+    async def test_check_token_cache(self):
+        token_cache = yadisk_async.tokens.TokenValidityCache()
+        self.yadisk.token_cache = token_cache
+
+        try:
+            results = await asyncio.gather(self.yadisk.check_token(), self.yadisk.check_token(),
+                                           self.yadisk.check_token("asdasdasd"))
+            self.assertEqual(results, [True, True, False])
+            self.assertTrue(token_cache.get(self.yadisk.token))
+            self.assertFalse(token_cache.get("asdasdasd"))
+
+            token_cache.invalidate()
+            self.assertEqual(len(token_cache), 0)
+        finally:
+            self.yadisk.token_cache = None
+
+    @async_test
+    async def test_token_manager(self):
+        token = self.yadisk.token
+        token_manager = yadisk_async.tokens.TokenManager(self.yadisk, "invalid_refresh_token")
+        self.yadisk.token_manager = token_manager
+
+        try:
+            # Valid token doesn't need to be refreshed
+            await self.yadisk.get_disk_info()
+            self.assertEqual(token_manager.n_refreshes, 0)
+
+            # Rejected token can't be refreshed with an invalid refresh token
+            self.yadisk.token = "asdasdasd"
+
+            with self.assertRaises(yadisk_async.exceptions.UnauthorizedError):
+                await self.yadisk.get_disk_info()
+
+            self.assertEqual(token_manager.n_refreshes, 0)
+        finally:
+            self.yadisk.token = token
+            self.yadisk.token_manager = None
+            await token_manager.close()
+
+    @async_test
+    async def test_token_manager_failed_background_refresh(self):
+        refresh_token = self.yadisk.refresh_token
+        n_refresh_calls = 0
+
+        async def counting_refresh_token(*args, **kwargs):
+            nonlocal n_refresh_calls
+            n_refresh_calls += 1
+
+            return await refresh_token(*args, **kwargs)
+
+        self.yadisk.refresh_token = counting_refresh_token
+
+        # The refresh is due right away and fails
+        token_manager = yadisk_async.tokens.TokenManager(self.yadisk, "invalid_refresh_token", expires_in=0)
+        self.yadisk.token_manager = token_manager
+
+        try:
+            await self.yadisk.get_disk_info()
+
+            for _ in range(100):
+                if token_manager.expires_at is None:
+                    break
+
+                await asyncio.sleep(0.1)
+
+            self.assertIsNone(token_manager.expires_at)
+
+            # The background refresh is not attempted again on every request
+            for _ in range(3):
+                await self.yadisk.get_disk_info()
+
+            self.assertEqual(n_refresh_calls, 1)
+        finally:
+            del self.yadisk.refresh_token
+            self.yadisk.token_manager = None
+            await token_manager.close()
+
+    @async_test
+    async def test_token_pool(self):
+        token_pool = yadisk_async.tokens.TokenPool([self.yadisk.token, "asdasdasd"])
+        self.yadisk.token_pool = token_pool
+
+        try:
+            # The invalid token gets selected every other time
+            results = await asyncio.gather(*[self.yadisk.check_token() for _ in range(4)],
+                                           return_exceptions=True)
+            self.assertIn(True, results)
+            self.assertIn(False, results)
+
+            stats = token_pool.stats(self.yadisk.token)
+            self.assertEqual(stats.in_flight, 0)
+            self.assertGreater(stats.n_requests, 0)
+        finally:
+            self.yadisk.token_pool = None
+
     @async_test
     async def test_permanent_remove(self):
         path = posixpath.join(self.path, "dir")
@@ -313,6 +795,215 @@ class YaDiskTestCase(TestCase):
         except yadisk_async.exceptions.PathNotFoundError:
             pass
 
+    @async_test
+    async def test_wait_for_operation(self):
+        src_path = posixpath.join(self.path, "dir_to_copy")
+        dst_path = posixpath.join(self.path, "dir_copy")
+
+        await self.yadisk.mkdir(src_path)
+
+        result = await self.yadisk.copy(src_path, dst_path, force_async=True, n_retries=50)
+
+        if isinstance(result, yadisk_async.objects.OperationLinkObject):
+            self.assertEqual(await result.wait(deadline=60.0), "success")
+
+        self.assertTrue(await self.yadisk.exists(dst_path))
+
+        await self.yadisk.remove(src_path, permanently=True)
+        await self.yadisk.remove(dst_path, permanently=True)
+
+    @async_test
+    async def test_operation_tracker(self):
+        names = ["dir1", "dir2", "dir3"]
+        src_paths = [posixpath.join(self.path, name) for name in names]
+        dst_paths = [posixpath.join(self.path, name + "_copy") for name in names]
+
+        await asyncio.gather(*[self.yadisk.mkdir(path) for path in src_paths])
+
+        results = await asyncio.gather(*[self.yadisk.copy(src, dst, force_async=True, n_retries=50)
+                                         for src, dst in zip(src_paths, dst_paths)])
+
+        tracker = self.yadisk.operation_tracker
+        waiters = [tracker.wait(result.href, deadline=60.0) for result in results
+                   if isinstance(result, yadisk_async.objects.OperationLinkObject)]
+
+        self.assertTrue(all(status == "success" for status in await asyncio.gather(*waiters)))
+        self.assertEqual(tracker.pending, 0)
+
+        for path in src_paths + dst_paths:
+            self.assertTrue(await self.yadisk.exists(path))
+
+        await asyncio.gather(*[self.yadisk.remove(path, permanently=True) for path in src_paths + dst_paths])
+
+    @async_test
+    async def test_copy_move_remove_many(self):
+        names = ["dir1", "dir2", "dir3"]
+        src_paths = [posixpath.join(self.path, name) for name in names]
+        copy_paths = [posixpath.join(self.path, name + "_copy") for name in names]
+        move_paths = [posixpath.join(self.path, name + "_moved") for name in names]
+
+        await asyncio.gather(*[self.yadisk.mkdir(path) for path in src_paths])
+
+        results = await self.yadisk.copy_many(zip(src_paths, copy_paths), max_concurrency=2)
+        self.assertEqual([result.item for result in results], list(zip(src_paths, copy_paths)))
+        self.assertTrue(all(result.success for result in results))
+
+        results = await self.yadisk.move_many(dict(zip(copy_paths, move_paths)), force_async=True)
+        self.assertTrue(all(result.success for result in results))
+
+        for path in src_paths + move_paths:
+            self.assertTrue(await self.yadisk.exists(path))
+
+        results = await self.yadisk.remove_many(src_paths + [posixpath.join(self.path, "nonexistent")],
+                                                permanently=True)
+        self.assertTrue(all(result.success for result in results[:-1]))
+        self.assertIsInstance(results[-1].exception, yadisk_async.exceptions.PathNotFoundError)
+
+        await self.yadisk.remove_many(move_paths, permanently=True)
+
+    @async_test
+    async def test_copy_many_lost_response(self):
+        src_path = posixpath.join(self.path, "src")
+        new_path = posixpath.join(self.path, "new")
+        existing_path = posixpath.join(self.path, "existing")
+
+        await self.yadisk.mkdir(src_path)
+        await self.yadisk.mkdir(existing_path)
+
+        copy = self.yadisk.copy
+        failed = set()
+
+        async def copy_with_lost_response(src, dst, /, **kwargs):
+            if dst in failed:
+                return await copy(src, dst, **kwargs)
+
+            failed.add(dst)
+
+            # The copy is applied only if the destination is free, but the response is lost either way
+            try:
+                await copy(src, dst, **kwargs)
+            except yadisk_async.exceptions.PathExistsError:
+                pass
+
+            raise aiohttp.ServerDisconnectedError()
+
+        self.yadisk.copy = copy_with_lost_response
+
+        try:
+            results = await self.yadisk.copy_many([(src_path, new_path), (src_path, existing_path)],
+                                                  retry_interval=0.1)
+        finally:
+            del self.yadisk.copy
+
+        await self.yadisk.remove_many([src_path, new_path, existing_path], permanently=True)
+
+        # The copy that has been applied is a success, the existing destination is not
+        self.assertTrue(results[0].success)
+        self.assertEqual(results[0].retries, 1)
+        self.assertIsInstance(results[1].exception, yadisk_async.exceptions.PathExistsError)
+
+    def test_background_loop(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        y = yadisk_async.YaDisk(token=self.yadisk.token)
+
+        with yadisk_async.background.BackgroundLoop() as background_loop:
+            with ThreadPoolExecutor(4) as executor:
+                results = list(executor.map(lambda _: background_loop.run(y.check_token()), range(8)))
+
+            self.assertTrue(all(results))
+
+            # All the threads share one session
+            self.assertEqual(len(y._sessions), 1)
+
+            background_loop.run(y.close())
+
+    @async_test
+    async def test_process_transfer_executor(self):
+        from yadisk_async.processes import ProcessTransferExecutor, ProcessJob
+
+        dir_path = posixpath.join(self.path, "processes")
+        await self.yadisk.mkdir(dir_path)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            local_paths = [os.path.join(tmpdir, f"file{i}.txt") for i in range(4)]
+
+            for i, local_path in enumerate(local_paths):
+                with open(local_path, "w") as f:
+                    f.write(f"test{i}")
+
+            progress = []
+
+            async with ProcessTransferExecutor(self.yadisk, n_workers=2, max_concurrency=2,
+                                               max_requests_per_second=10,
+                                               progress=lambda job, p: progress.append(p)) as executor:
+                jobs = [ProcessJob("upload", local_path,
+                                   posixpath.join(dir_path, os.path.basename(local_path)))
+                        for local_path in local_paths]
+                results = await executor.run(jobs)
+                self.assertTrue(all(result.success for result in results))
+                self.assertTrue(progress)
+
+                results = await executor.run([ProcessJob("listdir", dir_path),
+                                              ProcessJob("listdir", posixpath.join(dir_path, "nonexistent"))])
+                results.sort(key=lambda result: result.job.src)
+
+                self.assertEqual(sorted(item["name"] for item in results[0].value),
+                                 [os.path.basename(path) for path in local_paths])
+                self.assertIsInstance(results[1].exception, yadisk_async.exceptions.PathNotFoundError)
+
+        await self.yadisk.remove(dir_path, permanently=True)
+
+    @async_test
+    async def test_batch(self):
+        paths = [posixpath.join(self.path, f"dir{i}") for i in range(3)]
+
+        results = await self.yadisk.batch((self.yadisk.mkdir(path) for path in paths), max_concurrency=2)
+        self.assertTrue(all(result.success for result in results))
+
+        results = await self.yadisk.batch([self.yadisk.get_meta(paths[0]),
+                                           self.yadisk.get_meta(posixpath.join(self.path, "nonexistent")),
+                                           self.yadisk.get_meta(paths[1])])
+        self.assertEqual([result.item for result in results], [0, 1, 2])
+        self.assertEqual(results[0].value.path, "disk:" + paths[0])
+        self.assertIsInstance(results[1].exception, yadisk_async.exceptions.PathNotFoundError)
+        self.assertTrue(results[2].success)
+
+        await self.yadisk.batch(self.yadisk.remove(path, permanently=True) for path in paths)
+
+    @async_test
+    async def test_pipeline(self):
+        from yadisk_async.pipeline import Pipeline, match
+
+        dir_path = posixpath.join(self.path, "pipeline")
+        await self.yadisk.mkdir(dir_path)
+        await self.yadisk.mkdir(posixpath.join(dir_path, "subdir"))
+
+        names = ["file0.txt", "file1.txt", "subdir/file2.txt"]
+
+        for i, name in enumerate(names):
+            await self.yadisk.upload(BytesIO(f"test{i}".encode("utf8")), posixpath.join(dir_path, name))
+
+        async def read(resource, chunks):
+            return resource.name, b"".join([chunk async for chunk in chunks])
+
+        results = [result async for result in Pipeline.walk(self.yadisk, dir_path, queue_size=1)
+                                                      .filter(match(media_type="text"))
+                                                      .filter(lambda resource: resource.name != "file1.txt")
+                                                      .stream(read, concurrency=2)]
+        self.assertEqual(sorted(results), [("file0.txt", b"test0"), ("file2.txt", b"test2")])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results = [result async for result in Pipeline.walk(self.yadisk, dir_path)
+                                                          .download(tmpdir, relative_to=dir_path)]
+            self.assertEqual(len(results), 3)
+
+            for i, name in enumerate(names):
+                with open(os.path.join(tmpdir, *name.split("/"))) as f:
+                    self.assertEqual(f.read(), f"test{i}")
+
+        await self.yadisk.remove(dir_path, permanently=True)
+
     @async_test
     async def test_is_operation_link(self):
         self.assertTrue(is_operation_link("https://cloud-api.yandex.net/v1/disk/operations/123asd"))
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from . import api, objects, exceptions, utils
+from . import api, objects, exceptions, utils, transfers, batch, operations, tokens, background, processes, pipeline
 from .yadisk import YaDisk
 
 import warnings
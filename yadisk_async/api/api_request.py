@@ -2,7 +2,7 @@
 
 import aiohttp
 
-from ..exceptions import InvalidResponseError
+from ..exceptions import InvalidResponseError, UnauthorizedError, TooManyRequestsError
 
 from ..utils import auto_retry, get_exception
 from ..common import CaseInsensitiveDict
@@ -97,24 +97,53 @@ class APIRequest:
         raise NotImplementedError
 
     async def _attempt(self) -> None:
-        headers = CaseInsensitiveDict(self.session.headers)
-        headers["Content-Type"] = self.content_type
-        headers.update(self.headers)
+        authorization = None
 
-        kwargs = dict(self.send_kwargs)
-        kwargs.update({"headers": headers,
-                       "data":    self.data,
-                       "params":  self.params})
+        while True:
+            headers = CaseInsensitiveDict(self.session.headers)
+            headers["Content-Type"] = self.content_type
+            headers.update(self.headers)
 
-        assert self.method is not None
-        assert self.url is not None
+            if authorization is not None:
+                headers["Authorization"] = authorization
 
-        self.response = await self.session.request(self.method, self.url, **kwargs)
+            kwargs = dict(self.send_kwargs)
+            kwargs.update({"headers": headers,
+                           "data":    self.data,
+                           "params":  self.params})
 
-        success = self.response.status in self.success_codes
+            assert self.method is not None
+            assert self.url is not None
 
-        if not success:
-            raise await get_exception(self.response)
+            self.response = await self.session.request(self.method, self.url, **kwargs)
+
+            success = self.response.status in self.success_codes
+
+            if success:
+                return
+
+            exc = await get_exception(self.response)
+
+            if isinstance(exc, UnauthorizedError) and authorization is None:
+                # Replay the request once if the token has been refreshed
+                on_unauthorized = getattr(self.session, "on_unauthorized", None)
+
+                if on_unauthorized is not None:
+                    authorization = await on_unauthorized(headers.get("Authorization"))
+
+                    if authorization is not None:
+                        continue
+            elif isinstance(exc, TooManyRequestsError):
+                # Switch to another token right away, if there is one
+                on_throttled = getattr(self.session, "on_throttled", None)
+                session = None if on_throttled is None else on_throttled()
+
+                if session is not None and session is not self.session:
+                    self.session = session
+                    authorization = None
+                    continue
+
+            raise exc
 
     async def send(self) -> aiohttp.ClientResponse:
         """
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import concurrent.futures
+import threading
+
+from typing import Any, Optional, TypeVar
+from .compat import Coroutine
+
+__all__ = ["BackgroundLoop"]
+
+T = TypeVar("T")
+
+class BackgroundLoop:
+    """
+        Runs an event loop in a daemon thread, for applications that use threads
+        rather than `asyncio` (e.g., WSGI servers with a thread pool).
+        Instead of running a new event loop in every thread, which would give
+        every thread its own sessions and connections, the threads submit
+        coroutines to this loop. Since all of them run in the same thread,
+        :any:`YaDisk.get_session` returns the same session for all of them,
+        so they share connections, :any:`YaDisk.operation_tracker`,
+        :any:`YaDisk.token_manager`, etc.
+
+        The thread is started on first use. Don't forget to close the :any:`YaDisk`
+        objects that were used in it before closing the loop:
+
+        .. code:: python
+
+            background_loop = yadisk_async.background.BackgroundLoop()
+            y = yadisk_async.YaDisk(token="<token>")
+
+            # Can be called from any thread
+            meta = background_loop.run(y.get_meta("/file.txt"))
+
+            # On application exit
+            background_loop.run(y.close())
+            background_loop.close()
+
+        :param name: `str`, name of the thread
+    """
+
+    def __init__(self, name: str = "yadisk-async-loop"):
+        self.name = name
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "BackgroundLoop":
+        self.start()
+
+        return self
+
+    def __exit__(self, *args, **kwargs) -> None:
+        self.close()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """:any:`asyncio.AbstractEventLoop`, the event loop, the thread is started if it isn't yet"""
+
+        self.start()
+
+        assert self._loop is not None
+
+        return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        """`bool`, `True` if the thread is running"""
+
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the thread, does nothing if it's already running."""
+
+        with self._lock:
+            if self.is_running:
+                return
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            thread = threading.Thread(target=self._run, args=(loop, ready), name=self.name, daemon=True)
+            thread.start()
+            ready.wait()
+
+            self._loop = loop
+            self._thread = thread
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """
+            Schedule the coroutine to be run in the loop.
+            Can be called from any thread.
+
+            :param coro: coroutine object
+
+            :returns: :any:`concurrent.futures.Future`, cancelling it cancels the coroutine
+        """
+
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+            Run the coroutine in the loop and wait for the result.
+            Can be called from any thread except the loop's own one.
+
+            :param coro: coroutine object
+            :param timeout: `float` or `None`, maximum number of seconds to wait,
+                            the coroutine is cancelled if it's exceeded
+
+            :raises RuntimeError: called from the loop's thread
+            :raises concurrent.futures.TimeoutError: the coroutine didn't finish in time
+
+            :returns: return value of the coroutine
+        """
+
+        if self._thread is not None and threading.get_ident() == self._thread.ident:
+            coro.close()
+
+            raise RuntimeError("BackgroundLoop.run() would block its own event loop, await the coroutine instead")
+
+        future = self.submit(coro)
+
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+            Stop the loop and wait for the thread to finish.
+            Coroutines that are still running are cancelled.
+
+            :param timeout: `float` or `None`, maximum number of seconds to wait for the thread
+        """
+
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+
+        if loop is None or thread is None:
+            return
+
+        loop.call_soon_threadsafe(loop.stop)
+
+        if threading.get_ident() != thread.ident:
+            thread.join(timeout)
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+
+        try:
+            loop.run_forever()
+
+            tasks = asyncio.all_tasks(loop)
+
+            for task in tasks:
+                task.cancel()
+
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
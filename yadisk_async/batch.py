@@ -0,0 +1,925 @@
+# -*- coding: utf-8 -*-
+
+from abc import ABC, abstractmethod
+import asyncio
+from functools import partial
+import itertools
+import os
+from pathlib import PurePosixPath
+import time
+
+import aiohttp
+
+from . import settings
+from .exceptions import (
+    YaDiskError, WrongResourceTypeError, ParentNotFoundError, DirectoryExistsError, RetriableYaDiskError,
+    PathExistsError, PathNotFoundError, UnavailableError)
+from .objects import ResourceObject, ResourceLinkObject, OperationLinkObject
+from .transfers import _is_same_file
+
+from typing import Any, Optional, Union, TYPE_CHECKING
+from .compat import AsyncGenerator, AsyncIterable, Iterable, List, Dict, Callable, Awaitable, TimeoutError
+
+if TYPE_CHECKING:
+    from .yadisk import YaDisk
+
+__all__ = ["TransferJob", "JobResult", "DownloadManager", "UploadManager", "OperationResult"]
+
+# Arguments that are accepted by API requests (as opposed to transfer-only options)
+_REQUEST_ARGS = ("timeout", "headers", "n_retries", "retry_interval")
+
+def _request_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in kwargs.items() if k in _REQUEST_ARGS}
+
+class TransferJob:
+    """
+        A single job for :any:`DownloadManager` or :any:`UploadManager`.
+
+        :param src: source of the transfer (for downloads it can also be a :any:`ResourceObject`
+                    with the `file` field)
+        :param dst: destination of the transfer
+        :param priority: `int`, jobs with lower values are started first
+        :param kwargs: extra arguments for the transfer, they override the manager's defaults
+
+        :ivar src: source of the transfer
+        :ivar dst: destination of the transfer
+        :ivar priority: `int`, jobs with lower values are started first
+        :ivar kwargs: `dict`, extra arguments for the transfer
+        :ivar cancelled: `bool`, tells whether the job has been cancelled
+    """
+
+    src: Any
+    dst: Any
+    priority: int
+    kwargs: Dict[str, Any]
+    cancelled: bool
+
+    def __init__(self, src: Any, dst: Any, /, priority: int = 0, **kwargs):
+        self.src = src
+        self.dst = dst
+        self.priority = priority
+        self.kwargs = kwargs
+        self.cancelled = False
+        self._task: Optional[asyncio.Task] = None
+
+    def cancel(self) -> None:
+        """
+            Cancel the job. If the job hasn't been started yet, it will be skipped,
+            otherwise the transfer will be interrupted.
+        """
+
+        self.cancelled = True
+
+        if self._task is not None:
+            self._task.cancel()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {self.src!r} -> {self.dst!r}>"
+
+class JobResult:
+    """
+        Outcome of a single job.
+
+        :ivar job: :any:`TransferJob`, the job
+        :ivar value: return value of the job, `None` if it has failed
+        :ivar exception: `None` if the job has succeeded, otherwise the exception it has failed with
+                         (:any:`asyncio.CancelledError` if the job was cancelled)
+        :ivar size: `int` or `None`, number of bytes to be transferred (if known)
+        :ivar duration: `float`, time spent on the job in seconds
+    """
+
+    job: TransferJob
+    value: Any
+    exception: Optional[BaseException]
+    size: Optional[int]
+    duration: float
+
+    def __init__(self,
+                 job: TransferJob,
+                 value: Any = None,
+                 exception: Optional[BaseException] = None,
+                 size: Optional[int] = None,
+                 duration: float = 0.0):
+        self.job = job
+        self.value = value
+        self.exception = exception
+        self.size = size
+        self.duration = duration
+
+    @property
+    def success(self) -> bool:
+        """`bool`, `True` if the job has completed without errors."""
+
+        return self.exception is None
+
+    def __repr__(self) -> str:
+        status = "OK" if self.success else repr(self.exception)
+
+        return f"<{self.__class__.__name__}: {self.job!r} {status}>"
+
+class _ByteBudget:
+    def __init__(self, capacity: Optional[int]):
+        self.capacity = capacity
+        self._used = 0
+        self._condition = asyncio.Condition()
+
+    def _clamp(self, n: Optional[int]) -> int:
+        # Jobs of unknown size don't count, jobs larger than the budget
+        # are allowed to run alone
+        if self.capacity is None or not n:
+            return 0
+
+        return min(n, self.capacity)
+
+    async def acquire(self, n: Optional[int]) -> int:
+        n = self._clamp(n)
+
+        if n:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._used + n <= self.capacity)
+                self._used += n
+
+        return n
+
+    async def release(self, n: int) -> None:
+        if n:
+            async with self._condition:
+                self._used -= n
+                self._condition.notify_all()
+
+# Sentinel priority, makes sure that the end-of-queue marker comes after all the jobs
+_LAST = float("inf")
+
+class _TransferManager(ABC):
+    def __init__(self,
+                 yadisk: "YaDisk",
+                 max_concurrency: int = 8,
+                 max_bytes_in_flight: Optional[int] = None,
+                 prefetch: int = 16,
+                 queue_size: int = 1000,
+                 **kwargs):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        if prefetch < 1:
+            raise ValueError("prefetch must be at least 1")
+
+        self.yadisk = yadisk
+        self.max_concurrency = max_concurrency
+        self.max_bytes_in_flight = max_bytes_in_flight
+        self.prefetch = prefetch
+        self.queue_size = queue_size
+        self.default_kwargs = kwargs
+
+        self.bytes_transferred = 0
+        self.elapsed = 0.0
+
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def throughput(self) -> float:
+        """`float`, average number of bytes transferred per second during the last run."""
+
+        if not self.elapsed:
+            return 0.0
+
+        return self.bytes_transferred / self.elapsed
+
+    @abstractmethod
+    async def _prepare(self, job: TransferJob, kwargs: Dict[str, Any]) -> Any:
+        # Runs ahead of the transfer (e.g., gets the link), the result is passed to _transfer()
+        pass
+
+    @abstractmethod
+    def _get_size(self, job: TransferJob, prepared: Any) -> Optional[int]:
+        # Number of bytes the job will transfer, None if unknown
+        pass
+
+    @abstractmethod
+    async def _transfer(self, job: TransferJob, prepared: Any, kwargs: Dict[str, Any]) -> Any:
+        pass
+
+    def _job_kwargs(self, job: TransferJob) -> Dict[str, Any]:
+        kwargs = dict(self.default_kwargs)
+        kwargs.update(job.kwargs)
+
+        return kwargs
+
+    @staticmethod
+    def _make_job(job: Union[TransferJob, tuple]) -> TransferJob:
+        if isinstance(job, TransferJob):
+            return job
+
+        return TransferJob(*job)
+
+    async def iter_results(self,
+                           jobs: Union[Iterable, AsyncIterable]) -> AsyncGenerator[JobResult, None]:
+        """
+            Run the jobs and yield their results as soon as they complete.
+            A failed job doesn't affect the rest of the jobs.
+
+            :param jobs: iterable or async iterable of :any:`TransferJob` or `(src, dst)` tuples
+
+            :returns: async generator of :any:`JobResult`
+        """
+
+        counter = itertools.count()
+        pending: asyncio.PriorityQueue = asyncio.PriorityQueue(self.queue_size)
+        ready: asyncio.PriorityQueue = asyncio.PriorityQueue(self.prefetch)
+        results: asyncio.Queue = asyncio.Queue()
+        budget = _ByteBudget(self.max_bytes_in_flight)
+
+        n_preparers = min(self.prefetch, self.max_concurrency)
+
+        async def feed() -> None:
+            if hasattr(jobs, "__aiter__"):
+                async for job in jobs:
+                    job = self._make_job(job)
+                    await pending.put((job.priority, next(counter), job))
+            else:
+                for job in jobs:
+                    job = self._make_job(job)
+                    await pending.put((job.priority, next(counter), job))
+
+            for _ in range(n_preparers):
+                await pending.put((_LAST, next(counter), None))
+
+        async def prepare() -> None:
+            # Link acquisition runs ahead of the transfers
+            while True:
+                priority, _, job = await pending.get()
+
+                if job is None:
+                    break
+
+                if job.cancelled:
+                    results.put_nowait(JobResult(job, exception=asyncio.CancelledError()))
+                    continue
+
+                try:
+                    prepared = await self._prepare(job, self._job_kwargs(job))
+                except Exception as e:
+                    results.put_nowait(JobResult(job, exception=e))
+                    continue
+
+                await ready.put((priority, next(counter), job, prepared))
+
+        async def transfer() -> None:
+            while True:
+                _, _, job, prepared = await ready.get()
+
+                if job is None:
+                    break
+
+                size = self._get_size(job, prepared)
+                reserved = await budget.acquire(size)
+                start = time.monotonic()
+
+                try:
+                    if job.cancelled:
+                        raise asyncio.CancelledError
+
+                    job._task = asyncio.ensure_future(
+                        self._transfer(job, prepared, self._job_kwargs(job)))
+
+                    try:
+                        value = await job._task
+                    finally:
+                        job._task = None
+
+                    self.bytes_transferred += size or 0
+                    result = JobResult(job, value, size=size)
+                except asyncio.CancelledError as e:
+                    # Only the cancellation of the job itself is reported as its result
+                    if not job.cancelled:
+                        raise
+
+                    result = JobResult(job, exception=e, size=size)
+                except Exception as e:
+                    result = JobResult(job, exception=e, size=size)
+                finally:
+                    await budget.release(reserved)
+
+                result.duration = time.monotonic() - start
+                results.put_nowait(result)
+
+        async def prepare_all() -> None:
+            await asyncio.gather(*(prepare() for _ in range(n_preparers)))
+
+            for _ in range(self.max_concurrency):
+                await ready.put((_LAST, next(counter), None, None))
+
+        async def run_all() -> None:
+            tasks = [asyncio.ensure_future(coro)
+                     for coro in (feed(), prepare_all(),
+                                  *(transfer() for _ in range(self.max_concurrency)))]
+
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+                results.put_nowait(None)
+
+        self.bytes_transferred = 0
+        self.elapsed = 0.0
+        start = time.monotonic()
+
+        task = asyncio.ensure_future(run_all())
+        self._tasks.append(task)
+
+        try:
+            while True:
+                result = await results.get()
+
+                if result is None:
+                    break
+
+                self.elapsed = time.monotonic() - start
+
+                yield result
+
+            # Propagate errors that are not related to individual jobs,
+            # e.g. if iterating over the jobs has failed
+            await task
+        finally:
+            self.elapsed = time.monotonic() - start
+            self._tasks.remove(task)
+
+            if not task.done():
+                task.cancel()
+
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    async def run(self, jobs: Union[Iterable, AsyncIterable]) -> List[JobResult]:
+        """
+            Run the jobs and wait for all of them to complete.
+            A failed job doesn't affect the rest of the jobs.
+
+            :param jobs: iterable or async iterable of :any:`TransferJob` or `(src, dst)` tuples
+
+            :returns: `list` of :any:`JobResult` in the order of completion
+        """
+
+        return [result async for result in self.iter_results(jobs)]
+
+    def cancel(self) -> None:
+        """Cancel all the running jobs and stop accepting new ones."""
+
+        for task in self._tasks:
+            task.cancel()
+
+class DownloadManager(_TransferManager):
+    """
+        Downloads many files concurrently.
+        Download links are requested ahead of the transfers, so that the connections
+        don't stay idle while waiting for the API.
+
+        :param yadisk: :any:`YaDisk`, the object to be used for downloading
+        :param max_concurrency: `int`, maximum number of simultaneous transfers
+        :param max_bytes_in_flight: `int` or `None`, maximum total size of the files being
+                                    downloaded at the same time (a larger file is downloaded alone)
+        :param prefetch: `int`, maximum number of download links to be requested in advance
+        :param queue_size: `int`, maximum number of jobs read from the input in advance,
+                           priorities are applied within this window
+        :param kwargs: default arguments for :any:`YaDisk.download_by_link`
+
+        :ivar bytes_transferred: `int`, number of bytes transferred during the last run
+        :ivar elapsed: `float`, duration of the last run in seconds
+    """
+
+    async def _prepare(self, job: TransferJob, kwargs: Dict[str, Any]) -> Any:
+        # The link is already known, e.g. from a directory listing
+        if isinstance(job.src, ResourceObject) and job.src.file is not None:
+            return job.src
+
+        # One request gives both the download link and the file size
+        request_kwargs = _request_kwargs(kwargs)
+        request_kwargs["fields"] = ["type", "file", "size", "md5", "sha256"]
+
+        meta = await self.yadisk.get_meta(job.src, **request_kwargs)
+
+        if meta.type == "dir" or meta.file is None:
+            raise WrongResourceTypeError("%r is not a file" % (job.src,))
+
+        return meta
+
+    def _get_size(self, job: TransferJob, prepared: Any) -> Optional[int]:
+        return prepared.size
+
+    async def _transfer(self, job: TransferJob, prepared: Any, kwargs: Dict[str, Any]) -> Any:
+        if kwargs.get("verify_checksum"):
+            kwargs.setdefault("md5", prepared.md5)
+            kwargs.setdefault("sha256", prepared.sha256)
+
+        await self.yadisk.download_by_link(prepared.file, job.dst, **kwargs)
+
+        return prepared
+
+class UploadManager(_TransferManager):
+    """
+        Uploads many files concurrently.
+        Upload links are requested ahead of the transfers, so that the connections
+        don't stay idle while waiting for the API.
+        Missing parent directories are created once per directory.
+
+        :param yadisk: :any:`YaDisk`, the object to be used for uploading
+        :param max_concurrency: `int`, maximum number of simultaneous transfers
+        :param max_bytes_in_flight: `int` or `None`, maximum total size of the files being
+                                    uploaded at the same time (a larger file is uploaded alone)
+        :param prefetch: `int`, maximum number of upload links to be requested in advance
+        :param queue_size: `int`, maximum number of jobs read from the input in advance,
+                           priorities are applied within this window
+        :param create_parents: `bool`, create missing parent directories
+        :param kwargs: default arguments for :any:`YaDisk.upload`
+
+        :ivar bytes_transferred: `int`, number of bytes transferred during the last run
+                                 (only the files of known size are counted)
+        :ivar elapsed: `float`, duration of the last run in seconds
+    """
+
+    def __init__(self, yadisk: "YaDisk", /, create_parents: bool = True, **kwargs):
+        _TransferManager.__init__(self, yadisk, **kwargs)
+
+        self.create_parents = create_parents
+        self._directories: Dict[str, asyncio.Future] = {}
+
+    async def _mkdir(self, path: str, kwargs: Dict[str, Any]) -> None:
+        try:
+            await self.yadisk.mkdir(path, **kwargs)
+        except DirectoryExistsError:
+            pass
+        except ParentNotFoundError:
+            await self._ensure_dir(str(PurePosixPath(path).parent), kwargs)
+
+            try:
+                await self.yadisk.mkdir(path, **kwargs)
+            except DirectoryExistsError:
+                pass
+
+    async def _ensure_dir(self, path: str, kwargs: Dict[str, Any]) -> None:
+        # Concurrent jobs in the same directory wait for the same mkdir() call
+        try:
+            future = self._directories[path]
+        except KeyError:
+            future = asyncio.ensure_future(self._mkdir(path, kwargs))
+            self._directories[path] = future
+
+        try:
+            await asyncio.shield(future)
+        except Exception:
+            # Let the next job try again
+            if self._directories.get(path) is future:
+                del self._directories[path]
+
+            raise
+
+    async def _prepare(self, job: TransferJob, kwargs: Dict[str, Any]) -> Any:
+        request_kwargs = _request_kwargs(kwargs)
+
+        if "overwrite" in kwargs:
+            request_kwargs["overwrite"] = kwargs["overwrite"]
+
+        try:
+            return await self.yadisk.get_upload_link(job.dst, **request_kwargs)
+        except ParentNotFoundError:
+            if not self.create_parents:
+                raise
+
+        await self._ensure_dir(str(PurePosixPath(job.dst).parent), _request_kwargs(kwargs))
+
+        return await self.yadisk.get_upload_link(job.dst, **request_kwargs)
+
+    def _get_size(self, job: TransferJob, prepared: Any) -> Optional[int]:
+        if isinstance(job.src, (str, bytes)):
+            try:
+                return os.stat(job.src).st_size
+            except OSError:
+                return None
+
+        return None
+
+    async def _transfer(self, job: TransferJob, prepared: Any, kwargs: Dict[str, Any]) -> Any:
+        links = [prepared]
+
+        async def get_upload_link(path: str, **kwargs) -> str:
+            # The prefetched link is used for the first attempt only
+            if links:
+                return links.pop()
+
+            return await self.yadisk.get_upload_link(path, **kwargs)
+
+        transfer_kwargs = dict(self.yadisk.default_args)
+        transfer_kwargs.update(kwargs)
+
+        await self.yadisk._upload(get_upload_link, job.src, job.dst, **transfer_kwargs)
+
+        return ResourceLinkObject.from_path(job.dst, yadisk=self.yadisk)
+
+async def _walk_remote_dir(yadisk: "YaDisk",
+                           src_path: str,
+                           dst_path: Union[str, bytes],
+                           max_concurrency: int,
+                           skip_unchanged: bool,
+                           kwargs: Dict[str, Any]) -> AsyncGenerator[TransferJob, None]:
+    # Lists the directory tree with several workers and yields download jobs
+    # as soon as the files are found, creating the local directories on the way
+
+    loop = asyncio.get_running_loop()
+    request_kwargs = _request_kwargs(kwargs)
+    request_kwargs["fields"] = ["name", "type", "path", "file", "size", "md5", "sha256"]
+
+    directories: asyncio.Queue = asyncio.Queue()
+    jobs: asyncio.Queue = asyncio.Queue(max_concurrency * 100)
+
+    async def list_directory(remote: str, local: Union[str, bytes]) -> None:
+        await loop.run_in_executor(None, partial(os.makedirs, local, exist_ok=True))
+
+        async for item in await yadisk.listdir(remote, **request_kwargs):
+            local_path = os.path.join(local, item.name)
+
+            if item.type == "dir":
+                directories.put_nowait((item.path, local_path))
+            elif not (skip_unchanged and await _is_same_file(local_path, item)):
+                await jobs.put(TransferJob(item, local_path))
+
+    async def worker() -> None:
+        while True:
+            remote, local = await directories.get()
+
+            try:
+                await list_directory(remote, local)
+            finally:
+                directories.task_done()
+
+    async def walk() -> None:
+        workers = [asyncio.ensure_future(worker()) for _ in range(max_concurrency)]
+        join = asyncio.ensure_future(directories.join())
+
+        try:
+            # Stop as soon as the whole tree has been listed or any of the workers has failed
+            await asyncio.wait([join, *workers], return_when=asyncio.FIRST_COMPLETED)
+
+            for task in workers:
+                if task.done():
+                    task.result()
+
+            await jobs.put(None)
+        except BaseException:
+            # The remaining jobs are dropped, there must be room for the end marker
+            while True:
+                try:
+                    jobs.put_nowait(None)
+                    break
+                except asyncio.QueueFull:
+                    jobs.get_nowait()
+
+            raise
+        finally:
+            join.cancel()
+
+            for task in workers:
+                task.cancel()
+
+    directories.put_nowait((src_path, dst_path))
+    walk_task = asyncio.ensure_future(walk())
+
+    try:
+        while (job := await jobs.get()) is not None:
+            yield job
+
+        await walk_task
+    finally:
+        walk_task.cancel()
+
+async def _walk_local_dir(yadisk: "YaDisk",
+                          src_path: Union[str, bytes],
+                          dst_path: str,
+                          max_concurrency: int,
+                          skip_unchanged: bool,
+                          kwargs: Dict[str, Any]) -> AsyncGenerator[TransferJob, None]:
+    # Creates the remote directory tree level by level and then yields upload jobs
+
+    loop = asyncio.get_running_loop()
+    request_kwargs = _request_kwargs(kwargs)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    tree = await loop.run_in_executor(None, lambda: list(os.walk(src_path)))
+
+    # Remote directories grouped by depth, parents always come first
+    levels: Dict[int, List[str]] = {}
+    remote_paths: Dict[Union[str, bytes], str] = {}
+
+    for local_dir, _, _ in tree:
+        # The source path can be bytes, then the walked paths are bytes too
+        relative_path = os.fsdecode(os.path.relpath(local_dir, src_path))
+        parts = [] if relative_path == "." else relative_path.split(os.sep)
+
+        remote_dir = str(PurePosixPath(dst_path, *parts))
+        remote_paths[local_dir] = remote_dir
+        levels.setdefault(len(parts), []).append(remote_dir)
+
+    # Directories that existed before, their contents have to be compared
+    existing_dirs = set()
+
+    async def mkdir(path: str) -> None:
+        async with semaphore:
+            try:
+                await yadisk.mkdir(path, **request_kwargs)
+            except DirectoryExistsError:
+                existing_dirs.add(path)
+
+    for depth in sorted(levels):
+        await asyncio.gather(*(mkdir(path) for path in levels[depth]))
+
+    async def list_remote_files(path: str) -> Dict[str, ResourceObject]:
+        if not skip_unchanged or path not in existing_dirs:
+            return {}
+
+        async with semaphore:
+            listing = await yadisk.listdir(path, fields=["name", "type", "size", "md5"], **request_kwargs)
+
+            return {item.name: item async for item in listing if item.type == "file"}
+
+    for local_dir, _, filenames in tree:
+        remote_dir = remote_paths[local_dir]
+        remote_files = await list_remote_files(remote_dir)
+
+        for filename in filenames:
+            local_path = os.path.join(local_dir, filename)
+            name = os.fsdecode(filename)
+            remote_file = remote_files.get(name)
+
+            if remote_file is not None and await _is_same_file(local_path, remote_file):
+                continue
+
+            yield TransferJob(local_path, str(PurePosixPath(remote_dir, name)))
+
+class OperationResult:
+    """
+        Outcome of a single item of :any:`YaDisk.copy_many`, :any:`YaDisk.move_many`,
+        :any:`YaDisk.remove_many` or :any:`YaDisk.batch`.
+
+        :ivar item: the item: a `(src_path, dst_path)` tuple or a path,
+                    for :any:`YaDisk.batch` it's the index of the awaitable
+        :ivar value: return value of the operation (e.g., :any:`ResourceLinkObject`),
+                     `None` if it has failed or if its response was lost and the result
+                     was checked separately
+        :ivar exception: `None` if the operation has succeeded, otherwise the exception it has failed with
+        :ivar retries: `int`, number of retries
+        :ivar duration: `float`, time spent on the item in seconds, including waiting for the operation
+    """
+
+    item: Any
+    value: Any
+    exception: Optional[BaseException]
+    retries: int
+    duration: float
+
+    def __init__(self,
+                 item: Any,
+                 value: Any = None,
+                 exception: Optional[BaseException] = None,
+                 retries: int = 0,
+                 duration: float = 0.0):
+        self.item = item
+        self.value = value
+        self.exception = exception
+        self.retries = retries
+        self.duration = duration
+
+    @property
+    def success(self) -> bool:
+        """`bool`, `True` if the operation has completed without errors."""
+
+        return self.exception is None
+
+    def __repr__(self) -> str:
+        status = "OK" if self.success else repr(self.exception)
+
+        return f"<{self.__class__.__name__}: {self.item!r} {status}>"
+
+# Delay before the first retry of a bulk operation item, doubled after each retry
+_BULK_RETRY_INTERVAL = 0.5
+
+# Maximum delay between retries of a bulk operation item
+_BULK_MAX_RETRY_INTERVAL = 30.0
+
+class _RequestRateLimiter:
+    def __init__(self, rate: Optional[float]):
+        self.rate = rate
+        self._next_time = 0.0
+
+    async def acquire(self) -> None:
+        if self.rate is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        # Reserve the next free slot, then sleep until it comes
+        start = max(now, self._next_time)
+        self._next_time = start + 1.0 / self.rate
+
+        if start > now:
+            await asyncio.sleep(start - now)
+
+async def _run_operations(yadisk: "YaDisk",
+                          items: Iterable,
+                          func: Callable[[Any], Awaitable[Any]],
+                          max_concurrency: int,
+                          max_requests_per_second: Optional[float],
+                          n_retries: Optional[int],
+                          retry_interval: Optional[float],
+                          check_before: Optional[Callable[[Any], Awaitable[Any]]] = None,
+                          check_after: Optional[Callable[[Any, Any], Awaitable[bool]]] = None) -> List[OperationResult]:
+    # check_after(item, state) tells whether the operation has actually been applied. It's called
+    # when a retry fails with PathExistsError or PathNotFoundError after an attempt that could have
+    # been applied by the server, but its response was lost (e.g., a dropped connection).
+    # state is what check_before(item) returned before the first attempt (e.g., whether
+    # the destination existed), so that the earlier state isn't mistaken for the result
+
+    if n_retries is None:
+        n_retries = settings.DEFAULT_N_RETRIES
+
+    if not retry_interval:
+        retry_interval = _BULK_RETRY_INTERVAL
+
+    rate_limiter = _RequestRateLimiter(max_requests_per_second)
+    loop = asyncio.get_running_loop()
+
+    async def run_one(item: Any) -> OperationResult:
+        start = loop.time()
+        result = OperationResult(item)
+        maybe_applied = False
+        state = None
+
+        # Without retries there's nothing to confirm
+        can_confirm = check_after is not None and n_retries > 0
+
+        if can_confirm and check_before is not None:
+            try:
+                await rate_limiter.acquire()
+                state = await check_before(item)
+            except (YaDiskError, aiohttp.ClientError, TimeoutError):
+                can_confirm = False
+
+        for i in range(n_retries + 1):
+            result.retries = i
+
+            try:
+                await rate_limiter.acquire()
+                value = await func(item)
+
+                # Asynchronous operations hold their slot until they are done
+                if isinstance(value, OperationLinkObject):
+                    await yadisk.operation_tracker.wait(value.href)
+
+                result.value = value
+                result.exception = None
+                break
+            except (aiohttp.ClientError, TimeoutError, RetriableYaDiskError) as e:
+                result.exception = e
+
+                # The request hasn't reached the server or hasn't been processed,
+                # the other errors don't tell
+                if not isinstance(e, (aiohttp.ClientConnectorError, UnavailableError)):
+                    maybe_applied = True
+
+                if i < n_retries:
+                    await asyncio.sleep(min(retry_interval * 2 ** i, _BULK_MAX_RETRY_INTERVAL))
+            except (PathExistsError, PathNotFoundError) as e:
+                result.exception = e
+
+                if maybe_applied and can_confirm:
+                    assert check_after is not None
+
+                    try:
+                        if await check_after(item, state):
+                            result.exception = None
+                    except (YaDiskError, aiohttp.ClientError, TimeoutError):
+                        pass
+
+                break
+            except Exception as e:
+                result.exception = e
+                break
+
+        result.duration = loop.time() - start
+
+        return result
+
+    # Items are taken by the workers one by one, so that the input can be lazy
+    # and only max_concurrency items are in progress at any time
+    indexed_items = enumerate(items)
+    results: Dict[int, OperationResult] = {}
+
+    async def worker() -> None:
+        for index, item in indexed_items:
+            results[index] = await run_one(item)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max_concurrency)]
+
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    return [results[index] for index in sorted(results)]
+
+# Exceptions that are reported as results of batch items, the rest are propagated
+_BATCH_ERRORS = (YaDiskError, aiohttp.ClientError, TimeoutError)
+
+def _discard_awaitable(aw: Any) -> None:
+    # Prevents "coroutine was never awaited" warnings for the items that were skipped
+    if asyncio.iscoroutine(aw):
+        aw.close()
+    elif isinstance(aw, asyncio.Future):
+        aw.cancel()
+
+async def _run_batch(aws: Iterable,
+                     max_concurrency: int,
+                     fail_fast: bool,
+                     timeout: Optional[float]) -> List[OperationResult]:
+    loop = asyncio.get_running_loop()
+
+    # Items are taken by the workers one by one, so the input can be lazy
+    items = enumerate(aws)
+    results: Dict[int, OperationResult] = {}
+    workers: List[asyncio.Task] = []
+    stopping = False
+
+    def stop() -> None:
+        nonlocal stopping
+
+        stopping = True
+        current = asyncio.current_task()
+
+        for task in workers:
+            if task is not current:
+                task.cancel()
+
+    async def worker() -> None:
+        for index, aw in items:
+            result = OperationResult(index)
+            results[index] = result
+
+            if stopping:
+                _discard_awaitable(aw)
+                result.exception = asyncio.CancelledError()
+                continue
+
+            start = loop.time()
+
+            try:
+                if callable(aw):
+                    aw = aw()
+
+                result.value = await asyncio.wait_for(aw, timeout)
+            except _BATCH_ERRORS as e:
+                result.exception = e
+
+                if fail_fast and not stopping:
+                    stop()
+            except asyncio.CancelledError as e:
+                # Only the cancellation caused by another item is reported as the result
+                if not stopping:
+                    raise
+
+                _discard_awaitable(aw)
+                result.exception = e
+            finally:
+                result.duration = loop.time() - start
+
+    workers.extend(asyncio.ensure_future(worker()) for _ in range(max_concurrency))
+
+    try:
+        done, _ = await asyncio.wait(workers, return_when=asyncio.FIRST_EXCEPTION)
+
+        for task in done:
+            if task.cancelled():
+                continue
+
+            exc = task.exception()
+
+            if exc is not None:
+                raise exc
+
+        # Workers that were cancelled between the items have to be replaced
+        # to mark the rest of the items as cancelled
+        if stopping:
+            await worker()
+    finally:
+        for task in workers:
+            task.cancel()
+
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    return [results[index] for index in sorted(results)]
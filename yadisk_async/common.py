@@ -112,6 +112,8 @@ class BinaryAsyncFileLike(Protocol):
 FileOrPath = Union[
     str,
     bytes,
+    bytearray,
+    memoryview,
     IO,
     AsyncFileLike,
     Callable[[], AsyncIterable[bytes]]]
@@ -1,13 +1,13 @@
 # -*- coding: utf-8 -*-
 
-__all__ = ["List", "Dict", "Set", "Callable", "Iterable", "Generator",
+__all__ = ["List", "Dict", "Set", "Tuple", "Callable", "Iterable", "Generator",
            "AsyncGenerator", "Coroutine", "Awaitable", "TimeoutError", "AsyncIterable"]
 
 import sys
 
 if sys.version_info.major == 3 and sys.version_info.minor < 9:
     from typing import (
-        List, Dict, Set, Callable, Iterable, Generator, AsyncGenerator,
+        List, Dict, Set, Tuple, Callable, Iterable, Generator, AsyncGenerator,
         Coroutine, Awaitable, AsyncIterable
     )
 else:
@@ -19,6 +19,7 @@ else:
     List = list
     Dict = dict
     Set = set
+    Tuple = tuple
 
 if sys.version_info.major == 3 and sys.version_info.minor < 11:
     from asyncio import TimeoutError
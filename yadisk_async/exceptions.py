@@ -9,7 +9,16 @@ __all__ = ["YaDiskError", "RetriableYaDiskError", "UnknownYaDiskError",
            "GatewayTimeoutError", "InsufficientStorageError", "PathNotFoundError",
            "ParentNotFoundError", "PathExistsError", "DirectoryExistsError",
            "FieldValidationError", "ResourceIsLockedError", "MD5DifferError",
-           "OperationNotFoundError", "InvalidResponseError"]
+           "OperationNotFoundError", "InvalidResponseError", "ChecksumMismatchError",
+           "TransferStalledError", "OperationFailedError", "OperationTimeoutError",
+           "WorkerDiedError"]
+
+def _restore_exception(cls, args, state):
+    exc = cls.__new__(cls)
+    exc.args = args
+    exc.__dict__.update(state)
+
+    return exc
 
 class YaDiskError(Exception):
     """
@@ -29,6 +38,10 @@ class YaDiskError(Exception):
         self.error_type = error_type
         self.response = response
 
+    def __reduce__(self):
+        # Subclasses have different constructors, so they are restored without calling them
+        return (_restore_exception, (self.__class__, self.args, self.__dict__))
+
 class WrongResourceTypeError(YaDiskError):
     """Thrown when the resource was expected to be of different type (e.g., file instead of directory)."""
 
@@ -144,3 +157,45 @@ class OperationNotFoundError(NotFoundError):
 class InvalidResponseError(YaDiskError):
     """Thrown when Yandex.Disk did not return a JSON response or if it's invalid."""
     pass
+
+class ChecksumMismatchError(RetriableYaDiskError):
+    """Thrown when the checksum of the transferred data doesn't match with the expected one."""
+
+    def __init__(self, msg=""):
+        RetriableYaDiskError.__init__(self, None, msg, None)
+
+class TransferStalledError(RetriableYaDiskError):
+    """Thrown when the transfer rate stays below the minimum for too long."""
+
+    def __init__(self, msg=""):
+        RetriableYaDiskError.__init__(self, None, msg, None)
+
+class OperationFailedError(YaDiskError):
+    """
+        Thrown when an asynchronous operation has finished with the "failed" status.
+
+        :ivar operation_id: `str`, ID or link of the operation
+    """
+
+    def __init__(self, operation_id, msg=""):
+        YaDiskError.__init__(self, None, msg, None)
+
+        self.operation_id = operation_id
+
+class OperationTimeoutError(YaDiskError):
+    """
+        Thrown when an asynchronous operation didn't finish before the deadline.
+
+        :ivar operation_id: `str`, ID or link of the operation
+    """
+
+    def __init__(self, operation_id, msg=""):
+        YaDiskError.__init__(self, None, msg, None)
+
+        self.operation_id = operation_id
+
+class WorkerDiedError(YaDiskError):
+    """Thrown when the worker process running a job has died too many times."""
+
+    def __init__(self, msg=""):
+        YaDiskError.__init__(self, None, msg, None)
@@ -185,6 +185,35 @@ class OperationLinkObject(LinkObject):
 
         return await self._yadisk.get_operation_status(self.href, **kwargs)
 
+    async def wait(self, **kwargs) -> str:
+        """
+            Wait until the operation finishes.
+
+            :param deadline: `float` or `None`, maximum number of seconds to wait, `None` means no limit
+            :param poll_interval: `float` or `None`, initial delay between polls in seconds
+            :param max_poll_interval: `float` or `None`, maximum delay between polls in seconds
+            :param poll_backoff: `float`, factor the delay is multiplied by after each poll
+            :param estimated_duration: `float` or `None`, expected duration of the operation in seconds
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries
+            :param retry_interval: delay between retries in seconds
+
+            :raises OperationNotFoundError: requested operation was not found
+            :raises OperationFailedError: operation has failed
+            :raises OperationTimeoutError: operation didn't finish before the deadline
+
+            :returns: `str`, final status of the operation (`"success"`)
+        """
+
+        if self._yadisk is None:
+            raise ValueError("This object is not bound to a YaDisk instance")
+
+        if self.href is None:
+            raise ValueError("OperationLinkObject has no link")
+
+        return await self._yadisk.wait_for_operation(self.href, **kwargs)
+
 class PublicResourcesListObject(YaDiskObject):
     """
         List of public resources.
@@ -626,6 +655,8 @@ class ResourceObjectMethodsMixin:
 
             :param relative_path: `str` or `None`, source path relative to the resource
             :param dst_path_or_file: destination path or file-like object
+            :param verify_checksum: `bool`, hash the data while it's being received and
+                                    compare it with the hashes of the source file
             :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
             :param headers: `dict` or `None`, additional request headers
             :param n_retries: `int`, maximum number of retries
@@ -634,6 +665,7 @@ class ResourceObjectMethodsMixin:
             :raises PathNotFoundError: resource was not found on Disk
             :raises ForbiddenError: application doesn't have enough rights for this request
             :raises ResourceIsLockedError: resource is locked by another request
+            :raises ChecksumMismatchError: downloaded file is corrupted (only with `verify_checksum`)
 
             :returns: :any:`ResourceLinkObject`, link to the source resource
         """
@@ -649,9 +681,15 @@ class ResourceObjectMethodsMixin:
             raise ValueError("This object is not bound to a YaDisk instance")
 
         if not relative_path and hasattr(self, "file") and self.file is not None:
-            await self._yadisk.download_by_link(self.file, dst_path_or_file, **kwargs)
+            if kwargs.get("verify_checksum"):
+                kwargs.setdefault("md5", getattr(self, "md5", None))
+                kwargs.setdefault("sha256", getattr(self, "sha256", None))
+
+            # Without known hashes the checksum has to be requested using the path
+            if not kwargs.get("verify_checksum") or kwargs["md5"] or kwargs["sha256"]:
+                await self._yadisk.download_by_link(self.file, dst_path_or_file, **kwargs)
 
-            return ResourceLinkObject.from_path(self.path, yadisk=self._yadisk)
+                return ResourceLinkObject.from_path(self.path, yadisk=self._yadisk)
 
         if self.path is None:
             raise ValueError("ResourceObject doesn't have a path")
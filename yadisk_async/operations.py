@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import heapq
+import itertools
+
+import aiohttp
+
+from . import settings
+from .exceptions import RetriableYaDiskError, OperationFailedError, OperationTimeoutError
+from .compat import Dict, List, Set, Tuple, TimeoutError
+
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .yadisk import YaDisk
+
+__all__ = ["OperationTracker"]
+
+class _PollSchedule:
+    """
+        Computes delays between status polls of an asynchronous operation.
+        The delay starts small and grows exponentially up to `max_interval`.
+        If the duration of the operation is estimated in advance, the first poll
+        happens when it's expected to finish, after that the delays start small again.
+
+        :param interval: `float`, initial delay in seconds
+        :param max_interval: `float`, maximum delay in seconds
+        :param backoff: `float`, factor the delay is multiplied by after each poll
+        :param estimated_duration: `float` or `None`, expected duration of the operation in seconds
+    """
+
+    def __init__(self,
+                 interval: float,
+                 max_interval: float,
+                 backoff: float = 1.5,
+                 estimated_duration: Optional[float] = None):
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.estimated_duration = estimated_duration
+
+        self._next_interval = interval
+
+    def next_delay(self) -> float:
+        """
+            Get the delay before the next poll.
+
+            :returns: `float`, number of seconds
+        """
+
+        if self.estimated_duration is not None:
+            delay, self.estimated_duration = self.estimated_duration, None
+
+            return max(delay, self.interval)
+
+        delay = self._next_interval
+        self._next_interval = min(self._next_interval * self.backoff, self.max_interval)
+
+        return min(delay, self.max_interval)
+
+class _TrackedOperation:
+    def __init__(self, operation_id: str, future: asyncio.Future, schedule: _PollSchedule):
+        self.operation_id = operation_id
+        self.future = future
+        self.schedule = schedule
+
+class OperationTracker:
+    """
+        Waits for many asynchronous operations at once.
+        Instead of every waiter polling its own operation, the tracker keeps all
+        the pending operations and polls them from a single background task,
+        never exceeding `max_polls_per_second` status requests in total.
+        Each operation is polled with growing delays, just like in :any:`YaDisk.wait_for_operation`.
+
+        The tracker must only be used from one event loop.
+        Every :any:`YaDisk` object has one, see :any:`YaDisk.operation_tracker`.
+
+        :param yadisk: :any:`YaDisk`, used to get the status of the operations
+        :param max_polls_per_second: `float`, maximum rate of status requests
+        :param max_concurrent_polls: `int`, maximum number of status requests in flight
+        :param poll_interval: `float` or `None`, initial delay between polls of an operation,
+                              defaults to `settings.DEFAULT_OPERATION_POLL_INTERVAL`
+        :param max_poll_interval: `float` or `None`, maximum delay between polls of an operation,
+                                  defaults to `settings.DEFAULT_OPERATION_MAX_POLL_INTERVAL`
+        :param poll_backoff: `float`, factor the delay is multiplied by after each poll
+        :param kwargs: additional parameters for :any:`YaDisk.get_operation_status`
+                       (e.g., `timeout`, `headers`). `n_retries` defaults to 0,
+                       failed polls are simply repeated later within the limits above
+    """
+
+    def __init__(self,
+                 yadisk: "YaDisk", /,
+                 max_polls_per_second: float = 10.0,
+                 max_concurrent_polls: int = 4,
+                 poll_interval: Optional[float] = None,
+                 max_poll_interval: Optional[float] = None,
+                 poll_backoff: float = 1.5,
+                 **kwargs):
+        if poll_interval is None:
+            poll_interval = settings.DEFAULT_OPERATION_POLL_INTERVAL
+
+        if max_poll_interval is None:
+            max_poll_interval = settings.DEFAULT_OPERATION_MAX_POLL_INTERVAL
+
+        self.yadisk = yadisk
+        self.max_polls_per_second = max_polls_per_second
+        self.max_concurrent_polls = max_concurrent_polls
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.poll_backoff = poll_backoff
+        self.kwargs = kwargs
+
+        # Retries inside a poll would bypass the rate limit and hold a poll slot while sleeping
+        self.kwargs.setdefault("n_retries", 0)
+
+        self._operations: Dict[str, _TrackedOperation] = {}
+        self._queue: List[Tuple[float, int, _TrackedOperation]] = []
+        self._counter = itertools.count()
+        self._next_poll_time = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._poll_tasks: Set[asyncio.Task] = set()
+        self._n_polls = 0
+
+    @property
+    def pending(self) -> int:
+        """`int`, number of operations that haven't finished yet"""
+
+        return len(self._operations)
+
+    @property
+    def n_polls(self) -> int:
+        """`int`, total number of status requests made so far"""
+
+        return self._n_polls
+
+    def track(self, operation_id: str, /, estimated_duration: Optional[float] = None) -> asyncio.Future:
+        """
+            Start tracking the operation.
+            Tracking the same operation again returns the same future.
+
+            :param operation_id: ID of the operation or a link
+            :param estimated_duration: `float` or `None`, expected duration of the operation in seconds.
+                                       If specified, the first poll is delayed until then.
+
+            :returns: :any:`asyncio.Future` that resolves to the final status (`"success"`)
+                      or fails with :any:`OperationFailedError` or another :any:`YaDiskError`.
+                      Cancelling it stops tracking the operation.
+        """
+
+        try:
+            return self._operations[operation_id].future
+        except KeyError:
+            pass
+
+        loop = asyncio.get_running_loop()
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_polls)
+            self._task = loop.create_task(self._run())
+
+        schedule = _PollSchedule(self.poll_interval, self.max_poll_interval,
+                                 self.poll_backoff, estimated_duration)
+        operation = _TrackedOperation(operation_id, loop.create_future(), schedule)
+
+        self._operations[operation_id] = operation
+        operation.future.add_done_callback(lambda _: self._forget(operation))
+
+        self._schedule(operation)
+
+        return operation.future
+
+    async def wait(self,
+                   operation_id: str, /,
+                   deadline: Optional[float] = None,
+                   estimated_duration: Optional[float] = None) -> str:
+        """
+            Track the operation and wait until it finishes.
+
+            :param operation_id: ID of the operation or a link
+            :param deadline: `float` or `None`, maximum number of seconds to wait, `None` means no limit.
+                             If the deadline passes, the operation is no longer tracked,
+                             unless it was already being tracked before the call.
+            :param estimated_duration: `float` or `None`, expected duration of the operation in seconds
+
+            :raises OperationFailedError: operation has failed
+            :raises OperationTimeoutError: operation didn't finish before the deadline
+
+            :returns: `str`, final status of the operation (`"success"`)
+        """
+
+        already_tracked = operation_id in self._operations
+        future = self.track(operation_id, estimated_duration=estimated_duration)
+
+        # The future might be shared with other waiters, so it's not cancelled directly
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), deadline)
+        except TimeoutError:
+            if not already_tracked:
+                future.cancel()
+
+            raise OperationTimeoutError(operation_id, f"Operation didn't finish in {deadline} seconds")
+
+    async def close(self) -> None:
+        """Stop tracking all the operations, their futures are cancelled."""
+
+        tasks = list(self._poll_tasks)
+
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+
+        for task in tasks:
+            task.cancel()
+
+        if tasks:
+            await asyncio.wait(tasks)
+
+        for operation in list(self._operations.values()):
+            operation.future.cancel()
+
+        self._operations.clear()
+        self._queue.clear()
+
+    def _forget(self, operation: _TrackedOperation) -> None:
+        if self._operations.get(operation.operation_id) is operation:
+            del self._operations[operation.operation_id]
+
+    def _schedule(self, operation: _TrackedOperation) -> None:
+        when = asyncio.get_running_loop().time() + operation.schedule.next_delay()
+        heapq.heappush(self._queue, (when, next(self._counter), operation))
+
+        assert self._wakeup is not None
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None and self._semaphore is not None
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            self._wakeup.clear()
+
+            if not self._queue:
+                await self._wakeup.wait()
+                continue
+
+            when, _, operation = self._queue[0]
+
+            if operation.future.done():
+                heapq.heappop(self._queue)
+                continue
+
+            now = loop.time()
+            delay = max(when, self._next_poll_time) - now
+
+            if delay > 0:
+                # Sleep until the next poll is due, unless an earlier one gets scheduled
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except TimeoutError:
+                    pass
+
+                continue
+
+            heapq.heappop(self._queue)
+
+            await self._semaphore.acquire()
+
+            self._next_poll_time = max(now, self._next_poll_time) + 1.0 / self.max_polls_per_second
+
+            task = loop.create_task(self._poll(operation))
+            self._poll_tasks.add(task)
+            task.add_done_callback(self._poll_tasks.discard)
+
+    async def _poll(self, operation: _TrackedOperation) -> None:
+        assert self._semaphore is not None
+
+        try:
+            self._n_polls += 1
+            status = await self.yadisk.get_operation_status(operation.operation_id, **self.kwargs)
+        except (aiohttp.ClientError, TimeoutError, RetriableYaDiskError):
+            # Transient errors are retried on the next poll
+            status = None
+        except Exception as e:
+            if not operation.future.done():
+                operation.future.set_exception(e)
+
+            return
+        finally:
+            self._semaphore.release()
+
+        if operation.future.done():
+            return
+
+        if status == "success":
+            operation.future.set_result(status)
+        elif status == "failed":
+            operation.future.set_exception(
+                OperationFailedError(operation.operation_id, "Operation has failed"))
+        else:
+            self._schedule(operation)
@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from functools import partial
+import datetime
+import inspect
+import os
+import posixpath
+
+from typing import Any, Optional, Union, TYPE_CHECKING
+from .compat import AsyncGenerator, AsyncIterable, Callable, Dict, Iterable, List, Tuple
+
+if TYPE_CHECKING:
+    from .yadisk import YaDisk
+    from .objects import ResourceObject
+
+__all__ = ["Pipeline", "match"]
+
+# Marks the end of a queue
+_END = object()
+
+# Returned by a stage to drop the item
+_SKIP = object()
+
+def _strip_disk_prefix(path: str) -> str:
+    if path.startswith("disk:"):
+        path = path[len("disk:"):]
+
+    return posixpath.join("/", path)
+
+def match(media_type: Optional[Union[str, Iterable[str]]] = None,
+          modified_after: Optional[datetime.datetime] = None,
+          modified_before: Optional[datetime.datetime] = None) -> Callable[["ResourceObject"], bool]:
+    """
+        Make a predicate for :any:`Pipeline.filter` that checks the fields
+        of :any:`ResourceObject`. All the conditions must be met.
+
+        :param media_type: `str`, iterable of `str` or `None`, allowed media types (e.g., `"image"`)
+        :param modified_after: :any:`datetime.datetime` or `None`, keep the resources modified after that
+        :param modified_before: :any:`datetime.datetime` or `None`, keep the resources modified before that
+
+        :returns: function that accepts :any:`ResourceObject` and returns `bool`
+    """
+
+    if isinstance(media_type, str):
+        media_type = {media_type}
+    elif media_type is not None:
+        media_type = set(media_type)
+
+    def predicate(resource: "ResourceObject") -> bool:
+        if media_type is not None and resource.media_type not in media_type:
+            return False
+
+        if modified_after is not None and (resource.modified is None or resource.modified <= modified_after):
+            return False
+
+        if modified_before is not None and (resource.modified is None or resource.modified >= modified_before):
+            return False
+
+        return True
+
+    return predicate
+
+async def _walk(yadisk: "YaDisk",
+                path: str,
+                recursive: bool,
+                max_concurrency: int,
+                queue_size: int,
+                kwargs: Dict[str, Any]) -> AsyncGenerator["ResourceObject", None]:
+    # Lists the directory tree with several workers and yields the files as soon as they are found.
+    # The output queue is bounded, so the listing stops while the next stages are busy.
+
+    directories: asyncio.Queue = asyncio.Queue()
+    files: asyncio.Queue = asyncio.Queue(queue_size)
+
+    async def worker() -> None:
+        while True:
+            directory = await directories.get()
+
+            try:
+                async for item in await yadisk.listdir(directory, **kwargs):
+                    if item.type == "dir":
+                        if recursive:
+                            directories.put_nowait(item.path)
+                    else:
+                        await files.put(item)
+            finally:
+                directories.task_done()
+
+    async def walk() -> None:
+        workers = [asyncio.ensure_future(worker()) for _ in range(max_concurrency)]
+        join = asyncio.ensure_future(directories.join())
+
+        try:
+            # Stop as soon as the whole tree has been listed or any of the workers has failed
+            await asyncio.wait([join, *workers], return_when=asyncio.FIRST_COMPLETED)
+
+            for task in workers:
+                if task.done():
+                    task.result()
+
+            await files.put(_END)
+        except BaseException:
+            # The remaining files are dropped, there must be room for the end marker
+            while True:
+                try:
+                    files.put_nowait(_END)
+                    break
+                except asyncio.QueueFull:
+                    files.get_nowait()
+
+            raise
+        finally:
+            join.cancel()
+
+            for task in workers:
+                task.cancel()
+
+    directories.put_nowait(path)
+    walk_task = asyncio.ensure_future(walk())
+
+    try:
+        while True:
+            item = await files.get()
+
+            if item is _END:
+                break
+
+            yield item
+
+        await walk_task
+    finally:
+        walk_task.cancel()
+
+class _Stage:
+    def __init__(self, func: Callable[[Any], Any], concurrency: int, queue_size: int):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.func = func
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+
+    async def apply(self, item: Any) -> Any:
+        result = self.func(item)
+
+        if inspect.isawaitable(result):
+            result = await result
+
+        return result
+
+class Pipeline:
+    """
+        Processes resources in stages, e.g., list a directory tree, filter
+        the files, download them and process the downloaded data.
+        Each stage has its own number of workers, and the stages are connected
+        with bounded queues: when a stage falls behind, the previous ones wait,
+        so the memory usage doesn't depend on the number of items.
+
+        Stages are added with :any:`Pipeline.filter`, :any:`Pipeline.map`,
+        :any:`Pipeline.download` and :any:`Pipeline.stream`, each of them returns
+        the pipeline itself. Nothing runs until the pipeline is iterated over
+        (or :any:`Pipeline.run` is called). The output is not ordered.
+        If any stage raises an exception, the whole pipeline is stopped and
+        the exception is propagated to the consumer.
+
+        .. code:: python
+
+            pipeline = (yadisk_async.pipeline.Pipeline.walk(y, "/Photos")
+                        .filter(yadisk_async.pipeline.match(media_type="image"))
+                        .download("photos", relative_to="/Photos", concurrency=8))
+
+            async for resource, local_path in pipeline:
+                print(local_path)
+
+        :param yadisk: :any:`YaDisk`, used by the transfer stages
+        :param source: iterable or async iterable, input of the first stage
+        :param queue_size: `int`, default capacity of the queues between the stages
+
+        :raises ValueError: `queue_size` is less than 1
+    """
+
+    def __init__(self,
+                 yadisk: "YaDisk",
+                 source: Union[Iterable, AsyncIterable], /,
+                 queue_size: int = 100):
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+
+        self.yadisk = yadisk
+        self.source = source
+        self.queue_size = queue_size
+
+        self._stages: List[_Stage] = []
+
+    @classmethod
+    def walk(cls,
+             yadisk: "YaDisk",
+             path: str, /,
+             recursive: bool = True,
+             max_concurrency: int = 4,
+             queue_size: int = 100,
+             **kwargs) -> "Pipeline":
+        """
+            Make a pipeline of the files in a directory, listed with :any:`YaDisk.listdir`.
+            Directories are not passed on, with `recursive=True` their contents are listed too.
+
+            :param yadisk: :any:`YaDisk`
+            :param path: path to the directory
+            :param recursive: `bool`, list the subdirectories too
+            :param max_concurrency: `int`, maximum number of directories listed at the same time
+            :param queue_size: `int`, default capacity of the queues between the stages
+            :param kwargs: additional parameters for :any:`YaDisk.listdir` (e.g., `fields`, `timeout`)
+
+            :returns: :any:`Pipeline`
+        """
+
+        return cls(yadisk, _walk(yadisk, path, recursive, max_concurrency, queue_size, kwargs),
+                   queue_size=queue_size)
+
+    @classmethod
+    def files(cls, yadisk: "YaDisk", /, queue_size: int = 100, **kwargs) -> "Pipeline":
+        """
+            Make a pipeline of all the files on Disk, listed with :any:`YaDisk.get_files`.
+
+            :param yadisk: :any:`YaDisk`
+            :param queue_size: `int`, default capacity of the queues between the stages
+            :param kwargs: additional parameters for :any:`YaDisk.get_files`
+                           (e.g., `media_type` to filter the files on the server side)
+
+            :returns: :any:`Pipeline`
+        """
+
+        return cls(yadisk, yadisk.get_files(**kwargs), queue_size=queue_size)
+
+    def _add_stage(self, func: Callable[[Any], Any],
+                   concurrency: int, queue_size: Optional[int]) -> "Pipeline":
+        if queue_size is None:
+            queue_size = self.queue_size
+
+        self._stages.append(_Stage(func, concurrency, queue_size))
+
+        return self
+
+    def map(self,
+            func: Callable[[Any], Any], /,
+            concurrency: int = 1,
+            queue_size: Optional[int] = None) -> "Pipeline":
+        """
+            Add a stage that passes on the results of `func` for each item.
+
+            :param func: function or coroutine function that accepts an item
+            :param concurrency: `int`, number of workers of the stage
+            :param queue_size: `int` or `None`, capacity of the output queue of the stage
+
+            :raises ValueError: `concurrency` is less than 1
+
+            :returns: the pipeline itself
+        """
+
+        return self._add_stage(func, concurrency, queue_size)
+
+    def filter(self,
+               predicate: Callable[[Any], Any], /,
+               concurrency: int = 1,
+               queue_size: Optional[int] = None) -> "Pipeline":
+        """
+            Add a stage that only passes on the items for which `predicate` returns `True`.
+
+            :param predicate: function or coroutine function that accepts an item,
+                              see also :any:`match`
+            :param concurrency: `int`, number of workers of the stage
+            :param queue_size: `int` or `None`, capacity of the output queue of the stage
+
+            :raises ValueError: `concurrency` is less than 1
+
+            :returns: the pipeline itself
+        """
+
+        async def apply(item: Any) -> Any:
+            keep = predicate(item)
+
+            if inspect.isawaitable(keep):
+                keep = await keep
+
+            return item if keep else _SKIP
+
+        return self._add_stage(apply, concurrency, queue_size)
+
+    def download(self,
+                 local_dir: str, /,
+                 relative_to: Optional[str] = None,
+                 concurrency: int = 4,
+                 queue_size: Optional[int] = None,
+                 **kwargs) -> "Pipeline":
+        """
+            Add a stage that downloads each :any:`ResourceObject` with :any:`YaDisk.download`.
+            Passes on `(resource, local_path)` tuples.
+
+            :param local_dir: `str`, local directory to download the files to
+            :param relative_to: `str` or `None`, remote directory the files are in. The files keep
+                                their paths relative to it, `None` means that the files are downloaded
+                                right into `local_dir`.
+            :param concurrency: `int`, number of workers of the stage
+            :param queue_size: `int` or `None`, capacity of the output queue of the stage
+            :param kwargs: additional parameters for :any:`YaDisk.download`
+
+            :raises ValueError: `concurrency` is less than 1
+
+            :returns: the pipeline itself
+        """
+
+        base_path = None if relative_to is None else _strip_disk_prefix(relative_to)
+
+        async def apply(resource: "ResourceObject") -> Tuple["ResourceObject", str]:
+            path = _strip_disk_prefix(resource.path)
+
+            if base_path is None:
+                local_path = os.path.join(local_dir, resource.name)
+            else:
+                local_path = os.path.join(local_dir, *posixpath.relpath(path, base_path).split("/"))
+
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, partial(os.makedirs, os.path.dirname(local_path) or ".", exist_ok=True))
+
+            await self.yadisk.download(path, local_path, **kwargs)
+
+            return resource, local_path
+
+        return self._add_stage(apply, concurrency, queue_size)
+
+    def stream(self,
+               process: Callable[["ResourceObject", AsyncIterable[bytes]], Any], /,
+               concurrency: int = 4,
+               queue_size: Optional[int] = None,
+               **kwargs) -> "Pipeline":
+        """
+            Add a stage that downloads each :any:`ResourceObject` with :any:`YaDisk.download_stream`,
+            without saving it. The chunks are given to `process`, its results are passed on.
+
+            :param process: coroutine function that accepts a :any:`ResourceObject`
+                            and an async iterable of `bytes`
+            :param concurrency: `int`, number of workers of the stage
+            :param queue_size: `int` or `None`, capacity of the output queue of the stage
+            :param kwargs: additional parameters for :any:`YaDisk.download_stream`
+
+            :raises ValueError: `concurrency` is less than 1
+
+            :returns: the pipeline itself
+        """
+
+        async def apply(resource: "ResourceObject") -> Any:
+            return await process(resource, self.yadisk.download_stream(resource.path, **kwargs))
+
+        return self._add_stage(apply, concurrency, queue_size)
+
+    def __aiter__(self) -> AsyncGenerator[Any, None]:
+        return self._run()
+
+    async def run(self) -> int:
+        """
+            Run the pipeline, discarding the output.
+
+            :returns: `int`, number of items that came out of the last stage
+        """
+
+        n_items = 0
+
+        async for _ in self:
+            n_items += 1
+
+        return n_items
+
+    async def _run(self) -> AsyncGenerator[Any, None]:
+        loop = asyncio.get_running_loop()
+        failure = loop.create_future()
+        tasks: List[asyncio.Task] = []
+
+        queues = [asyncio.Queue(self.queue_size)]
+        queues.extend(asyncio.Queue(stage.queue_size) for stage in self._stages)
+
+        async def feed(output_queue: asyncio.Queue) -> None:
+            if hasattr(self.source, "__aiter__"):
+                try:
+                    async for item in self.source:
+                        await output_queue.put(item)
+                finally:
+                    # Stop the source (e.g., the listing workers) if the pipeline is stopped early
+                    if hasattr(self.source, "aclose"):
+                        await self.source.aclose()
+            else:
+                for item in self.source:
+                    await output_queue.put(item)
+
+            await output_queue.put(_END)
+
+        n_running = [stage.concurrency for stage in self._stages]
+
+        async def work(index: int, input_queue: asyncio.Queue, output_queue: asyncio.Queue) -> None:
+            stage = self._stages[index]
+
+            while True:
+                item = await input_queue.get()
+
+                if item is _END:
+                    # Leave the end marker for the other workers of the stage,
+                    # the last one passes it on
+                    input_queue.put_nowait(_END)
+                    n_running[index] -= 1
+
+                    if not n_running[index]:
+                        await output_queue.put(_END)
+
+                    return
+
+                result = await stage.apply(item)
+
+                if result is not _SKIP:
+                    await output_queue.put(result)
+
+        def on_done(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None and not failure.done():
+                failure.set_exception(task.exception())
+
+        def start(coro: Any) -> None:
+            task = loop.create_task(coro)
+            task.add_done_callback(on_done)
+            tasks.append(task)
+
+        start(feed(queues[0]))
+
+        for index, stage in enumerate(self._stages):
+            for _ in range(stage.concurrency):
+                start(work(index, queues[index], queues[index + 1]))
+
+        output = queues[-1]
+
+        try:
+            while True:
+                get = loop.create_task(output.get())
+
+                try:
+                    await asyncio.wait([get, failure], return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    if not get.done():
+                        get.cancel()
+
+                if failure.done():
+                    failure.result()
+
+                item = get.result()
+
+                if item is _END:
+                    break
+
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            if failure.done():
+                # Mark the exception as retrieved
+                failure.exception()
+            else:
+                failure.cancel()
@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from functools import partial
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import pickle
+import time
+
+import aiohttp
+
+from .batch import JobResult
+from .exceptions import WorkerDiedError
+from .objects import YaDiskObject
+from .yadisk import YaDisk
+
+from typing import Any, Optional, Union
+from .compat import AsyncGenerator, AsyncIterable, Callable, Dict, Iterable, List, Set
+
+__all__ = ["ProcessJob", "ProcessTransferExecutor"]
+
+# Only the requests to this host are subject to the shared rate limit,
+# uploads and downloads are not
+_API_HOST = "cloud-api.yandex.net"
+
+# Maximum time the parent waits for messages from the workers at once, in seconds
+_POLL_INTERVAL = 0.5
+
+# Number of seconds the workers are given to exit after being terminated, before they are killed
+_SHUTDOWN_TIMEOUT = 5.0
+
+_JOB_KINDS = {"upload", "download", "listdir"}
+
+class ProcessJob:
+    """
+        A single job for :any:`ProcessTransferExecutor`.
+        Everything in the job is sent to a worker process, so it must be picklable:
+        sources and destinations must be paths, not file objects.
+
+        :param kind: `str`, `"upload"`, `"download"` or `"listdir"`
+        :param src: source path (local for uploads, remote otherwise)
+        :param dst: destination path, not used by `"listdir"`
+        :param kwargs: extra arguments for :any:`YaDisk.upload`, :any:`YaDisk.download`
+                       or :any:`YaDisk.listdir`
+
+        :raises ValueError: unknown kind
+
+        :ivar kind: `str`, kind of the job
+        :ivar src: source path
+        :ivar dst: destination path
+        :ivar kwargs: `dict`, extra arguments
+        :ivar attempts: `int`, number of workers the job has been started by
+    """
+
+    kind: str
+    src: Any
+    dst: Any
+    kwargs: Dict[str, Any]
+    attempts: int
+
+    def __init__(self, kind: str, src: Any, dst: Any = None, /, **kwargs):
+        if kind not in _JOB_KINDS:
+            raise ValueError("kind must be one of 'upload', 'download' or 'listdir'")
+
+        self.kind = kind
+        self.src = src
+        self.dst = dst
+        self.kwargs = kwargs
+        self.attempts = 0
+
+    def __repr__(self) -> str:
+        if self.kind == "listdir":
+            return f"<{self.__class__.__name__}: listdir {self.src!r}>"
+
+        return f"<{self.__class__.__name__}: {self.kind} {self.src!r} -> {self.dst!r}>"
+
+def _to_plain(value: Any) -> Any:
+    # YaDisk objects hold references to YaDisk and can't be pickled
+    if isinstance(value, YaDiskObject):
+        return {field: _to_plain(value[field]) for field in value.FIELDS}
+
+    if isinstance(value, list):
+        return [_to_plain(x) for x in value]
+
+    return value
+
+def _picklable_exception(exc: BaseException) -> BaseException:
+    # YaDiskError keeps the response, which can't be pickled
+    if getattr(exc, "response", None) is not None:
+        exc.response = None
+
+    try:
+        pickle.dumps(exc)
+    except Exception:
+        return Exception(f"{exc.__class__.__name__}: {exc}")
+
+    return exc
+
+class _SharedRateLimiter:
+    """
+        Rate limiter shared by several processes: the time of the next free slot
+        is kept in shared memory. It relies on :any:`time.monotonic` being
+        the same clock in all the processes.
+
+        :param next_time: shared `multiprocessing.Value` of type `"d"`
+        :param rate: `float`, maximum number of requests per second
+    """
+
+    def __init__(self, next_time: Any, rate: float):
+        self._next_time = next_time
+        self.rate = rate
+
+    async def acquire(self) -> None:
+        with self._next_time.get_lock():
+            now = time.monotonic()
+            start = max(now, self._next_time.value)
+            self._next_time.value = start + 1.0 / self.rate
+
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def make_trace_config(self) -> aiohttp.TraceConfig:
+        async def on_request_start(session, trace_config_ctx, params) -> None:
+            if params.url.host == _API_HOST:
+                await self.acquire()
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+
+        return trace_config
+
+class _WorkerYaDisk(YaDisk):
+    def __init__(self, *args, rate_limiter: Optional[_SharedRateLimiter] = None, **kwargs):
+        YaDisk.__init__(self, *args, **kwargs)
+
+        self._rate_limiter = rate_limiter
+
+    def _make_trace_configs(self, token: str) -> List[aiohttp.TraceConfig]:
+        trace_configs = YaDisk._make_trace_configs(self, token)
+
+        if self._rate_limiter is not None:
+            trace_configs.append(self._rate_limiter.make_trace_config())
+
+        return trace_configs
+
+async def _run_worker(yadisk_args: Dict[str, Any],
+                      jobs: Any,
+                      results: Any,
+                      next_time: Any,
+                      max_requests_per_second: Optional[float],
+                      report_progress: bool) -> None:
+    loop = asyncio.get_running_loop()
+
+    rate_limiter = None
+
+    if max_requests_per_second is not None:
+        rate_limiter = _SharedRateLimiter(next_time, max_requests_per_second)
+
+    tasks: Set[asyncio.Task] = set()
+
+    async def run_job(job_id: int, kind: str, src: Any, dst: Any, kwargs: Dict[str, Any]) -> None:
+        start = time.monotonic()
+        value = exception = None
+
+        try:
+            if report_progress and kind != "listdir":
+                kwargs["progress"] = lambda progress: results.send(("progress", job_id, progress))
+
+            if kind == "upload":
+                await yadisk.upload(src, dst, **kwargs)
+            elif kind == "download":
+                await yadisk.download(src, dst, **kwargs)
+            else:
+                value = [_to_plain(item) async for item in await yadisk.listdir(src, **kwargs)]
+        except Exception as e:
+            exception = _picklable_exception(e)
+
+        results.send(("done", job_id, value, exception, time.monotonic() - start))
+
+    async with _WorkerYaDisk(rate_limiter=rate_limiter, **yadisk_args) as yadisk:
+        while True:
+            # The parent only sends a job when there's a free slot for it
+            try:
+                message = await loop.run_in_executor(None, jobs.recv)
+            except EOFError:
+                message = None
+
+            if message is None:
+                break
+
+            task = loop.create_task(run_job(*message))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.wait(tasks)
+
+def _worker_main(*args) -> None:
+    asyncio.run(_run_worker(*args))
+
+class _Worker:
+    def __init__(self, process: Any, jobs: Any, results: Any):
+        self.process = process
+        self.jobs = jobs
+        self.results = results
+        self.alive = True
+
+        # Job ID -> start time
+        self.running: Dict[int, float] = {}
+
+class ProcessTransferExecutor:
+    """
+        Runs upload, download and listing jobs in several worker processes.
+        A single process is often limited by the CPU time spent on TLS and JSON
+        long before the network is saturated. Each worker runs its own event loop
+        and its own :any:`YaDisk` object, created with the same ID, secret,
+        token and default arguments as `yadisk`.
+
+        The jobs are not split in advance: the next job is given to the least
+        loaded worker as soon as it has a free slot, so a slow worker never
+        holds a backlog of jobs that the others could run. If a worker dies,
+        its unfinished jobs are given to the remaining workers.
+        Results, progress reports and errors are sent back to the parent process.
+        Listing results are converted to `list` of `dict`, since :any:`ResourceObject`
+        can't be sent between processes.
+
+        The workers are started on first use and are stopped by :any:`ProcessTransferExecutor.close`.
+
+        :param yadisk: :any:`YaDisk`, its `id`, `secret`, `token` and `default_args` are given to the workers
+        :param n_workers: `int`, number of worker processes
+        :param max_concurrency: `int`, maximum number of simultaneous jobs in each worker
+        :param max_requests_per_second: `float` or `None`, maximum rate of API requests of all the workers
+                                        together, `None` means no limit
+        :param max_attempts: `int`, maximum number of workers a job can be given to,
+                             in case they die while running it
+        :param progress: function or coroutine function or `None`, called with
+                         the :any:`ProcessJob` and :any:`TransferProgress` in the parent process
+        :param mp_context: `str` or `None`, multiprocessing start method, `"spawn"` by default
+
+        :raises ValueError: `n_workers` or `max_concurrency` is less than 1
+
+        :ivar elapsed: `float`, duration of the last run in seconds
+    """
+
+    def __init__(self,
+                 yadisk: YaDisk,
+                 n_workers: int = 4,
+                 max_concurrency: int = 8,
+                 max_requests_per_second: Optional[float] = None,
+                 max_attempts: int = 2,
+                 progress: Optional[Callable[[ProcessJob, Any], Any]] = None,
+                 mp_context: Optional[str] = "spawn"):
+        if n_workers < 1:
+            raise ValueError("n_workers must be at least 1")
+
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.yadisk_args = {"id":           yadisk.id,
+                            "secret":       yadisk.secret,
+                            "token":        yadisk.token,
+                            "default_args": yadisk.default_args}
+        self.n_workers = n_workers
+        self.max_concurrency = max_concurrency
+        self.max_requests_per_second = max_requests_per_second
+        self.max_attempts = max_attempts
+        self.progress = progress
+
+        self.elapsed = 0.0
+
+        self._context = multiprocessing.get_context(mp_context)
+        self._workers: List[_Worker] = []
+        self._next_time: Any = None
+        self._running = False
+
+    async def __aenter__(self) -> "ProcessTransferExecutor":
+        return self
+
+    async def __aexit__(self, *args, **kwargs) -> None:
+        await self.close()
+
+    def _start(self) -> None:
+        if self._workers:
+            return
+
+        self._next_time = self._context.Value("d", 0.0)
+
+        # Every worker has its own pipes, so that a worker that dies
+        # can't leave a shared queue locked
+        for _ in range(self.n_workers):
+            jobs_reader, jobs_writer = self._context.Pipe(duplex=False)
+            results_reader, results_writer = self._context.Pipe(duplex=False)
+
+            process = self._context.Process(
+                target=_worker_main,
+                args=(self.yadisk_args, jobs_reader, results_writer, self._next_time,
+                      self.max_requests_per_second, self.progress is not None),
+                daemon=True)
+            process.start()
+
+            jobs_reader.close()
+            results_writer.close()
+
+            self._workers.append(_Worker(process, jobs_writer, results_reader))
+
+    async def _report_progress(self, job: ProcessJob, progress: Any) -> None:
+        assert self.progress is not None
+
+        result = self.progress(job, progress)
+
+        if asyncio.iscoroutine(result):
+            await result
+
+    @staticmethod
+    def _wait_for_messages(workers: List[_Worker], timeout: float) -> List[Any]:
+        objects = [worker.results for worker in workers] + [worker.process.sentinel for worker in workers]
+
+        return multiprocessing.connection.wait(objects, timeout)
+
+    async def iter_results(self, jobs: Union[Iterable, AsyncIterable]) -> AsyncGenerator[JobResult, None]:
+        """
+            Run the jobs and yield their results as soon as they complete.
+            A failed job doesn't affect the rest of the jobs.
+            Only one run can be in progress at a time.
+
+            :param jobs: iterable or async iterable of :any:`ProcessJob`
+
+            :raises RuntimeError: another run is in progress or all the workers have died
+
+            :returns: async generator of :any:`JobResult`
+        """
+
+        if self._running:
+            raise RuntimeError("ProcessTransferExecutor is already running")
+
+        self._running = True
+        self._start()
+
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+
+        counter = itertools.count()
+        pending: Dict[int, ProcessJob] = {}
+        # Jobs that are waiting for a free slot, e.g. the ones of dead workers
+        backlog: List[int] = []
+
+        is_async = hasattr(jobs, "__aiter__")
+        job_iter: Any = jobs.__aiter__() if is_async else iter(jobs)
+        exhausted = False
+
+        async def next_job() -> Optional[int]:
+            nonlocal exhausted
+
+            if backlog:
+                return backlog.pop(0)
+
+            if exhausted:
+                return None
+
+            try:
+                job = await job_iter.__anext__() if is_async else next(job_iter)
+            except (StopIteration, StopAsyncIteration):
+                exhausted = True
+                return None
+
+            job_id = next(counter)
+            pending[job_id] = job
+
+            return job_id
+
+        def dispatch(worker: _Worker, job_id: int) -> bool:
+            job = pending[job_id]
+
+            try:
+                worker.jobs.send((job_id, job.kind, job.src, job.dst, dict(job.kwargs)))
+            except OSError:
+                # The worker has died since it was checked, the job is given to another one
+                worker.alive = False
+                backlog.insert(0, job_id)
+
+                return False
+
+            job.attempts += 1
+            worker.running[job_id] = time.monotonic()
+
+            return True
+
+        try:
+            while True:
+                alive = [worker for worker in self._workers if worker.alive]
+
+                if not alive:
+                    if pending:
+                        raise RuntimeError("All the worker processes have died")
+
+                    break
+
+                # Fill the free slots, least loaded workers first
+                while True:
+                    worker = min(alive, key=lambda worker: len(worker.running))
+
+                    if len(worker.running) >= self.max_concurrency:
+                        break
+
+                    job_id = await next_job()
+
+                    if job_id is None:
+                        break
+
+                    if not dispatch(worker, job_id):
+                        # Its running jobs are reassigned below, the slots are filled on the next pass
+                        break
+
+                if not pending and exhausted:
+                    break
+
+                ready = await loop.run_in_executor(
+                    None, partial(self._wait_for_messages, alive, _POLL_INTERVAL))
+
+                for worker in alive:
+                    messages = []
+
+                    try:
+                        while worker.results.poll():
+                            messages.append(worker.results.recv())
+                    except (EOFError, OSError):
+                        worker.alive = False
+
+                    if worker.process.sentinel in ready:
+                        worker.alive = False
+
+                    for message in messages:
+                        if message[0] == "progress":
+                            _, job_id, progress = message
+
+                            if job_id in pending and self.progress is not None:
+                                await self._report_progress(pending[job_id], progress)
+                        elif message[0] == "done":
+                            _, job_id, value, exception, duration = message
+
+                            worker.running.pop(job_id, None)
+                            job = pending.pop(job_id, None)
+
+                            if job is not None:
+                                self.elapsed = time.monotonic() - start
+
+                                yield JobResult(job, value, exception, duration=duration)
+
+                    if worker.alive:
+                        continue
+
+                    # Give the unfinished jobs of the dead worker to the remaining ones
+                    for job_id, started_at in worker.running.items():
+                        job = pending[job_id]
+
+                        if job.attempts < self.max_attempts:
+                            backlog.append(job_id)
+                        else:
+                            del pending[job_id]
+
+                            yield JobResult(job, exception=WorkerDiedError("Worker process died while running the job"),
+                                            duration=time.monotonic() - started_at)
+
+                    worker.running.clear()
+        finally:
+            self.elapsed = time.monotonic() - start
+            self._running = False
+
+            if pending or any(not worker.alive for worker in self._workers):
+                # Jobs of this run may still be running, the workers can't be reused
+                await self.close()
+
+    async def run(self, jobs: Union[Iterable, AsyncIterable]) -> List[JobResult]:
+        """
+            Run the jobs and wait for all of them to complete.
+            A failed job doesn't affect the rest of the jobs.
+
+            :param jobs: iterable or async iterable of :any:`ProcessJob`
+
+            :raises RuntimeError: another run is in progress or all the workers have died
+
+            :returns: `list` of :any:`JobResult` in the order of completion
+        """
+
+        return [result async for result in self.iter_results(jobs)]
+
+    async def close(self) -> None:
+        """Stop the worker processes. Jobs that are still running are interrupted."""
+
+        workers, self._workers = self._workers, []
+
+        if not workers:
+            return
+
+        loop = asyncio.get_running_loop()
+
+        for worker in workers:
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+        for worker in workers:
+            await loop.run_in_executor(None, worker.process.join, _SHUTDOWN_TIMEOUT)
+
+            if worker.process.is_alive():
+                worker.process.kill()
+                await loop.run_in_executor(None, worker.process.join)
+
+            worker.jobs.close()
+            worker.results.close()
+
+        self._next_time = None
@@ -5,6 +5,12 @@ import aiohttp
 
 from .common import CaseInsensitiveDict
 
+from typing import Optional, TYPE_CHECKING
+from .compat import Callable, Awaitable
+
+if TYPE_CHECKING:
+    from .transfers import ConnectionStats
+
 __all__ = ["SessionWithHeaders"]
 
 DEFAULT_USER_AGENT = "Python/%s.%s aiohttp/%s" % (sys.version_info.major,
@@ -12,12 +18,105 @@ DEFAULT_USER_AGENT = "Python/%s.%s aiohttp/%s" % (sys.version_info.major,
                                                   aiohttp.__version__)
 
 
+async def _on_request_chunk_sent(session, trace_config_ctx, params) -> None:
+    # Lets upload functions observe the request body as it's being sent,
+    # regardless of how aiohttp produces it
+    on_chunk = getattr(trace_config_ctx.trace_request_ctx, "on_chunk", None)
+
+    if on_chunk is not None:
+        await on_chunk(params.chunk)
+
+def _make_trace_config() -> aiohttp.TraceConfig:
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_chunk_sent.append(_on_request_chunk_sent)
+
+    return trace_config
+
+async def _on_request_start(session, trace_config_ctx, params) -> None:
+    trace_config_ctx.host = params.url.host
+
+def _make_connection_trace_config(stats: "ConnectionStats") -> aiohttp.TraceConfig:
+    async def on_connection_create_end(session, trace_config_ctx, params) -> None:
+        stats._add_handshake(getattr(trace_config_ctx, "host", None))
+
+    async def on_connection_reuseconn(session, trace_config_ctx, params) -> None:
+        stats._add_reused(getattr(trace_config_ctx, "host", None))
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+
+    return trace_config
+
+class _TransferConnector(aiohttp.TCPConnector):
+    """
+        Connector for upload and download hosts.
+        Unlike the regular one, it doesn't keep more than `max_idle` idle connections
+        in total: the ones that have been idle for the longest time are closed first.
+        The upload and download servers are picked at random, so without this limit
+        the pool would fill up with connections that will never be reused.
+
+        :param max_idle: `int`, maximum number of idle connections
+    """
+
+    def __init__(self, *args, max_idle: int = 8, **kwargs):
+        aiohttp.TCPConnector.__init__(self, *args, **kwargs)
+
+        self._max_idle = max_idle
+
+    def _release(self, *args, **kwargs) -> None:
+        aiohttp.TCPConnector._release(self, *args, **kwargs)
+
+        self._evict_idle()
+
+    def _evict_idle(self) -> None:
+        conns = getattr(self, "_conns", None)
+
+        if conns is None:
+            return
+
+        n_idle = sum(len(idle) for idle in conns.values())
+
+        while n_idle > self._max_idle:
+            # Each list is ordered by the time the connection was released
+            key = min((key for key, idle in conns.items() if idle), key=lambda key: conns[key][0][1])
+            protocol = conns[key][0][0]
+
+            del conns[key][0]
+
+            if not conns[key]:
+                del conns[key]
+
+            protocol.close()
+            n_idle -= 1
+
 class SessionWithHeaders(aiohttp.ClientSession):
-    """Just like your regular :any:`aiohttp.ClientSession` but with headers"""
+    """
+        Just like your regular :any:`aiohttp.ClientSession` but with headers
+
+        :ivar on_unauthorized: coroutine function or `None`, called by API requests
+                               with the rejected `Authorization` header when they fail
+                               with HTTP code 401. Returns a new `Authorization` header
+                               to replay the request with or `None`.
+        :ivar on_throttled: function or `None`, called by API requests when they fail
+                            with HTTP code 429. Returns another session to immediately
+                            retry the request with or `None`.
+    """
+
+    ATTRS = aiohttp.ClientSession.ATTRS | frozenset(["on_unauthorized", "on_throttled"])
+
+    on_unauthorized: Optional[Callable[[Optional[str]], Awaitable[Optional[str]]]]
+    on_throttled: Optional[Callable[[], Optional["SessionWithHeaders"]]]
 
     def __init__(self, *args, **kwargs):
+        kwargs["trace_configs"] = list(kwargs.get("trace_configs") or []) + [_make_trace_config()]
+
         aiohttp.ClientSession.__init__(self, *args, **kwargs)
 
+        self.on_unauthorized = None
+        self.on_throttled = None
+
         self.headers.update(CaseInsensitiveDict({
             "User-Agent": DEFAULT_USER_AGENT,
             "Accept-Encoding": ", ".join(("gzip", "deflate")),
@@ -3,7 +3,13 @@
 import aiohttp
 
 __all__ = ["DEFAULT_TIMEOUT", "DEFAULT_N_RETRIES", "DEFAULT_UPLOAD_TIMEOUT",
-           "DEFAULT_UPLOAD_RETRY_INTERVAL"]
+           "DEFAULT_UPLOAD_RETRY_INTERVAL", "DEFAULT_DOWNLOAD_CHUNK_SIZE",
+           "DEFAULT_SPOOL_MAX_MEMORY", "DEFAULT_TRANSFER_KEEP_ALIVE",
+           "DEFAULT_TRANSFER_POOL_MAX_IDLE", "DEFAULT_TRANSFER_KEEPALIVE_TIMEOUT",
+           "DEFAULT_STALL_MIN_RATE", "DEFAULT_STALL_WINDOW",
+           "DEFAULT_PROGRESS_INTERVAL", "DEFAULT_OPERATION_POLL_INTERVAL",
+           "DEFAULT_OPERATION_MAX_POLL_INTERVAL", "DEFAULT_TOKEN_REFRESH_MARGIN",
+           "DEFAULT_TOKEN_QUARANTINE_TIME"]
 
 # `tuple` of 2 numbers (`int` or float`), default timeout for requests.
 # First number is the connect timeout, the second one is the read timeout.
@@ -20,3 +26,43 @@ DEFAULT_UPLOAD_TIMEOUT = DEFAULT_TIMEOUT
 
 # Analogous to `DEFAULT_RETRY_INTERVAL` but for `upload` function
 DEFAULT_UPLOAD_RETRY_INTERVAL = 0.0
+
+# `int`, default chunk size for `download_stream` and related functions
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# `int`, maximum number of bytes `upload` keeps in memory when spooling
+# a non-seekable source, the rest goes to a temporary file
+DEFAULT_SPOOL_MAX_MEMORY = 16 * 1024 * 1024
+
+# `bool`, keep connections to upload and download hosts alive by default
+DEFAULT_TRANSFER_KEEP_ALIVE = False
+
+# `int`, maximum number of idle keep-alive connections to upload and download hosts
+DEFAULT_TRANSFER_POOL_MAX_IDLE = 8
+
+# `float`, number of seconds an idle connection to an upload or download host is kept alive
+DEFAULT_TRANSFER_KEEPALIVE_TIMEOUT = 15.0
+
+# `float` or `None`, minimum transfer rate (in bytes per second) for `upload` and `download`.
+# A transfer that is slower than that for `DEFAULT_STALL_WINDOW` seconds is aborted
+# and retried. `None` disables the check
+DEFAULT_STALL_MIN_RATE = None
+
+# `float`, number of seconds the transfer rate is measured over
+DEFAULT_STALL_WINDOW = 30.0
+
+# `float`, minimum number of seconds between calls of the `progress` callback
+DEFAULT_PROGRESS_INTERVAL = 0.5
+
+# `float`, initial delay between status polls in `wait_for_operation`
+DEFAULT_OPERATION_POLL_INTERVAL = 0.25
+
+# `float`, maximum delay between status polls in `wait_for_operation`
+DEFAULT_OPERATION_MAX_POLL_INTERVAL = 10.0
+
+# `float`, number of seconds before the expiration `TokenManager` refreshes the token at
+DEFAULT_TOKEN_REFRESH_MARGIN = 600.0
+
+# `float`, number of seconds a throttled token of `TokenPool` is not used for,
+# doubled with every consecutive throttled request
+DEFAULT_TOKEN_QUARANTINE_TIME = 5.0
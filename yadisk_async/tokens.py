@@ -0,0 +1,596 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import inspect
+import itertools
+import time
+from collections import OrderedDict
+
+import aiohttp
+
+from . import settings
+from .exceptions import RetriableYaDiskError
+from .compat import Awaitable, Callable, Dict, Iterable, List, Tuple, TimeoutError
+
+from typing import Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .yadisk import YaDisk
+    from .objects import TokenObject
+
+__all__ = ["TokenManager", "TokenPool", "TokenStats", "TokenValidityCache"]
+
+# Delay before retrying a failed background refresh
+_REFRESH_RETRY_INTERVAL = 5.0
+
+# Weight of the latest request in the error rate of a pooled token
+_ERROR_RATE_SMOOTHING = 0.1
+
+# Number of replaced tokens remembered, so that requests that were sent
+# with them can be replayed without refreshing once again
+_MAX_OLD_TOKENS = 8
+
+class TokenManager:
+    """
+        Keeps the token of a :any:`YaDisk` object fresh.
+        The token is refreshed with :any:`YaDisk.refresh_token` in the background,
+        `refresh_margin` seconds before it expires. Concurrent refreshes are
+        coalesced into one. API requests that fail with :any:`UnauthorizedError`
+        are replayed once with the new token after the refresh completes.
+
+        To use it, assign it to :any:`YaDisk.token_manager`. The manager must only
+        be used from one event loop, the background task is started by the first
+        request and stopped by :any:`YaDisk.close`.
+
+        :param yadisk: :any:`YaDisk`, its `token` is the current access token and is updated on refresh.
+                       `id` and `secret` must be set.
+        :param refresh_token: `str`, the refresh token that was received with the access token
+        :param expires_in: `float` or `None`, number of seconds before the current access token expires,
+                           `None` means it's unknown and the token is only refreshed when it's rejected
+        :param refresh_margin: `float` or `None`, number of seconds before the expiration to refresh the token at,
+                               defaults to `settings.DEFAULT_TOKEN_REFRESH_MARGIN`
+        :param on_refresh: function or coroutine function or `None`, called with the new :any:`TokenObject`
+                           after each refresh (e.g., to save it)
+        :param kwargs: additional parameters for :any:`YaDisk.refresh_token`
+                       (e.g., `timeout`, `headers`)
+
+        :ivar refresh_token: `str`, the current refresh token
+        :ivar expires_at: `float` or `None`, time (as in :any:`time.monotonic`) the access token expires at,
+                          reset to `None` if the background refresh fails permanently
+    """
+
+    refresh_token: str
+    expires_at: Optional[float]
+
+    def __init__(self,
+                 yadisk: "YaDisk",
+                 refresh_token: str, /,
+                 expires_in: Optional[float] = None,
+                 refresh_margin: Optional[float] = None,
+                 on_refresh: Optional[Callable[["TokenObject"], Any]] = None,
+                 **kwargs):
+        if refresh_margin is None:
+            refresh_margin = settings.DEFAULT_TOKEN_REFRESH_MARGIN
+
+        self.yadisk = yadisk
+        self.refresh_token = refresh_token
+        self.expires_at = None if expires_in is None else time.monotonic() + expires_in
+        self.refresh_margin = refresh_margin
+        self.on_refresh = on_refresh
+        self.kwargs = kwargs
+
+        self._old_tokens: List[str] = []
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._n_refreshes = 0
+
+    @property
+    def access_token(self) -> str:
+        """`str`, the current access token"""
+
+        return self.yadisk.token
+
+    @property
+    def n_refreshes(self) -> int:
+        """`int`, number of successful refreshes so far"""
+
+        return self._n_refreshes
+
+    async def refresh(self) -> "TokenObject":
+        """
+            Refresh the token now.
+            If a refresh is already in progress, waits for it instead of starting another one.
+
+            :raises BadRequestError: invalid or expired refresh token, application ID or secret
+
+            :returns: :any:`TokenObject`
+        """
+
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh())
+
+        # The task is shared with other callers, so it's not cancelled with this one
+        return await asyncio.shield(self._refresh_task)
+
+    def start(self) -> None:
+        """
+            Start refreshing the token in the background.
+            Does nothing if it's already started or if there's no running event loop.
+        """
+
+        if self._task is not None and not self._task.done():
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop refreshing the token in the background."""
+
+        tasks = [task for task in (self._task, self._refresh_task) if task is not None]
+        self._task = self._refresh_task = None
+
+        for task in tasks:
+            task.cancel()
+
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def _refresh(self) -> "TokenObject":
+        token = await self.yadisk.refresh_token(self.refresh_token, **self.kwargs)
+
+        if token.access_token != self.yadisk.token:
+            self._old_tokens.append(self.yadisk.token)
+            del self._old_tokens[:-_MAX_OLD_TOKENS]
+
+        self.yadisk.token = token.access_token
+
+        if token.refresh_token:
+            self.refresh_token = token.refresh_token
+
+        self.expires_at = None if token.expires_in is None else time.monotonic() + token.expires_in
+        self._n_refreshes += 1
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+        if self.on_refresh is not None:
+            result = self.on_refresh(token)
+
+            if inspect.isawaitable(result):
+                await result
+
+        return token
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+
+        while True:
+            self._wakeup.clear()
+
+            if self.expires_at is None:
+                await self._wakeup.wait()
+                continue
+
+            delay = self.expires_at - self.refresh_margin - time.monotonic()
+
+            if delay > 0:
+                # Sleep until the refresh is due, unless the token gets refreshed elsewhere
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except TimeoutError:
+                    pass
+
+                continue
+
+            try:
+                await self.refresh()
+            except (aiohttp.ClientError, TimeoutError, RetriableYaDiskError):
+                await asyncio.sleep(_REFRESH_RETRY_INTERVAL)
+            except Exception:
+                # The refresh token doesn't work. Stop refreshing in the background
+                # until a refresh succeeds elsewhere (e.g., a manual refresh()).
+                # The task keeps waiting, so that start() doesn't restart it on every request
+                self.expires_at = None
+
+    async def _handle_unauthorized(self, token: str) -> Optional[str]:
+        """
+            Called when a request with `token` has been rejected.
+
+            :returns: `str`, the token to replay the request with or `None`
+                      if the request should not be replayed
+        """
+
+        if token in self._old_tokens:
+            # The token has been refreshed since the request was sent
+            return self.yadisk.token
+
+        if token != self.yadisk.token:
+            return None
+
+        try:
+            token_object = await self.refresh()
+        except Exception:
+            return None
+
+        return token_object.access_token
+
+class TokenStats:
+    """
+        Request statistics of a token in a :any:`TokenPool`.
+
+        :ivar token: `str`, the token
+        :ivar in_flight: `int`, number of requests currently in progress
+        :ivar n_requests: `int`, total number of requests
+        :ivar n_errors: `int`, number of requests that failed with a server or a connection error
+        :ivar n_throttled: `int`, number of requests rejected with HTTP code 429
+        :ivar error_rate: `float`, recent fraction of failed and throttled requests, from 0 to 1
+        :ivar quarantined_until: `float`, time (as in :any:`time.monotonic`) the token
+                                 is not used until, if it's been throttled
+    """
+
+    token: str
+    in_flight: int
+    n_requests: int
+    n_errors: int
+    n_throttled: int
+    error_rate: float
+    quarantined_until: float
+
+    def __init__(self, token: str, max_requests_per_second: Optional[float] = None):
+        self.token = token
+        self.in_flight = 0
+        self.n_requests = 0
+        self.n_errors = 0
+        self.n_throttled = 0
+        self.error_rate = 0.0
+        self.quarantined_until = 0.0
+
+        self._max_requests_per_second = max_requests_per_second
+        self._budget = max_requests_per_second or 0.0
+        self._budget_time = time.monotonic()
+        self._consecutive_throttles = 0
+        self._last_selected = 0
+
+    @property
+    def is_quarantined(self) -> bool:
+        """`bool`, `True` if the token is temporarily not used because it's been throttled"""
+
+        return self.quarantined_until > time.monotonic()
+
+    @property
+    def remaining_budget(self) -> float:
+        """
+            `float`, number of requests that can be made right now without exceeding
+            `max_requests_per_second` of the pool, `inf` if there's no limit
+        """
+
+        if self._max_requests_per_second is None:
+            return float("inf")
+
+        elapsed = time.monotonic() - self._budget_time
+
+        # The budget refills continuously and can accumulate for up to a second
+        return min(self._budget + elapsed * self._max_requests_per_second,
+                   self._max_requests_per_second)
+
+    def _update_error_rate(self, failed: bool) -> None:
+        self.error_rate += _ERROR_RATE_SMOOTHING * (float(failed) - self.error_rate)
+
+    def _request_started(self) -> None:
+        self._budget = self.remaining_budget - 1
+        self._budget_time = time.monotonic()
+
+        self.in_flight += 1
+        self.n_requests += 1
+
+    def _request_ended(self, status: int, retry_after: Optional[float],
+                       quarantine_time: float, max_quarantine_time: float) -> None:
+        self.in_flight -= 1
+
+        if status == 429:
+            self.n_throttled += 1
+            self._consecutive_throttles += 1
+
+            if retry_after is None:
+                retry_after = quarantine_time * 2 ** (self._consecutive_throttles - 1)
+
+            duration = min(retry_after, max_quarantine_time)
+            self.quarantined_until = max(self.quarantined_until, time.monotonic() + duration)
+            self._update_error_rate(True)
+
+            return
+
+        self._consecutive_throttles = 0
+
+        if status >= 500:
+            self.n_errors += 1
+
+        self._update_error_rate(status >= 500)
+
+    def _request_failed(self) -> None:
+        self.in_flight -= 1
+        self.n_errors += 1
+        self._update_error_rate(True)
+
+    def __repr__(self) -> str:
+        return "<%s in_flight=%d n_requests=%d n_throttled=%d error_rate=%.2f>" % (
+            self.__class__.__name__, self.in_flight, self.n_requests,
+            self.n_throttled, self.error_rate)
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        # HTTP dates are not worth the trouble here
+        return None
+
+class TokenPool:
+    """
+        Spreads API requests across several tokens with access to the same data.
+        Each time :any:`YaDisk.get_session` is called without a token,
+        the pool selects one. Tokens that get throttled (HTTP code 429) are put
+        in quarantine and are not selected until it ends: for `Retry-After`
+        seconds, if the server sends it, otherwise for `quarantine_time` seconds,
+        doubled with every consecutive 429. A throttled API request is retried
+        right away with another token, if there's one that is not in quarantine.
+        If all the tokens are in quarantine, the one that gets out of it first is selected.
+
+        To use it, assign it to :any:`YaDisk.token_pool`.
+        Only the requests made through :any:`YaDisk.get_session` are counted.
+
+        :param tokens: iterable of `str`, the tokens
+        :param strategy: `str`, how to select tokens: `"least_load"` selects the token with
+                         the fewest requests in progress, `"rate_budget"` selects the token that
+                         has the most requests left under `max_requests_per_second`.
+                         Remaining ties are broken by the error rate, then in round-robin order.
+        :param max_requests_per_second: `float` or `None`, request rate each token is expected
+                                        to sustain, `None` means no limit. It's not enforced,
+                                        only used to select tokens.
+        :param quarantine_time: `float` or `None`, quarantine duration after the first 429 in seconds,
+                                defaults to `settings.DEFAULT_TOKEN_QUARANTINE_TIME`
+        :param max_quarantine_time: `float`, maximum quarantine duration in seconds
+
+        :raises ValueError: no tokens or unknown strategy
+    """
+
+    def __init__(self,
+                 tokens: Iterable[str], /,
+                 strategy: str = "least_load",
+                 max_requests_per_second: Optional[float] = None,
+                 quarantine_time: Optional[float] = None,
+                 max_quarantine_time: float = 300.0):
+        if strategy not in {"least_load", "rate_budget"}:
+            raise ValueError("strategy must be either 'least_load' or 'rate_budget'")
+
+        if quarantine_time is None:
+            quarantine_time = settings.DEFAULT_TOKEN_QUARANTINE_TIME
+
+        self.strategy = strategy
+        self.max_requests_per_second = max_requests_per_second
+        self.quarantine_time = quarantine_time
+        self.max_quarantine_time = max_quarantine_time
+
+        self._stats: Dict[str, TokenStats] = {}
+
+        for token in tokens:
+            self._stats.setdefault(token, TokenStats(token, max_requests_per_second))
+
+        if not self._stats:
+            raise ValueError("Token pool must have at least one token")
+
+        self._counter = itertools.count(1)
+
+    @property
+    def tokens(self) -> List[str]:
+        """`list` of `str`, tokens in the pool"""
+
+        return list(self._stats)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._stats
+
+    def stats(self, token: str) -> TokenStats:
+        """
+            Get request statistics of the token.
+
+            :param token: `str`, a token in the pool
+
+            :raises KeyError: the token is not in the pool
+
+            :returns: :any:`TokenStats`
+        """
+
+        return self._stats[token]
+
+    def select(self) -> str:
+        """
+            Select a token for the next request.
+
+            :returns: `str`
+        """
+
+        token = self._select_available()
+
+        if token is not None:
+            return token
+
+        stats = min(self._stats.values(), key=lambda stats: stats.quarantined_until)
+        stats._last_selected = next(self._counter)
+
+        return stats.token
+
+    def _select_available(self) -> Optional[str]:
+        now = time.monotonic()
+        candidates = [stats for stats in self._stats.values() if stats.quarantined_until <= now]
+
+        if not candidates:
+            return None
+
+        if self.strategy == "least_load":
+            stats = min(candidates, key=lambda stats: (stats.in_flight, -stats.remaining_budget,
+                                                       stats.error_rate, stats._last_selected))
+        else:
+            stats = min(candidates, key=lambda stats: (-stats.remaining_budget, stats.in_flight,
+                                                       stats.error_rate, stats._last_selected))
+
+        stats._last_selected = next(self._counter)
+
+        return stats.token
+
+    def _make_trace_config(self, token: str) -> aiohttp.TraceConfig:
+        stats = self._stats[token]
+
+        async def on_request_start(session, trace_config_ctx, params) -> None:
+            stats._request_started()
+
+        async def on_request_end(session, trace_config_ctx, params) -> None:
+            retry_after = _parse_retry_after(params.response.headers.get("Retry-After"))
+            stats._request_ended(params.response.status, retry_after,
+                                 self.quarantine_time, self.max_quarantine_time)
+
+        async def on_request_exception(session, trace_config_ctx, params) -> None:
+            stats._request_failed()
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+
+        return trace_config
+
+class TokenValidityCache:
+    """
+        Caches the results of :any:`YaDisk.check_token`.
+        Concurrent checks of the same token are coalesced into one request.
+        If any API request with a token fails with :any:`UnauthorizedError`,
+        the token is remembered as invalid, even if it was cached as valid.
+
+        To use it, assign it to :any:`YaDisk.token_cache`.
+        The cache must only be used from one event loop.
+
+        :param positive_ttl: `float`, number of seconds a valid token is remembered for
+        :param negative_ttl: `float`, number of seconds an invalid token is remembered for
+        :param max_size: `int`, maximum number of remembered tokens,
+                         the least recently used ones are forgotten first
+    """
+
+    def __init__(self,
+                 positive_ttl: float = 60.0,
+                 negative_ttl: float = 5.0,
+                 max_size: int = 10000):
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+
+        # token -> (is valid, expiration time)
+        self._entries: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._versions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[bool]:
+        """
+            Get the cached validity of the token.
+
+            :param token: `str`, the token
+
+            :returns: `bool` or `None` if the token is not cached or the entry has expired
+        """
+
+        try:
+            valid, expires_at = self._entries[token]
+        except KeyError:
+            return None
+
+        if expires_at <= time.monotonic():
+            del self._entries[token]
+            return None
+
+        self._entries.move_to_end(token)
+
+        return valid
+
+    def set(self, token: str, valid: bool) -> None:
+        """
+            Remember the validity of the token.
+
+            :param token: `str`, the token
+            :param valid: `bool`, whether the token is valid
+        """
+
+        ttl = self.positive_ttl if valid else self.negative_ttl
+
+        self._entries[token] = (valid, time.monotonic() + ttl)
+        self._entries.move_to_end(token)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """
+            Forget the token. Checks that are in progress won't be cached.
+
+            :param token: `str` or `None`, the token, `None` means all of them
+        """
+
+        if token is None:
+            self._entries.clear()
+            self._versions.clear()
+
+            for token in self._pending:
+                self._versions[token] = 1
+
+            return
+
+        self._entries.pop(token, None)
+        self._discard_pending(token)
+
+    def _mark_invalid(self, token: str) -> None:
+        self.set(token, False)
+        self._discard_pending(token)
+
+    def _discard_pending(self, token: str) -> None:
+        if token in self._pending:
+            self._versions[token] = self._versions.get(token, 0) + 1
+
+    async def _lookup(self, token: str, check: Callable[[], Awaitable[bool]]) -> bool:
+        valid = self.get(token)
+
+        if valid is not None:
+            return valid
+
+        try:
+            task = self._pending[token]
+        except KeyError:
+            # The version is captured right away, the task may not start before an invalidation
+            version = self._versions.get(token, 0)
+            task = asyncio.get_running_loop().create_task(self._check(token, check, version))
+            self._pending[token] = task
+
+        # The task is shared with other callers, so it's not cancelled with this one
+        return await asyncio.shield(task)
+
+    async def _check(self, token: str, check: Callable[[], Awaitable[bool]], version: int) -> bool:
+        try:
+            valid = await check()
+        finally:
+            del self._pending[token]
+            current_version = self._versions.pop(token, 0)
+
+        # Errors are not cached, neither are results that were invalidated while being checked
+        if current_version == version:
+            self.set(token, valid)
+
+        return valid
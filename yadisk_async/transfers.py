@@ -0,0 +1,943 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+import tempfile
+import threading
+import time
+from collections import deque, OrderedDict
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .exceptions import ChecksumMismatchError, TransferStalledError
+
+from typing import Any, Optional, Union, IO, Awaitable, TYPE_CHECKING
+from .compat import AsyncGenerator, AsyncIterable, List, Dict, Tuple
+
+if TYPE_CHECKING:
+    from .objects import ResourceObject
+
+__all__ = ["ConnectionStats", "BandwidthLimiter", "upload_limiter", "download_limiter",
+           "TransferProgress", "TransferStats"]
+
+# Chunks are accumulated into blocks of at least this size before hashing.
+# Such blocks are hashed in a thread pool in order to not block the event loop.
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+# In-memory buffers are sent in slices of this size, so that the event loop
+# is not blocked for too long and trace callbacks see the progress
+_BUFFER_CHUNK_SIZE = 256 * 1024
+
+class ConnectionStats:
+    """
+        Counts new and reused connections to upload and download hosts.
+        Only the transfers that use keep-alive (see `keep_alive` parameter
+        of :any:`YaDisk.upload` and :any:`YaDisk.download`) are counted.
+
+        :ivar handshakes: `int`, number of new connections (each one requires a TCP and TLS handshake)
+        :ivar reused: `int`, number of requests that reused an existing connection
+        :ivar hosts: `dict`, per-host :any:`ConnectionStats`
+    """
+
+    handshakes: int
+    reused: int
+    hosts: Dict[str, "ConnectionStats"]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Set all the counters to zero."""
+
+        self.handshakes = 0
+        self.reused = 0
+        self.hosts = {}
+
+    def _host(self, host: Optional[str]) -> "ConnectionStats":
+        host = host or ""
+
+        try:
+            return self.hosts[host]
+        except KeyError:
+            stats = ConnectionStats()
+            self.hosts[host] = stats
+
+            return stats
+
+    def _add_handshake(self, host: Optional[str]) -> None:
+        self.handshakes += 1
+        self._host(host).handshakes += 1
+
+    def _add_reused(self, host: Optional[str]) -> None:
+        self.reused += 1
+        self._host(host).reused += 1
+
+    @property
+    def connections(self) -> int:
+        """`int`, total number of acquired connections, new or reused"""
+
+        return self.handshakes + self.reused
+
+    @property
+    def reuse_rate(self) -> float:
+        """`float`, fraction of acquired connections that were reused, from 0 to 1"""
+
+        if not self.connections:
+            return 0.0
+
+        return self.reused / self.connections
+
+    def __repr__(self) -> str:
+        return "<%s handshakes=%d reused=%d reuse_rate=%.2f>" % (
+            self.__class__.__name__, self.handshakes, self.reused, self.reuse_rate)
+
+class _BandwidthWaiter:
+    # A chunk waiting for a BandwidthLimiter. Its future belongs to the loop of the transfer,
+    # so it's only resolved through that loop
+
+    def __init__(self, start: float, finish: float, order: int, size: int, loop: asyncio.AbstractEventLoop):
+        self.start = start
+        self.finish = finish
+        self.order = order
+        self.size = size
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+        self.cancelled = False
+
+    def __lt__(self, other: "_BandwidthWaiter") -> bool:
+        return (self.start, self.finish, self.order) < (other.start, other.finish, other.order)
+
+    def notify(self) -> None:
+        self.loop.call_soon_threadsafe(self._set_result)
+
+    def _set_result(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+class BandwidthLimiter:
+    """
+        Limits the total rate of transfers that share it.
+        When several transfers compete for the bandwidth, it's split between them
+        in proportion to their weights (see `bandwidth_weight` parameter of
+        :any:`YaDisk.upload` and :any:`YaDisk.download`).
+
+        The limiter can be reconfigured at any time with :any:`BandwidthLimiter.set_rate`,
+        the change also applies to transfers that are already running.
+        A limiter can be shared by transfers running in different threads and event loops.
+
+        :param rate: `float` or `None`, maximum rate in bytes per second, `None` means no limit
+        :param burst: `int` or `None`, maximum number of bytes that can be sent at once
+                      after being idle, defaults to 1/10 of a second worth of data
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None):
+        self._rate: Optional[float] = None
+        self._burst = 0.0
+        self._tokens = 0.0
+        self._last_refill = time.monotonic()
+        self._waiters: List[_BandwidthWaiter] = []
+        self._counter = itertools.count()
+        self._virtual_time = 0.0
+        self._lock = threading.Lock()
+
+        self.set_rate(rate, burst)
+
+    @property
+    def rate(self) -> Optional[float]:
+        """`float` or `None`, maximum rate in bytes per second"""
+
+        return self._rate
+
+    def set_rate(self, rate: Optional[float], burst: Optional[int] = None) -> None:
+        """
+            Change the maximum rate.
+            Can be called from any thread.
+
+            :param rate: `float` or `None`, maximum rate in bytes per second, `None` means no limit
+            :param burst: `int` or `None`, maximum number of bytes that can be sent at once
+                          after being idle, defaults to 1/10 of a second worth of data
+        """
+
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+
+        with self._lock:
+            self._refill()
+
+            self._rate = rate
+
+            if rate is None:
+                self._burst = 0.0
+            elif burst is None:
+                self._burst = max(rate / 10, 1.0)
+            else:
+                self._burst = float(burst)
+
+            self._tokens = min(self._tokens, self._burst)
+
+            self._wake()
+
+            # The rest of the waiters recompute their delays with the new rate
+            for waiter in self._waiters:
+                waiter.notify()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+
+        if self._rate is not None:
+            self._tokens = min(self._burst, self._tokens + (now - self._last_refill) * self._rate)
+
+        self._last_refill = now
+
+    def _wake(self) -> Optional[float]:
+        # Lets through the waiters that can go now, must be called with the lock held.
+        # Returns the number of seconds until the next one can go, None if there are no waiters
+
+        self._refill()
+
+        while self._waiters:
+            waiter = self._waiters[0]
+
+            if waiter.cancelled:
+                heapq.heappop(self._waiters)
+                continue
+
+            # Chunks larger than the burst size are let through as soon as the bucket is full
+            needed = min(waiter.size, self._burst)
+
+            if self._rate is not None and self._tokens < needed:
+                return (needed - self._tokens) / self._rate
+
+            heapq.heappop(self._waiters)
+            self._tokens -= waiter.size
+            self._virtual_time = waiter.start
+            waiter.granted = True
+            waiter.notify()
+
+        return None
+
+    async def _acquire(self, size: int, flow: "_BandwidthFlow") -> None:
+        with self._lock:
+            if self._rate is None:
+                return
+
+            # Start-time fair queueing: chunks are served in order of their virtual start time,
+            # each flow advances its own virtual clock by size / weight
+            start = max(self._virtual_time, flow.finish)
+            flow.finish = start + size / flow.weight
+
+            if not self._waiters:
+                self._refill()
+
+                if self._tokens >= min(size, self._burst):
+                    self._tokens -= size
+                    self._virtual_time = start
+                    return
+
+            waiter = _BandwidthWaiter(start, flow.finish, next(self._counter), size,
+                                      asyncio.get_running_loop())
+            heapq.heappush(self._waiters, waiter)
+            delay = self._wake()
+
+        try:
+            while True:
+                # Whichever waiter wakes up first lets through the ones that can go.
+                # There's no shared timer, since the waiters may belong to different event loops
+                await asyncio.wait((waiter.future,), timeout=delay)
+
+                with self._lock:
+                    if waiter.granted:
+                        return
+
+                    if waiter.future.done():
+                        waiter.future = waiter.loop.create_future()
+
+                    delay = self._wake()
+
+                    if waiter.granted:
+                        return
+        except BaseException:
+            with self._lock:
+                if not waiter.granted:
+                    waiter.cancelled = True
+
+                    # The next waiter might be able to go now
+                    self._wake()
+
+            raise
+
+    def _flow(self, weight: float = 1.0) -> "_BandwidthFlow":
+        return _BandwidthFlow(self, weight)
+
+class _BandwidthFlow:
+    """
+        A single transfer that draws from a :any:`BandwidthLimiter`.
+
+        :param limiter: :any:`BandwidthLimiter`
+        :param weight: `float`, share of the bandwidth relative to other transfers
+    """
+
+    def __init__(self, limiter: BandwidthLimiter, weight: float = 1.0):
+        if weight <= 0:
+            raise ValueError("weight must be positive")
+
+        self.limiter = limiter
+        self.weight = weight
+        self.finish = 0.0
+
+    async def on_chunk(self, chunk: Union[bytes, bytearray, memoryview]) -> None:
+        if self.limiter._rate is not None:
+            await self.limiter._acquire(len(chunk), self)
+
+# Shared by all uploads and downloads in the process, unlimited by default.
+# Use upload_limiter.set_rate(...) and download_limiter.set_rate(...) to change that.
+upload_limiter = BandwidthLimiter()
+download_limiter = BandwidthLimiter()
+
+class TransferProgress:
+    """
+        Progress of an upload or a download, passed to the `progress` callback.
+
+        :ivar bytes_transferred: `int`, number of bytes transferred in the current attempt
+                                 (including the resumed part, if any)
+        :ivar total: `int` or `None`, total number of bytes, `None` if unknown
+        :ivar rate: `float`, transfer rate since the previous report, in bytes per second
+        :ivar average_rate: `float`, average transfer rate of the current attempt, in bytes per second
+        :ivar retries: `int`, number of retries so far
+        :ivar elapsed: `float`, number of seconds since the transfer started
+        :ivar done: `bool`, `True` for the last report of a successful transfer
+    """
+
+    bytes_transferred: int
+    total: Optional[int]
+    rate: float
+    average_rate: float
+    retries: int
+    elapsed: float
+    done: bool
+
+    def __init__(self,
+                 bytes_transferred: int,
+                 total: Optional[int],
+                 rate: float,
+                 average_rate: float,
+                 retries: int,
+                 elapsed: float,
+                 done: bool):
+        self.bytes_transferred = bytes_transferred
+        self.total = total
+        self.rate = rate
+        self.average_rate = average_rate
+        self.retries = retries
+        self.elapsed = elapsed
+        self.done = done
+
+    def __repr__(self) -> str:
+        return "<%s %d/%s bytes rate=%.0f average_rate=%.0f retries=%d done=%r>" % (
+            self.__class__.__name__, self.bytes_transferred, self.total,
+            self.rate, self.average_rate, self.retries, self.done)
+
+class _ProgressReporter:
+    """
+        Calls the progress callback at most once per `interval` seconds
+        (and once more when the transfer is done).
+
+        :param callback: function or coroutine function that accepts :any:`TransferProgress`
+        :param interval: `float`, minimum number of seconds between reports
+    """
+
+    def __init__(self, callback: Any, interval: float):
+        self._callback = callback
+        self._is_async = asyncio.iscoroutinefunction(callback)
+        self._interval = interval
+        self._start_time = time.monotonic()
+        self._retries = -1
+        self._bytes = 0
+        self._total: Optional[int] = None
+        self._attempt_time = self._last_time = self._start_time
+        self._attempt_bytes = self._last_bytes = 0
+
+    def start_attempt(self, position: int = 0) -> None:
+        """
+            Prepare for a new attempt, must be called before each attempt, including the first one.
+
+            :param position: `int`, number of bytes that have already been transferred
+        """
+
+        self._retries += 1
+        self._bytes = position
+        self._total = None
+        self._attempt_time = self._last_time = time.monotonic()
+        self._attempt_bytes = self._last_bytes = position
+
+    def set_total(self, total: Optional[int]) -> None:
+        self._total = total
+
+    async def on_chunk(self, chunk: Union[bytes, bytearray, memoryview]) -> None:
+        self._bytes += len(chunk)
+
+        now = time.monotonic()
+
+        if now - self._last_time >= self._interval:
+            await self._report(now, False)
+
+    async def finish(self) -> None:
+        """Report the successful completion."""
+
+        await self._report(time.monotonic(), True)
+
+    async def _report(self, now: float, done: bool) -> None:
+        rate = (self._bytes - self._last_bytes) / (now - self._last_time) if now > self._last_time else 0.0
+
+        if now > self._attempt_time:
+            average_rate = (self._bytes - self._attempt_bytes) / (now - self._attempt_time)
+        else:
+            average_rate = 0.0
+
+        self._last_time, self._last_bytes = now, self._bytes
+
+        progress = TransferProgress(self._bytes, self._total, rate, average_rate,
+                                    self._retries, now - self._start_time, done)
+
+        if self._is_async:
+            await self._callback(progress)
+        else:
+            self._callback(progress)
+
+class TransferStats:
+    """
+        Statistics of a single upload or download.
+        Pass an instance as the `stats` parameter of :any:`YaDisk.upload`, :any:`YaDisk.download`
+        and similar methods and it will be filled in as the transfer goes.
+        Except for `duration` and `retries`, the values refer to the last attempt.
+
+        :ivar link_latency: `float` or `None`, number of seconds it took to get the upload/download link
+        :ivar time_to_first_byte: `float` or `None`, number of seconds from sending the request
+                                  to receiving the response headers (for uploads that includes sending the data)
+        :ivar bytes_transferred: `int`, number of bytes transferred (including the resumed part, if any)
+        :ivar duration: `float` or `None`, total number of seconds the transfer took, including retries
+        :ivar retries: `int`, number of retries
+        :ivar host: `str` or `None`, host that the data was transferred to or from
+    """
+
+    link_latency: Optional[float]
+    time_to_first_byte: Optional[float]
+    bytes_transferred: int
+    duration: Optional[float]
+    retries: int
+    host: Optional[str]
+
+    def __init__(self):
+        self.link_latency = None
+        self.time_to_first_byte = None
+        self.bytes_transferred = 0
+        self.duration = None
+        self.retries = 0
+        self.host = None
+
+        self._start_time = 0.0
+        self._request_time = 0.0
+
+    @property
+    def average_rate(self) -> Optional[float]:
+        """`float` or `None`, `bytes_transferred` divided by `duration`, in bytes per second"""
+
+        if not self.duration:
+            return None
+
+        return self.bytes_transferred / self.duration
+
+    def _begin(self) -> None:
+        self.duration = None
+        self.host = None
+        self._start_time = time.monotonic()
+
+        # Incremented by every attempt, including the first one
+        self.retries = -1
+
+    def _begin_attempt(self, position: int = 0) -> None:
+        self.retries += 1
+        self.link_latency = None
+        self.time_to_first_byte = None
+        self.bytes_transferred = position
+        self._request_time = time.monotonic()
+
+    def _link_received(self, link: str) -> None:
+        now = time.monotonic()
+
+        self.link_latency = now - self._request_time
+        self.host = urlsplit(link).hostname
+        self._request_time = now
+
+    def _response_received(self) -> None:
+        self.time_to_first_byte = time.monotonic() - self._request_time
+
+    async def on_chunk(self, chunk: Union[bytes, bytearray, memoryview]) -> None:
+        self.bytes_transferred += len(chunk)
+
+    def _end(self) -> None:
+        self.duration = time.monotonic() - self._start_time
+
+    def __repr__(self) -> str:
+        return "<%s host=%r bytes_transferred=%d duration=%r retries=%d>" % (
+            self.__class__.__name__, self.host, self.bytes_transferred, self.duration, self.retries)
+
+class _ChunkObservers:
+    """
+        Passes every transferred chunk to several observers.
+        An instance is used as `trace_request_ctx` of upload requests,
+        see :any:`SessionWithHeaders`.
+
+        :param observers: objects with an async `on_chunk(chunk)` method, `None` values are ignored
+    """
+
+    def __init__(self, *observers: Any):
+        self._observers = [observer for observer in observers if observer is not None]
+
+    def __bool__(self) -> bool:
+        return bool(self._observers)
+
+    async def on_chunk(self, chunk: Union[bytes, bytearray, memoryview]) -> None:
+        for observer in self._observers:
+            await observer.on_chunk(chunk)
+
+class _StallDetector:
+    """
+        Aborts a transfer when its rate stays below `min_rate` for `window` seconds.
+
+        :param min_rate: `float`, minimum transfer rate in bytes per second
+        :param window: `float`, number of seconds the rate is measured over
+    """
+
+    def __init__(self, min_rate: float, window: float):
+        self.min_rate = min_rate
+        self.window = window
+        self.reset()
+
+    def reset(self, expected_size: Optional[int] = None) -> None:
+        """
+            Prepare for a new attempt.
+
+            :param expected_size: `int` or `None`, number of bytes after which
+                                  the transfer is no longer checked
+        """
+
+        self._expected_size = expected_size
+        self._bytes = 0
+        # Nothing to send, on_chunk() is never called
+        self._finished = expected_size == 0
+        self._samples = deque()
+
+    def finish(self) -> None:
+        """Stop checking the rate, e.g. when all the data has been sent."""
+
+        self._finished = True
+
+    async def on_chunk(self, chunk: Union[bytes, bytearray, memoryview]) -> None:
+        self._bytes += len(chunk)
+
+        if self._expected_size is not None and self._bytes >= self._expected_size:
+            # Waiting for the server to respond is not a stall
+            self._finished = True
+
+    def _get_rate(self, now: float) -> Optional[float]:
+        self._samples.append((now, self._bytes))
+
+        # Keep exactly one sample that is at least one window old
+        while len(self._samples) > 1 and now - self._samples[1][0] >= self.window:
+            self._samples.popleft()
+
+        start, start_bytes = self._samples[0]
+
+        if now - start < self.window:
+            return None
+
+        return (self._bytes - start_bytes) / (now - start)
+
+    async def run(self, aw: Awaitable) -> Any:
+        """
+            Run the transfer, cancelling it if it stalls.
+
+            :param aw: awaitable that performs the transfer
+
+            :raises TransferStalledError: transfer rate was below `min_rate` for `window` seconds
+
+            :returns: whatever `aw` returns
+        """
+
+        task = asyncio.ensure_future(aw)
+        rate = None
+
+        self._samples.append((time.monotonic(), self._bytes))
+
+        try:
+            while True:
+                done, _ = await asyncio.wait((task,), timeout=self.window / 4)
+
+                if done:
+                    return task.result()
+
+                if self._finished:
+                    continue
+
+                rate = self._get_rate(time.monotonic())
+
+                if rate is not None and rate < self.min_rate:
+                    break
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.wait((task,))
+
+        raise TransferStalledError(
+            "Transfer stalled: %.0f B/s over the last %g s, expected at least %.0f B/s" % (
+                rate, self.window, self.min_rate))
+
+async def _notify_on_exhaustion(source: AsyncIterable, callback: Any) -> AsyncGenerator[Any, None]:
+    async for chunk in source:
+        yield chunk
+
+    callback()
+
+class _ChunkHasher:
+    """
+        Computes MD5 and/or SHA256 hashes of the data as it's being transferred.
+
+        :param md5: `bool`, compute the MD5 hash
+        :param sha256: `bool`, compute the SHA256 hash
+    """
+
+    def __init__(self, md5: bool = True, sha256: bool = False):
+        self._use_md5 = md5
+        self._use_sha256 = sha256
+        self.reset()
+
+    def reset(self) -> None:
+        """Start over, discarding all the data that has been passed so far."""
+
+        self._md5 = hashlib.md5() if self._use_md5 else None
+        self._sha256 = hashlib.sha256() if self._use_sha256 else None
+        self._buffer = bytearray()
+
+    def _update(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        if self._md5 is not None:
+            self._md5.update(data)
+
+        if self._sha256 is not None:
+            self._sha256.update(data)
+
+    async def _flush(self) -> None:
+        if not self._buffer:
+            return
+
+        block, self._buffer = self._buffer, bytearray()
+
+        if len(block) >= _HASH_BLOCK_SIZE:
+            await asyncio.get_running_loop().run_in_executor(None, self._update, block)
+        else:
+            self._update(block)
+
+    async def on_chunk(self, chunk: Union[bytes, bytearray, memoryview]) -> None:
+        """
+            Pass the next chunk of data.
+
+            :param chunk: `bytes`-like object
+        """
+
+        self._buffer += chunk
+
+        if len(self._buffer) >= _HASH_BLOCK_SIZE:
+            await self._flush()
+
+    async def verify(self, md5: Optional[str] = None, sha256: Optional[str] = None) -> None:
+        """
+            Compare the computed hashes with the expected ones.
+            Hashes that are `None` are not checked.
+
+            :param md5: `str` or `None`, expected MD5 hash
+            :param sha256: `str` or `None`, expected SHA256 hash
+
+            :raises ChecksumMismatchError: computed hash differs from the expected one
+        """
+
+        await self._flush()
+
+        if md5 is not None and self._md5 is not None:
+            actual = self._md5.hexdigest()
+
+            if actual != md5.lower():
+                raise ChecksumMismatchError(f"MD5 mismatch: expected {md5}, got {actual}")
+
+        if sha256 is not None and self._sha256 is not None:
+            actual = self._sha256.hexdigest()
+
+            if actual != sha256.lower():
+                raise ChecksumMismatchError(f"SHA256 mismatch: expected {sha256}, got {actual}")
+
+class _Spool:
+    """
+        Saves the data of a non-replayable stream as it's being read, so that
+        it can be read again from the beginning (e.g., to retry an upload).
+        The data is kept in memory until it exceeds `max_memory` bytes,
+        then it's moved to a temporary file.
+
+        :param source: async iterable of `bytes`, the original stream
+        :param max_memory: `int`, maximum number of bytes to be kept in memory
+    """
+
+    def __init__(self, source: AsyncIterable, max_memory: int):
+        self._source = source.__aiter__()
+        self._max_memory = max_memory
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self._file: Optional[IO[bytes]] = None
+
+        # Set only when the original stream has actually ended
+        self._exhausted = False
+        # Exception raised by the original stream, after that it can't be read anymore
+        self._error: Optional[BaseException] = None
+        # Read of the original stream that hasn't finished yet
+        self._pending: Optional[asyncio.Future] = None
+
+    async def _run(self, func: Any, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _append(self, chunk: bytes) -> None:
+        self._size += len(chunk)
+
+        if self._file is None and self._size > self._max_memory:
+            self._file = await self._run(tempfile.TemporaryFile)
+            chunks, self._chunks = self._chunks, []
+            await self._run(self._file.writelines, chunks)
+
+        if self._file is None:
+            self._chunks.append(chunk)
+        else:
+            await self._run(self._write, chunk)
+
+    def _write(self, chunk: bytes) -> None:
+        assert self._file is not None
+
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(chunk)
+
+    def _read(self, position: int, size: int) -> bytes:
+        assert self._file is not None
+
+        self._file.seek(position)
+
+        return self._file.read(size)
+
+    async def _read_next(self) -> Optional[bytes]:
+        # Reads the next chunk of the original stream and saves it, returns None at the end
+        while True:
+            try:
+                chunk = await self._source.__anext__()
+            except StopAsyncIteration:
+                self._exhausted = True
+                return None
+
+            if chunk:
+                break
+
+        await self._append(chunk)
+
+        return chunk
+
+    async def _wait_pending(self) -> Optional[bytes]:
+        # The read runs in its own task and is not cancelled along with the attempt.
+        # Otherwise the cancellation would close the original stream halfway through
+        # and the next attempt would take that for the end of the data
+        pending = self._pending
+
+        if pending is None:
+            return None
+
+        await asyncio.wait((pending,))
+        self._pending = None
+
+        try:
+            return pending.result()
+        except Exception as e:
+            self._error = e
+            raise
+
+    async def replay(self) -> AsyncGenerator[bytes, None]:
+        """
+            Yields the data from the beginning: first what has already been saved,
+            then the rest of the original stream.
+
+            :raises RuntimeError: the original stream has failed during one of the previous reads
+
+            :returns: async generator of `bytes`
+        """
+
+        # Whatever a cancelled attempt was reading is saved before anything is sent
+        await self._wait_pending()
+
+        if self._error is not None:
+            raise RuntimeError("The original stream has failed, the data can't be sent again") from self._error
+
+        if self._file is None:
+            for chunk in list(self._chunks):
+                yield chunk
+
+            position = sum(len(chunk) for chunk in self._chunks)
+        else:
+            position = 0
+
+        # Whatever has been moved to the temporary file
+        while self._file is not None and position < self._size:
+            block = await self._run(self._read, position, min(_HASH_BLOCK_SIZE, self._size - position))
+
+            if not block:
+                break
+
+            position += len(block)
+            yield block
+
+        while not self._exhausted:
+            self._pending = asyncio.ensure_future(self._read_next())
+
+            chunk = await self._wait_pending()
+
+            if chunk is None:
+                break
+
+            yield chunk
+
+    async def close(self) -> None:
+        """Discard the saved data."""
+
+        if self._pending is not None:
+            self._pending.cancel()
+            await asyncio.wait((self._pending,))
+            self._pending = None
+
+        if self._file is not None:
+            await self._run(self._file.close)
+            self._file = None
+
+        self._chunks = []
+
+class _BufferPayload(aiohttp.payload.Payload):
+    """
+        Request payload that sends an in-memory buffer without copying it.
+        The buffer is written in slices of a :any:`memoryview`, which makes
+        the payload cheap to recreate for every retry.
+
+        :param value: :any:`memoryview` of unsigned bytes
+    """
+
+    def __init__(self, value: memoryview, *args, **kwargs):
+        kwargs.setdefault("content_type", "application/octet-stream")
+
+        super().__init__(value, *args, **kwargs)
+
+        self._size = value.nbytes
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        return bytes(self._value).decode(encoding, errors)
+
+    async def write(self, writer: Any) -> None:
+        value = self._value
+
+        for offset in range(0, value.nbytes, _BUFFER_CHUNK_SIZE):
+            await writer.write(value[offset:offset + _BUFFER_CHUNK_SIZE])
+
+def _as_byte_view(buffer: Any) -> memoryview:
+    """
+        Get a flat view of unsigned bytes of any buffer-protocol object.
+        The data is not copied.
+
+        :param buffer: `bytes`, `bytearray`, :any:`memoryview` or any other object supporting the buffer protocol
+
+        :raises TypeError: the buffer is not C-contiguous
+
+        :returns: :any:`memoryview`
+    """
+
+    view = memoryview(buffer)
+
+    if not view.c_contiguous:
+        raise TypeError("Only C-contiguous buffers can be uploaded")
+
+    if view.format == "B" and view.ndim == 1:
+        return view
+
+    return view.cast("B")
+
+def _compute_file_md5(path: Union[str, bytes]) -> str:
+    md5 = hashlib.md5()
+
+    with open(path, "rb") as f:
+        while block := f.read(_HASH_BLOCK_SIZE):
+            md5.update(block)
+
+    return md5.hexdigest()
+
+# Maximum number of entries in the local file hash cache
+_FILE_HASH_CACHE_SIZE = 100000
+
+# Maps (device, inode, size, mtime) of local files to their MD5 hashes,
+# so that unchanged files are not hashed again
+_file_hash_cache: "OrderedDict[Tuple[int, int, int, int], str]" = OrderedDict()
+_file_hash_cache_lock = threading.Lock()
+
+def _file_cache_key(stat_result: os.stat_result) -> Tuple[int, int, int, int]:
+    return (stat_result.st_dev, stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+
+def _get_file_md5(path: Union[str, bytes]) -> str:
+    key = _file_cache_key(os.stat(path))
+
+    with _file_hash_cache_lock:
+        try:
+            md5 = _file_hash_cache[key]
+        except KeyError:
+            pass
+        else:
+            _file_hash_cache.move_to_end(key)
+
+            return md5
+
+    md5 = _compute_file_md5(path)
+
+    # The file might have been modified while it was being hashed
+    if _file_cache_key(os.stat(path)) == key:
+        with _file_hash_cache_lock:
+            _file_hash_cache[key] = md5
+
+            while len(_file_hash_cache) > _FILE_HASH_CACHE_SIZE:
+                _file_hash_cache.popitem(last=False)
+
+    return md5
+
+async def _file_md5(path: Union[str, bytes]) -> str:
+    # Hashing a whole file is too slow to be done in the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, _get_file_md5, path)
+
+async def _is_same_file(path: Union[str, bytes], resource: "ResourceObject") -> bool:
+    """
+        Check whether the local file has the same size and MD5 hash as the remote one.
+        Hashes of local files are cached by their inode, size and modification time.
+
+        :param path: path to the local file
+        :param resource: :any:`ResourceObject`, the remote file
+
+        :returns: `True` if the files are identical, `False` otherwise (or if the local file doesn't exist)
+    """
+
+    try:
+        size = os.stat(path).st_size
+    except FileNotFoundError:
+        return False
+
+    if resource.size is None or resource.md5 is None or size != resource.size:
+        return False
+
+    return await _file_md5(path) == resource.md5
@@ -2,6 +2,8 @@
 
 import asyncio
 import inspect
+import os
+import stat
 import threading
 from pathlib import PurePosixPath
 
@@ -9,19 +11,32 @@ from urllib.parse import urlencode
 import io
 from .common import FileOrPath, FileOrPathDestination
 
-from . import settings
-from .session import SessionWithHeaders
+from . import settings, transfers
+from .session import SessionWithHeaders, _TransferConnector, _make_connection_trace_config
 from .api import *
 from .exceptions import (
     InvalidResponseError, UnauthorizedError, OperationNotFoundError,
-    PathNotFoundError, WrongResourceTypeError)
+    PathNotFoundError, WrongResourceTypeError, RetriableYaDiskError,
+    ChecksumMismatchError, OperationFailedError, OperationTimeoutError)
 from .utils import get_exception, auto_retry
+from .transfers import (
+    ConnectionStats, BandwidthLimiter, TransferStats, _BandwidthFlow, _ChunkHasher,
+    _ChunkObservers, _StallDetector, _ProgressReporter, _Spool, _BufferPayload,
+    _as_byte_view, _notify_on_exhaustion, _is_same_file)
+from .operations import OperationTracker, _PollSchedule
+from .tokens import TokenManager, TokenPool, TokenValidityCache
+from .batch import (
+    DownloadManager, UploadManager, OperationResult, _walk_remote_dir, _walk_local_dir,
+    _request_kwargs, _run_operations, _run_batch)
 from .objects import ResourceLinkObject, PublicResourceLinkObject
 
 from typing import Any, Optional, Union, IO, TYPE_CHECKING
-from .compat import Callable, AsyncGenerator, List, Awaitable, Dict
+from .compat import (
+    Callable, AsyncGenerator, List, Awaitable, Dict, TimeoutError, Iterable,
+    AsyncIterable, Tuple)
 
 import aiofiles
+import aiohttp
 
 if TYPE_CHECKING:
     from .objects import (
@@ -29,6 +44,7 @@ if TYPE_CHECKING:
         ResourceObject, OperationLinkObject,
         TrashResourceObject, PublicResourceObject,
         PublicResourcesListObject)
+    from .batch import JobResult
 
 __all__ = ["YaDisk"]
 
@@ -180,6 +196,12 @@ async def read_in_chunks(file: IO, chunk_size: int = 64 * 1024) -> Union[AsyncGe
     while chunk := await file.read(chunk_size):
         yield chunk
 
+async def _read_sync_file_in_chunks(file: IO, chunk_size: int = 64 * 1024) -> AsyncGenerator[bytes, None]:
+    loop = asyncio.get_running_loop()
+
+    while chunk := await loop.run_in_executor(None, file.read, chunk_size):
+        yield chunk
+
 def is_async_func(func: Any) -> bool:
     return inspect.isgeneratorfunction(func) or asyncio.iscoroutinefunction(func)
 
@@ -210,6 +232,54 @@ async def _is_file_seekable(file: Any) -> bool:
 
     return file.seekable();
 
+def _make_stall_detector(kwargs: Dict[str, Any]) -> Optional[_StallDetector]:
+    # Pops the stall detection parameters, returns None if it's disabled
+    min_rate = kwargs.pop("stall_min_rate", None)
+    window = kwargs.pop("stall_window", None)
+
+    if min_rate is None:
+        min_rate = settings.DEFAULT_STALL_MIN_RATE
+
+    if window is None:
+        window = settings.DEFAULT_STALL_WINDOW
+
+    if not min_rate:
+        return None
+
+    return _StallDetector(min_rate, window)
+
+def _make_bandwidth_flow(kwargs: Dict[str, Any], default_limiter: BandwidthLimiter) -> _BandwidthFlow:
+    # Pops the bandwidth limiting parameters
+    limiter = kwargs.pop("bandwidth_limiter", None)
+    weight = kwargs.pop("bandwidth_weight", None)
+
+    if limiter is None:
+        limiter = default_limiter
+
+    if weight is None:
+        weight = 1.0
+
+    return limiter._flow(weight)
+
+def _make_progress_reporter(kwargs: Dict[str, Any]) -> Optional[_ProgressReporter]:
+    # Pops the progress reporting parameters, returns None if there's no callback
+    callback = kwargs.pop("progress", None)
+    interval = kwargs.pop("progress_interval", None)
+
+    if interval is None:
+        interval = settings.DEFAULT_PROGRESS_INTERVAL
+
+    if callback is None:
+        return None
+
+    return _ProgressReporter(callback, interval)
+
+def _is_regular_file(path: Union[str, bytes]) -> bool:
+    try:
+        return stat.S_ISREG(os.stat(path).st_mode)
+    except OSError:
+        return False
+
 def _apply_default_args(args: Dict[str, Any], default_args: Dict[str, Any]) -> None:
     new_args = dict(default_args)
     new_args.update(args)
@@ -239,6 +309,11 @@ class YaDisk:
         :ivar token: `str`, application token
         :ivar default_args: `dict`, default arguments for methods. Can be used to
                             set the default timeout, headers, etc.
+        :ivar connection_stats: :any:`ConnectionStats`, handshake and reuse counters
+                                for keep-alive connections to upload and download hosts
+        :ivar token_manager: :any:`TokenManager` or `None`, refreshes `token` before it expires
+        :ivar token_pool: :any:`TokenPool` or `None`, if set, API requests use its tokens instead of `token`
+        :ivar token_cache: :any:`TokenValidityCache` or `None`, if set, caches the results of :any:`YaDisk.check_token`
 
         The following exceptions may be raised by most API requests:
 
@@ -264,6 +339,10 @@ class YaDisk:
     secret: str
     token: str
     default_args: Dict[str, Any]
+    connection_stats: ConnectionStats
+    token_manager: Optional[TokenManager]
+    token_pool: Optional[TokenPool]
+    token_cache: Optional[TokenValidityCache]
 
     def __init__(self,
                  id: str ="",
@@ -276,6 +355,12 @@ class YaDisk:
         self.default_args = {} if default_args is None else default_args
 
         self._sessions = {}
+        self._transfer_sessions = {}
+        self._operation_tracker: Optional[OperationTracker] = None
+        self.connection_stats = ConnectionStats()
+        self.token_manager = None
+        self.token_pool = None
+        self.token_cache = None
 
     def _get_session(self, token, tid):
         try:
@@ -301,9 +386,19 @@ class YaDisk:
             statement.
         """
 
+        if self._operation_tracker is not None:
+            await self._operation_tracker.close()
+            self._operation_tracker = None
+
+        if self.token_manager is not None:
+            await self.token_manager.close()
+
         for session in self._sessions.values():
             await session.close()
 
+        for session in self._transfer_sessions.values():
+            await session.close()
+
         self.clear_session_cache()
 
     def clear_session_cache(self) -> None:
@@ -312,6 +407,7 @@ class YaDisk:
         """
 
         self._sessions.clear()
+        self._transfer_sessions.clear()
 
     def make_session(self, token: Optional[str] = None) -> SessionWithHeaders:
         """
@@ -324,25 +420,123 @@ class YaDisk:
         if token is None:
             token = self.token
 
-        session = SessionWithHeaders()
+        session = SessionWithHeaders(trace_configs=self._make_trace_configs(token))
+        session.on_unauthorized = self._on_unauthorized
+        session.on_throttled = self._on_throttled
 
         if token:
             session.headers["Authorization"] = "OAuth " + token
 
         return session
 
+    def _make_trace_configs(self, token: str) -> List[aiohttp.TraceConfig]:
+        # Trace configs of the API sessions
+        trace_configs = []
+
+        if self.token_pool is not None and token in self.token_pool:
+            trace_configs.append(self.token_pool._make_trace_config(token))
+
+        return trace_configs
+
     def get_session(self, token: Optional[str] = None) -> SessionWithHeaders:
         """
             Like :any:`YaDisk.make_session` but cached.
+            If :any:`YaDisk.token_pool` is set, the token is selected by the pool.
 
+            :param token: application token, equivalent to `self.token` if `None`
             :returns: :any:`aiohttp.ClientSession`, different instances for different threads
         """
 
+        if self.token_manager is not None:
+            self.token_manager.start()
+
         if token is None:
-            token = self.token
+            token = self.token if self.token_pool is None else self.token_pool.select()
 
         return self._get_session(token, threading.get_ident())
 
+    async def _on_unauthorized(self, authorization: Optional[str]) -> Optional[str]:
+        if not authorization or not authorization.startswith("OAuth "):
+            return None
+
+        token = authorization[len("OAuth "):]
+
+        if self.token_cache is not None:
+            self.token_cache._mark_invalid(token)
+
+        if self.token_manager is None:
+            return None
+
+        token = await self.token_manager._handle_unauthorized(token)
+
+        return None if token is None else "OAuth " + token
+
+    def _on_throttled(self) -> Optional[SessionWithHeaders]:
+        if self.token_pool is None:
+            return None
+
+        token = self.token_pool._select_available()
+
+        return None if token is None else self.get_session(token)
+
+    @property
+    def operation_tracker(self) -> OperationTracker:
+        """
+            :any:`OperationTracker` shared by all the users of this object,
+            created with the default parameters on first access.
+            It's closed by :any:`YaDisk.close`.
+        """
+
+        if self._operation_tracker is None:
+            self._operation_tracker = OperationTracker(self)
+
+        return self._operation_tracker
+
+    def make_transfer_session(self, token: Optional[str] = None) -> SessionWithHeaders:
+        """
+            Like :any:`YaDisk.make_session` but for keep-alive connections to upload and download hosts.
+            Connections are kept in a separate pool, limited by
+            `settings.DEFAULT_TRANSFER_POOL_MAX_IDLE` idle connections in total,
+            and are counted in :any:`YaDisk.connection_stats`.
+
+            :param token: application token, equivalent to `self.token` if `None`
+            :returns: `aiohttp.ClientSession`
+        """
+
+        if token is None:
+            token = self.token
+
+        connector = _TransferConnector(max_idle=settings.DEFAULT_TRANSFER_POOL_MAX_IDLE,
+                                       keepalive_timeout=settings.DEFAULT_TRANSFER_KEEPALIVE_TIMEOUT)
+
+        session = SessionWithHeaders(connector=connector,
+                                     trace_configs=[_make_connection_trace_config(self.connection_stats)])
+
+        if token:
+            session.headers["Authorization"] = "OAuth " + token
+
+        return session
+
+    def get_transfer_session(self, token: Optional[str] = None) -> SessionWithHeaders:
+        """
+            Like :any:`YaDisk.make_transfer_session` but cached.
+
+            :returns: :any:`aiohttp.ClientSession`, different instances for different threads
+        """
+
+        if token is None:
+            token = self.token
+
+        key = (token, threading.get_ident())
+
+        try:
+            return self._transfer_sessions[key]
+        except KeyError:
+            session = self.make_transfer_session(token)
+            self._transfer_sessions[key] = session
+
+            return session
+
     def get_auth_url(self, **kwargs) -> str:
         """
             Get authentication URL for the user to go to.
@@ -704,6 +898,35 @@ class YaDisk:
         if n_retries is None:
             n_retries = settings.DEFAULT_N_RETRIES
 
+        verify_checksum = kwargs.pop("verify_checksum", False)
+
+        if verify_checksum and not dst_path:
+            raise ValueError("Checksum verification requires the destination path")
+
+        hasher = _ChunkHasher(md5=True) if verify_checksum else None
+        stall_detector = _make_stall_detector(kwargs)
+        bandwidth_flow = _make_bandwidth_flow(kwargs, transfers.upload_limiter)
+        progress = _make_progress_reporter(kwargs)
+        stats: Optional[TransferStats] = kwargs.pop("stats", None)
+
+        # The data is throttled first, so that the other observers see the actual rate
+        observers = _ChunkObservers(bandwidth_flow, hasher, stall_detector, progress, stats)
+
+        use_spool = kwargs.pop("spool", False)
+        spool_max_memory = kwargs.pop("spool_max_memory", None)
+
+        if spool_max_memory is None:
+            spool_max_memory = settings.DEFAULT_SPOOL_MAX_MEMORY
+
+        spool: Optional[_Spool] = None
+
+        keep_alive = kwargs.pop("keep_alive", None)
+
+        if keep_alive is None:
+            keep_alive = settings.DEFAULT_TRANSFER_KEEP_ALIVE
+
+        session = self.get_transfer_session() if keep_alive else self.get_session()
+
         # Number of retries for getting the upload link.
         # It is set to 0, unless the file is not seekable, in which case
         # we have to use a different retry scheme
@@ -713,46 +936,93 @@ class YaDisk:
 
         file = None
         close_file = False
+        local_path: Optional[Union[str, bytes]] = None
+        buffer: Optional[memoryview] = None
         generator_factory: Optional[Callable[[], AsyncGenerator]] = None
         file_position = 0
 
-        session = self.get_session()
+        # Number of bytes to be sent, None if unknown
+        upload_size: Optional[int] = None
+
+        loop = asyncio.get_running_loop()
+
+        if stats is not None:
+            stats._begin()
 
         try:
             if isinstance(file_or_path, (str, bytes)):
-                close_file = True
-                file = await aiofiles.open(file_or_path, "rb")
+                if _is_regular_file(file_or_path):
+                    local_path = file_or_path
+                    upload_size = os.stat(local_path).st_size
+                else:
+                    close_file = True
+                    file = await aiofiles.open(file_or_path, "rb")
+            elif isinstance(file_or_path, (bytearray, memoryview)):
+                # In-memory buffers are sent as is and can be resent on every retry
+                buffer = _as_byte_view(file_or_path)
+                upload_size = buffer.nbytes
             elif inspect.isasyncgenfunction(file_or_path):
                 generator_factory = file_or_path
             else:
                 close_file = False
                 file = file_or_path
 
-            if generator_factory is None:
+            if generator_factory is None and local_path is None and buffer is None:
                 if await _is_file_seekable(file):
                     file_position = await _file_tell(file)
+                    file_end = await _file_seek(file, 0, os.SEEK_END)
+                    await _file_seek(file, file_position)
+
+                    if isinstance(file_end, int):
+                        upload_size = file_end - file_position
+                elif use_spool:
+                    if is_async_func(file.read):
+                        spool = _Spool(read_in_chunks(file), spool_max_memory)
+                    else:
+                        spool = _Spool(_read_sync_file_in_chunks(file), spool_max_memory)
                 else:
                     n_retries, n_retries_for_upload_link = 0, n_retries
+            elif generator_factory is not None and use_spool:
+                spool = _Spool(generator_factory(), spool_max_memory)
 
             async def attempt():
                 temp_kwargs = dict(kwargs)
                 temp_kwargs["n_retries"] = n_retries_for_upload_link
                 temp_kwargs["retry_interval"] = 0.0
 
+                if stats is not None:
+                    stats._begin_attempt()
+
                 link = await get_upload_link_function(dst_path, **temp_kwargs)
 
+                if stats is not None:
+                    stats._link_received(link)
+
                 # session.get() doesn't accept some of the passed parameters
                 _filter_kwargs_for_aiohttp(temp_kwargs)
 
                 # Disable keep-alive by default, since the upload server is random
-                try:
-                    temp_kwargs["headers"].setdefault("Connection", "close")
-                except KeyError:
-                    temp_kwargs["headers"] = {"Connection": "close"}
+                if not keep_alive:
+                    try:
+                        temp_kwargs["headers"].setdefault("Connection", "close")
+                    except KeyError:
+                        temp_kwargs["headers"] = {"Connection": "close"}
 
                 data = None
-
-                if generator_factory is None:
+                local_file = None
+
+                if local_path is not None:
+                    # Regular files are reopened for every attempt and passed to aiohttp as is.
+                    # This way they are sent with a known Content-Length in large blocks
+                    # that are read in a thread pool, without an extra async generator on top
+                    local_file = await loop.run_in_executor(None, open, local_path, "rb")
+                    data = local_file
+                elif buffer is not None:
+                    data = _BufferPayload(buffer)
+                elif spool is not None:
+                    # Everything that has been sent so far is sent again from the spool
+                    data = spool.replay()
+                elif generator_factory is None:
                     if await _is_file_seekable(file):
                         await _file_seek(file, file_position)
 
@@ -765,26 +1035,114 @@ class YaDisk:
                 else:
                     data = generator_factory()
 
-                async with session.put(link, data=data, **temp_kwargs) as response:
-                    if response.status != 201:
-                        raise await get_exception(response)
+                if hasher is not None:
+                    hasher.reset()
+
+                if stall_detector is not None:
+                    stall_detector.reset(upload_size)
+
+                    if upload_size is None and inspect.isasyncgen(data):
+                        # Waiting for the server to respond is not a stall
+                        data = _notify_on_exhaustion(data, stall_detector.finish)
+
+                if progress is not None:
+                    progress.start_attempt()
+                    progress.set_total(upload_size)
+
+                async def send() -> None:
+                    async with session.put(link, data=data,
+                                           trace_request_ctx=observers or None,
+                                           **temp_kwargs) as response:
+                        if stats is not None:
+                            stats._response_received()
+
+                        if response.status != 201:
+                            raise await get_exception(response)
+
+                try:
+                    if stall_detector is not None:
+                        await stall_detector.run(send())
+                    else:
+                        await send()
+                finally:
+                    if local_file is not None:
+                        local_file.close()
+
+                if hasher is not None:
+                    meta_kwargs = dict(kwargs)
+                    meta_kwargs.pop("overwrite", None)
+                    meta_kwargs["fields"] = ["md5"]
+
+                    meta = await self.get_meta(dst_path, **meta_kwargs)
+
+                    try:
+                        await hasher.verify(md5=meta.md5)
+                    except ChecksumMismatchError:
+                        # The destination now contains our own corrupted copy
+                        # and it has to be overwritten on retry
+                        kwargs["overwrite"] = True
+                        raise
 
             await auto_retry(attempt, n_retries, retry_interval)
+
+            if progress is not None:
+                await progress.finish()
         finally:
+            if stats is not None:
+                stats._end()
+
+            if spool is not None:
+                await spool.close()
+
             if close_file and file is not None:
                 await file.close()
 
+    async def _is_up_to_date(self,
+                             local_path: Union[str, bytes],
+                             remote_path: str,
+                             kwargs: Dict[str, Any]) -> bool:
+        # Checks whether the local and the remote files are identical
+        try:
+            resource = await self.get_meta(remote_path, fields=["type", "size", "md5"],
+                                           **_request_kwargs(kwargs))
+        except PathNotFoundError:
+            return False
+
+        return resource.type == "file" and await _is_same_file(local_path, resource)
+
     async def upload(self,
                      path_or_file: FileOrPath,
                      dst_path: str, /, **kwargs) -> ResourceLinkObject:
         """
             Upload a file to disk.
 
-            :param path_or_file: path, file-like object or an async generator function to be uploaded
+            :param path_or_file: path, file-like object, an async generator function
+                                 or a `bytearray`/:any:`memoryview` to be uploaded
             :param dst_path: destination path
             :param overwrite: if `True`, the resource will be overwritten if it already exists,
                               an error will be raised otherwise
+            :param if_changed: `bool`, do not upload the file if the destination file already exists
+                               and has the same size and MD5 hash (`path_or_file` must be a path)
+            :param verify_checksum: `bool`, compute the MD5 hash of the data while it's being sent
+                                    and compare it with the one reported by Yandex.Disk.
+                                    On mismatch the upload is retried (overwriting the destination).
+            :param spool: `bool`, save the data of non-seekable files and async generators
+                          while it's being sent, so that the upload can be retried
+            :param spool_max_memory: `int` or `None`, maximum number of bytes to be spooled in memory,
+                                     the rest is saved to a temporary file
             :param fields: list of keys to be included in the response
+            :param stall_min_rate: `float` or `None`, minimum transfer rate in bytes per second,
+                                   see `settings.DEFAULT_STALL_MIN_RATE`
+            :param stall_window: `float` or `None`, number of seconds the transfer rate is measured over
+            :param progress: function or coroutine function that accepts :any:`TransferProgress`,
+                             called periodically while the data is being transferred
+            :param progress_interval: `float` or `None`, minimum number of seconds between `progress` calls
+            :param bandwidth_limiter: :any:`BandwidthLimiter` or `None`, limiter to draw from,
+                                      defaults to `transfers.upload_limiter`
+            :param bandwidth_weight: `float`, share of the limited bandwidth relative to other transfers
+            :param stats: :any:`TransferStats` or `None`, filled in with the statistics of the transfer
+            :param keep_alive: `bool`, keep the connection to the upload server alive
+                               for the following transfers (see :any:`YaDisk.get_transfer_session`)
             :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
             :param headers: `dict` or `None`, additional request headers
             :param n_retries: `int`, maximum number of retries
@@ -796,31 +1154,104 @@ class YaDisk:
             :raises ForbiddenError: application doesn't have enough rights for this request
             :raises ResourceIsLockedError: resource is locked by another request
             :raises UploadTrafficLimitExceededError: upload limit has been exceeded
+            :raises ChecksumMismatchError: uploaded file is corrupted (only with `verify_checksum`)
+            :raises TransferStalledError: transfer rate was below `stall_min_rate` for `stall_window` seconds
 
             :returns: :any:`ResourceLinkObject`, link to the destination resource
         """
 
         _apply_default_args(kwargs, self.default_args)
 
+        if kwargs.pop("if_changed", False):
+            if not isinstance(path_or_file, (str, bytes)):
+                raise ValueError("if_changed requires a path to the local file")
+
+            if await self._is_up_to_date(path_or_file, dst_path, kwargs):
+                return ResourceLinkObject.from_path(dst_path, yadisk=self)
+
         await self._upload(self.get_upload_link, path_or_file, dst_path, **kwargs)
         return ResourceLinkObject.from_path(dst_path, yadisk=self)
 
+    async def upload_bytes(self,
+                           data: Union[bytes, bytearray, memoryview],
+                           dst_path: str, /, **kwargs) -> ResourceLinkObject:
+        """
+            Upload an in-memory buffer to disk.
+            Unlike :any:`YaDisk.upload`, `bytes` are treated as the data, not as a path.
+            The buffer is sent without being copied, so it must not be modified
+            until the upload is finished.
+
+            :param data: `bytes`, `bytearray`, :any:`memoryview` or any other C-contiguous buffer
+            :param dst_path: destination path
+            :param overwrite: if `True`, the resource will be overwritten if it already exists,
+                              an error will be raised otherwise
+            :param verify_checksum: `bool`, compare the MD5 hash of the data with the one reported by Yandex.Disk
+            :param fields: list of keys to be included in the response
+            :param stall_min_rate: `float` or `None`, minimum transfer rate in bytes per second,
+                                   see `settings.DEFAULT_STALL_MIN_RATE`
+            :param stall_window: `float` or `None`, number of seconds the transfer rate is measured over
+            :param progress: function or coroutine function that accepts :any:`TransferProgress`,
+                             called periodically while the data is being transferred
+            :param progress_interval: `float` or `None`, minimum number of seconds between `progress` calls
+            :param bandwidth_limiter: :any:`BandwidthLimiter` or `None`, limiter to draw from,
+                                      defaults to `transfers.upload_limiter`
+            :param bandwidth_weight: `float`, share of the limited bandwidth relative to other transfers
+            :param stats: :any:`TransferStats` or `None`, filled in with the statistics of the transfer
+            :param keep_alive: `bool`, keep the connection to the upload server alive
+                               for the following transfers (see :any:`YaDisk.get_transfer_session`)
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries
+            :param retry_interval: delay between retries in seconds
+
+            :raises ParentNotFoundError: parent directory doesn't exist
+            :raises PathExistsError: destination path already exists
+            :raises InsufficientStorageError: cannot upload file due to lack of storage space
+            :raises ForbiddenError: application doesn't have enough rights for this request
+            :raises ResourceIsLockedError: resource is locked by another request
+            :raises UploadTrafficLimitExceededError: upload limit has been exceeded
+            :raises ChecksumMismatchError: uploaded file is corrupted (only with `verify_checksum`)
+            :raises TransferStalledError: transfer rate was below `stall_min_rate` for `stall_window` seconds
+
+            :returns: :any:`ResourceLinkObject`, link to the destination resource
+        """
+
+        return await self.upload(_as_byte_view(data), dst_path, **kwargs)
+
     async def upload_by_link(self,
                              file_or_path: FileOrPath,
                              link: str, /, **kwargs) -> None:
         """
             Upload a file to disk using an upload link.
 
-            :param file_or_path: path, file-like object or an async generator function to be uploaded
+            :param file_or_path: path, file-like object, an async generator function
+                                 or a `bytearray`/:any:`memoryview` to be uploaded
             :param link: upload link
             :param overwrite: if `True`, the resource will be overwritten if it already exists,
                               an error will be raised otherwise
+            :param spool: `bool`, save the data of non-seekable files and async generators
+                          while it's being sent, so that the upload can be retried
+            :param spool_max_memory: `int` or `None`, maximum number of bytes to be spooled in memory,
+                                     the rest is saved to a temporary file
+            :param stall_min_rate: `float` or `None`, minimum transfer rate in bytes per second,
+                                   see `settings.DEFAULT_STALL_MIN_RATE`
+            :param stall_window: `float` or `None`, number of seconds the transfer rate is measured over
+            :param progress: function or coroutine function that accepts :any:`TransferProgress`,
+                             called periodically while the data is being transferred
+            :param progress_interval: `float` or `None`, minimum number of seconds between `progress` calls
+            :param bandwidth_limiter: :any:`BandwidthLimiter` or `None`, limiter to draw from,
+                                      defaults to `transfers.upload_limiter`
+            :param bandwidth_weight: `float`, share of the limited bandwidth relative to other transfers
+            :param stats: :any:`TransferStats` or `None`, filled in with the statistics of the transfer
+            :param keep_alive: `bool`, keep the connection to the upload server alive
+                               for the following transfers (see :any:`YaDisk.get_transfer_session`)
             :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
             :param headers: `dict` or `None`, additional request headers
             :param n_retries: `int`, maximum number of retries
             :param retry_interval: delay between retries in seconds
 
             :raises InsufficientStorageError: cannot upload file due to lack of storage space
+            :raises TransferStalledError: transfer rate was below `stall_min_rate` for `stall_window` seconds
         """
 
         _apply_default_args(kwargs, self.default_args)
@@ -830,6 +1261,91 @@ class YaDisk:
 
         await self._upload(get_link, file_or_path, "", **kwargs)
 
+    async def upload_many(self,
+                          jobs: Union[Iterable, AsyncIterable], /,
+                          max_concurrency: int = 8,
+                          max_bytes_in_flight: Optional[int] = None,
+                          prefetch: int = 16,
+                          create_parents: bool = True,
+                          **kwargs) -> List["JobResult"]:
+        """
+            Upload many files concurrently, see :any:`UploadManager` for details.
+            A failed upload doesn't affect the rest of the jobs.
+
+            :param jobs: iterable or async iterable of :any:`TransferJob` or `(path_or_file, dst_path)` tuples
+            :param max_concurrency: `int`, maximum number of simultaneous uploads
+            :param max_bytes_in_flight: `int` or `None`, maximum total size of the files
+                                        being uploaded at the same time
+            :param prefetch: `int`, maximum number of upload links to be requested in advance
+            :param create_parents: `bool`, create missing parent directories
+            :param overwrite: if `True`, the resources will be overwritten if they already exist
+            :param verify_checksum: `bool`, verify checksums of the uploaded files
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries
+            :param retry_interval: delay between retries in seconds
+
+            :returns: `list` of :any:`JobResult` in the order of completion
+        """
+
+        _apply_default_args(kwargs, self.default_args)
+
+        manager = UploadManager(self,
+                                max_concurrency=max_concurrency,
+                                max_bytes_in_flight=max_bytes_in_flight,
+                                prefetch=prefetch,
+                                create_parents=create_parents,
+                                **kwargs)
+
+        return await manager.run(jobs)
+
+    async def upload_dir(self,
+                         src_path: Union[str, bytes],
+                         dst_path: str, /,
+                         max_concurrency: int = 8,
+                         max_mkdir_concurrency: int = 4,
+                         skip_unchanged: bool = True,
+                         **kwargs) -> List["JobResult"]:
+        """
+            Upload a local directory recursively.
+            The remote directory tree is created first (level by level), then the files
+            are uploaded concurrently.
+
+            :param src_path: path to the local source directory
+            :param dst_path: path to the destination directory
+            :param max_concurrency: `int`, maximum number of simultaneous uploads
+            :param max_mkdir_concurrency: `int`, maximum number of simultaneous `mkdir()`
+                                          and `listdir()` calls
+            :param skip_unchanged: `bool`, do not upload files that already exist on Disk
+                                   and have the same size and MD5 hash. Files that exist
+                                   but differ are still uploaded, which fails with
+                                   :any:`PathExistsError` unless `overwrite` is `True`
+            :param max_bytes_in_flight: `int` or `None`, maximum total size of the files
+                                        being uploaded at the same time
+            :param overwrite: if `True`, the resources will be overwritten if they already exist
+            :param verify_checksum: `bool`, verify checksums of the uploaded files
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries
+            :param retry_interval: delay between retries in seconds
+
+            :raises ParentNotFoundError: parent of the destination directory doesn't exist
+            :raises ForbiddenError: application doesn't have enough rights for this request
+
+            :returns: `list` of :any:`JobResult` for the uploaded files, in the order of completion
+        """
+
+        _apply_default_args(kwargs, self.default_args)
+
+        jobs = _walk_local_dir(self, src_path, dst_path,
+                               max_mkdir_concurrency, skip_unchanged, kwargs)
+
+        try:
+            return await self.upload_many(jobs, max_concurrency=max_concurrency,
+                                          create_parents=False, **kwargs)
+        finally:
+            await jobs.aclose()
+
     async def get_download_link(self, path: str, /, **kwargs) -> str:
         """
             Get a download link for a file (or a directory).
@@ -858,7 +1374,9 @@ class YaDisk:
     async def _download(self,
                         get_download_link_function: Callable[..., Awaitable[str]],
                         src_path: str,
-                        file_or_path: FileOrPathDestination, /, **kwargs) -> None:
+                        file_or_path: FileOrPathDestination, /,
+                        get_meta_function: Optional[Callable[..., Awaitable[ResourceType]]] = None,
+                        **kwargs) -> None:
         n_retries = kwargs.get("n_retries")
 
         if n_retries is None:
@@ -881,11 +1399,48 @@ class YaDisk:
 
         kwargs["timeout"] = timeout
 
+        keep_alive = kwargs.pop("keep_alive", None)
+
+        if keep_alive is None:
+            keep_alive = settings.DEFAULT_TRANSFER_KEEP_ALIVE
+
+        session = self.get_transfer_session() if keep_alive else self.get_session()
+
+        stall_detector = _make_stall_detector(kwargs)
+        bandwidth_flow = _make_bandwidth_flow(kwargs, transfers.download_limiter)
+        progress = _make_progress_reporter(kwargs)
+        stats: Optional[TransferStats] = kwargs.pop("stats", None)
+
+        verify_checksum = kwargs.pop("verify_checksum", False)
+        md5 = kwargs.pop("md5", None)
+        sha256 = kwargs.pop("sha256", None)
+        hasher = None
+
+        if verify_checksum:
+            if md5 is None and sha256 is None:
+                if get_meta_function is None:
+                    raise ValueError("md5 or sha256 must be specified to verify the checksum")
+
+                meta_kwargs = dict(kwargs)
+                meta_kwargs["fields"] = ["md5", "sha256"]
+
+                meta = await get_meta_function(src_path, **meta_kwargs)
+                md5, sha256 = meta.md5, meta.sha256
+
+                if md5 is None and sha256 is None:
+                    raise InvalidResponseError("Response did not contain md5 or sha256 fields")
+
+            hasher = _ChunkHasher(md5=md5 is not None, sha256=sha256 is not None)
+
+        # The data is throttled first, so that the other observers see the actual rate
+        observers = _ChunkObservers(bandwidth_flow, hasher, stall_detector, progress, stats)
+
         file = None
         close_file = False
         file_position = 0
 
-        session = self.get_session()
+        if stats is not None:
+            stats._begin()
 
         try:
             if isinstance(file_or_path, (str, bytes)):
@@ -904,32 +1459,72 @@ class YaDisk:
                 temp_kwargs = dict(kwargs)
                 temp_kwargs["n_retries"] = n_retries_for_download_link
                 temp_kwargs["retry_interval"] = 0.0
+
+                if stats is not None:
+                    stats._begin_attempt()
+
                 link = await get_download_link_function(src_path, **temp_kwargs)
 
+                if stats is not None:
+                    stats._link_received(link)
+
                 # session.get() doesn't accept some of the passed parameters
                 _filter_kwargs_for_aiohttp(temp_kwargs)
 
                 # Disable keep-alive by default, since the download server is random
-                try:
-                    temp_kwargs["headers"].setdefault("Connection", "close")
-                except KeyError:
-                    temp_kwargs["headers"] = {"Connection": "close"}
+                if not keep_alive:
+                    try:
+                        temp_kwargs["headers"].setdefault("Connection", "close")
+                    except KeyError:
+                        temp_kwargs["headers"] = {"Connection": "close"}
 
                 if await _is_file_seekable(file):
                     await _file_seek(file, file_position)
 
-                async with session.get(link, **temp_kwargs) as response:
-                    async for chunk in response.content.iter_chunked(8192):
-                        if is_async_func(file.write):
-                            await file.write(chunk)
-                        else:
-                            file.write(chunk)
+                if hasher is not None:
+                    hasher.reset()
+
+                if stall_detector is not None:
+                    stall_detector.reset()
+
+                if progress is not None:
+                    progress.start_attempt()
+
+                async def receive() -> None:
+                    async with session.get(link, **temp_kwargs) as response:
+                        if stats is not None:
+                            stats._response_received()
+
+                        if progress is not None:
+                            progress.set_total(response.content_length)
+
+                        async for chunk in response.content.iter_chunked(8192):
+                            await observers.on_chunk(chunk)
+
+                            if is_async_func(file.write):
+                                await file.write(chunk)
+                            else:
+                                file.write(chunk)
 
-                    if response.status != 200:
-                        raise await get_exception(response)
+                        if response.status != 200:
+                            raise await get_exception(response)
 
-            return await auto_retry(attempt, n_retries, retry_interval)
+                if stall_detector is not None:
+                    await stall_detector.run(receive())
+                else:
+                    await receive()
+
+                if hasher is not None:
+                    await hasher.verify(md5=md5, sha256=sha256)
+
+            await auto_retry(attempt, n_retries, retry_interval)
+
+            if progress is not None:
+                await progress.finish()
         finally:
+            if stats is not None:
+                stats._end()
+
             if close_file and file is not None:
                 await file.close()
 
@@ -941,6 +1536,26 @@ class YaDisk:
 
             :param src_path: source path
             :param path_or_file: destination path or file-like object
+            :param if_changed: `bool`, do not download the file if the destination file already exists
+                               and has the same size and MD5 hash (`path_or_file` must be a path)
+            :param verify_checksum: `bool`, hash the data while it's being received and
+                                    compare it with the hashes of the source file.
+                                    On mismatch the download is retried.
+            :param md5: `str` or `None`, expected MD5 hash (for `verify_checksum`),
+                        requested from Yandex.Disk if neither `md5` nor `sha256` is specified
+            :param sha256: `str` or `None`, expected SHA256 hash (for `verify_checksum`)
+            :param stall_min_rate: `float` or `None`, minimum transfer rate in bytes per second,
+                                   see `settings.DEFAULT_STALL_MIN_RATE`
+            :param stall_window: `float` or `None`, number of seconds the transfer rate is measured over
+            :param progress: function or coroutine function that accepts :any:`TransferProgress`,
+                             called periodically while the data is being transferred
+            :param progress_interval: `float` or `None`, minimum number of seconds between `progress` calls
+            :param bandwidth_limiter: :any:`BandwidthLimiter` or `None`, limiter to draw from,
+                                      defaults to `transfers.download_limiter`
+            :param bandwidth_weight: `float`, share of the limited bandwidth relative to other transfers
+            :param stats: :any:`TransferStats` or `None`, filled in with the statistics of the transfer
+            :param keep_alive: `bool`, keep the connection to the download server alive
+                               for the following transfers (see :any:`YaDisk.get_transfer_session`)
             :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
             :param headers: `dict` or `None`, additional request headers
             :param n_retries: `int`, maximum number of retries
@@ -949,13 +1564,23 @@ class YaDisk:
             :raises PathNotFoundError: resource was not found on Disk
             :raises ForbiddenError: application doesn't have enough rights for this request
             :raises ResourceIsLockedError: resource is locked by another request
+            :raises ChecksumMismatchError: downloaded file is corrupted (only with `verify_checksum`)
+            :raises TransferStalledError: transfer rate was below `stall_min_rate` for `stall_window` seconds
 
             :returns: :any:`ResourceLinkObject`, link to the source resource
         """
 
         _apply_default_args(kwargs, self.default_args)
 
-        await self._download(self.get_download_link, src_path, path_or_file, **kwargs)
+        if kwargs.pop("if_changed", False):
+            if not isinstance(path_or_file, (str, bytes)):
+                raise ValueError("if_changed requires a path to the local file")
+
+            if await self._is_up_to_date(path_or_file, src_path, kwargs):
+                return ResourceLinkObject.from_path(src_path, yadisk=self)
+
+        await self._download(self.get_download_link, src_path, path_or_file,
+                             get_meta_function=self.get_meta, **kwargs)
         return ResourceLinkObject.from_path(src_path, yadisk=self)
 
     async def download_by_link(self,
@@ -966,10 +1591,30 @@ class YaDisk:
 
             :param link: download link
             :param file_or_path: destination path or file-like object
+            :param verify_checksum: `bool`, hash the data while it's being received and
+                                    compare it with `md5` and/or `sha256`.
+                                    On mismatch the download is retried.
+            :param md5: `str` or `None`, expected MD5 hash (for `verify_checksum`)
+            :param sha256: `str` or `None`, expected SHA256 hash (for `verify_checksum`)
+            :param stall_min_rate: `float` or `None`, minimum transfer rate in bytes per second,
+                                   see `settings.DEFAULT_STALL_MIN_RATE`
+            :param stall_window: `float` or `None`, number of seconds the transfer rate is measured over
+            :param progress: function or coroutine function that accepts :any:`TransferProgress`,
+                             called periodically while the data is being transferred
+            :param progress_interval: `float` or `None`, minimum number of seconds between `progress` calls
+            :param bandwidth_limiter: :any:`BandwidthLimiter` or `None`, limiter to draw from,
+                                      defaults to `transfers.download_limiter`
+            :param bandwidth_weight: `float`, share of the limited bandwidth relative to other transfers
+            :param stats: :any:`TransferStats` or `None`, filled in with the statistics of the transfer
+            :param keep_alive: `bool`, keep the connection to the download server alive
+                               for the following transfers (see :any:`YaDisk.get_transfer_session`)
             :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
             :param headers: `dict` or `None`, additional request headers
             :param n_retries: `int`, maximum number of retries
             :param retry_interval: delay between retries in seconds
+
+            :raises ChecksumMismatchError: downloaded file is corrupted (only with `verify_checksum`)
+            :raises TransferStalledError: transfer rate was below `stall_min_rate` for `stall_window` seconds
         """
 
         _apply_default_args(kwargs, self.default_args)
@@ -979,6 +1624,265 @@ class YaDisk:
 
         await self._download(get_link, "", file_or_path, **kwargs)
 
+    async def _download_stream(self,
+                               get_download_link_function: Callable[..., Awaitable[str]],
+                               src_path: str, /, **kwargs) -> AsyncGenerator[bytes, None]:
+        n_retries = kwargs.get("n_retries")
+
+        if n_retries is None:
+            n_retries = settings.DEFAULT_N_RETRIES
+
+        retry_interval = kwargs.get("retry_interval")
+
+        if retry_interval is None:
+            retry_interval = settings.DEFAULT_RETRY_INTERVAL
+
+        try:
+            timeout = kwargs["timeout"]
+        except KeyError:
+            timeout = settings.DEFAULT_TIMEOUT
+
+        kwargs["timeout"] = timeout
+
+        chunk_size = kwargs.pop("chunk_size", None)
+
+        if chunk_size is None:
+            chunk_size = settings.DEFAULT_DOWNLOAD_CHUNK_SIZE
+
+        keep_alive = kwargs.pop("keep_alive", None)
+
+        if keep_alive is None:
+            keep_alive = settings.DEFAULT_TRANSFER_KEEP_ALIVE
+
+        session = self.get_transfer_session() if keep_alive else self.get_session()
+
+        bandwidth_flow = _make_bandwidth_flow(kwargs, transfers.download_limiter)
+        progress = _make_progress_reporter(kwargs)
+        stats: Optional[TransferStats] = kwargs.pop("stats", None)
+        observers = _ChunkObservers(bandwidth_flow, progress, stats)
+
+        # Number of bytes that have already been passed to the caller.
+        # On retry the download continues from this position.
+        position = 0
+
+        if stats is not None:
+            stats._begin()
+
+        try:
+            for i in range(n_retries + 1):
+                try:
+                    temp_kwargs = dict(kwargs)
+                    temp_kwargs["n_retries"] = 0
+                    temp_kwargs["retry_interval"] = 0.0
+
+                    if stats is not None:
+                        stats._begin_attempt(position)
+
+                    link = await get_download_link_function(src_path, **temp_kwargs)
+
+                    if stats is not None:
+                        stats._link_received(link)
+
+                    # session.get() doesn't accept some of the passed parameters
+                    _filter_kwargs_for_aiohttp(temp_kwargs)
+
+                    headers = dict(temp_kwargs.get("headers") or {})
+
+                    # Disable keep-alive by default, since the download server is random
+                    if not keep_alive:
+                        headers.setdefault("Connection", "close")
+
+                    if position:
+                        headers["Range"] = "bytes=%d-" % (position,)
+
+                    temp_kwargs["headers"] = headers
+
+                    if progress is not None:
+                        progress.start_attempt(position)
+
+                    async with session.get(link, **temp_kwargs) as response:
+                        if stats is not None:
+                            stats._response_received()
+
+                        if response.status not in (200, 206):
+                            raise await get_exception(response)
+
+                        # The server might ignore the Range header and send the whole file
+                        to_skip = position if response.status == 200 else 0
+
+                        if progress is not None and response.content_length is not None:
+                            progress.set_total(response.content_length + position - to_skip)
+
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            if to_skip:
+                                if len(chunk) <= to_skip:
+                                    to_skip -= len(chunk)
+                                    continue
+
+                                chunk = chunk[to_skip:]
+                                to_skip = 0
+
+                            await observers.on_chunk(chunk)
+
+                            position += len(chunk)
+                            yield chunk
+
+                    if progress is not None:
+                        await progress.finish()
+
+                    return
+                except (aiohttp.ClientError, TimeoutError, RetriableYaDiskError) as e:
+                    if i == n_retries:
+                        raise e
+
+                if retry_interval:
+                    await asyncio.sleep(retry_interval)
+        finally:
+            if stats is not None:
+                stats._end()
+
+    async def download_stream(self, src_path: str, /, **kwargs) -> AsyncGenerator[bytes, None]:
+        """
+            Download the file as a stream of chunks, without a destination file.
+            If the connection is interrupted, the download is resumed from
+            the last received byte on retry.
+
+            :param src_path: source path
+            :param chunk_size: `int`, maximum size of each chunk
+            :param progress: function or coroutine function that accepts :any:`TransferProgress`,
+                             called periodically while the data is being transferred
+            :param progress_interval: `float` or `None`, minimum number of seconds between `progress` calls
+            :param bandwidth_limiter: :any:`BandwidthLimiter` or `None`, limiter to draw from,
+                                      defaults to `transfers.download_limiter`
+            :param bandwidth_weight: `float`, share of the limited bandwidth relative to other transfers
+            :param stats: :any:`TransferStats` or `None`, filled in with the statistics of the transfer
+            :param keep_alive: `bool`, keep the connection to the download server alive
+                               for the following transfers (see :any:`YaDisk.get_transfer_session`)
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries
+            :param retry_interval: delay between retries in seconds
+
+            :raises PathNotFoundError: resource was not found on Disk
+            :raises ForbiddenError: application doesn't have enough rights for this request
+            :raises ResourceIsLockedError: resource is locked by another request
+
+            :returns: async generator of `bytes`
+        """
+
+        _apply_default_args(kwargs, self.default_args)
+
+        async for chunk in self._download_stream(self.get_download_link, src_path, **kwargs):
+            yield chunk
+
+    async def download_stream_by_link(self, link: str, /, **kwargs) -> AsyncGenerator[bytes, None]:
+        """
+            Download the file from the link as a stream of chunks.
+
+            :param link: download link
+            :param chunk_size: `int`, maximum size of each chunk
+            :param progress: function or coroutine function that accepts :any:`TransferProgress`,
+                             called periodically while the data is being transferred
+            :param progress_interval: `float` or `None`, minimum number of seconds between `progress` calls
+            :param bandwidth_limiter: :any:`BandwidthLimiter` or `None`, limiter to draw from,
+                                      defaults to `transfers.download_limiter`
+            :param bandwidth_weight: `float`, share of the limited bandwidth relative to other transfers
+            :param stats: :any:`TransferStats` or `None`, filled in with the statistics of the transfer
+            :param keep_alive: `bool`, keep the connection to the download server alive
+                               for the following transfers (see :any:`YaDisk.get_transfer_session`)
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries
+            :param retry_interval: delay between retries in seconds
+
+            :returns: async generator of `bytes`
+        """
+
+        _apply_default_args(kwargs, self.default_args)
+
+        async def get_link(*args, **kwargs) -> str:
+            return link
+
+        async for chunk in self._download_stream(get_link, "", **kwargs):
+            yield chunk
+
+    async def download_many(self,
+                            jobs: Union[Iterable, AsyncIterable], /,
+                            max_concurrency: int = 8,
+                            max_bytes_in_flight: Optional[int] = None,
+                            prefetch: int = 16,
+                            **kwargs) -> List["JobResult"]:
+        """
+            Download many files concurrently, see :any:`DownloadManager` for details.
+            A failed download doesn't affect the rest of the jobs.
+
+            :param jobs: iterable or async iterable of :any:`TransferJob` or `(src_path, path_or_file)` tuples
+            :param max_concurrency: `int`, maximum number of simultaneous downloads
+            :param max_bytes_in_flight: `int` or `None`, maximum total size of the files
+                                        being downloaded at the same time
+            :param prefetch: `int`, maximum number of download links to be requested in advance
+            :param verify_checksum: `bool`, verify checksums of the downloaded files
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries
+            :param retry_interval: delay between retries in seconds
+
+            :returns: `list` of :any:`JobResult` in the order of completion
+        """
+
+        _apply_default_args(kwargs, self.default_args)
+
+        manager = DownloadManager(self,
+                                  max_concurrency=max_concurrency,
+                                  max_bytes_in_flight=max_bytes_in_flight,
+                                  prefetch=prefetch,
+                                  **kwargs)
+
+        return await manager.run(jobs)
+
+    async def download_dir(self,
+                           src_path: str,
+                           dst_path: Union[str, bytes], /,
+                           max_concurrency: int = 8,
+                           max_listing_concurrency: int = 4,
+                           skip_unchanged: bool = True,
+                           **kwargs) -> List["JobResult"]:
+        """
+            Download a directory recursively.
+            Subdirectories are listed in parallel with the file transfers,
+            local directories are created as they are discovered.
+
+            :param src_path: path to the source directory
+            :param dst_path: path to the local destination directory
+            :param max_concurrency: `int`, maximum number of simultaneous downloads
+            :param max_listing_concurrency: `int`, maximum number of directories being listed at the same time
+            :param skip_unchanged: `bool`, do not download files that already exist locally
+                                   and have the same size and MD5 hash
+            :param max_bytes_in_flight: `int` or `None`, maximum total size of the files
+                                        being downloaded at the same time
+            :param verify_checksum: `bool`, verify checksums of the downloaded files
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries
+            :param retry_interval: delay between retries in seconds
+
+            :raises PathNotFoundError: resource was not found on Disk
+            :raises ForbiddenError: application doesn't have enough rights for this request
+            :raises WrongResourceTypeError: resource is not a directory
+
+            :returns: `list` of :any:`JobResult` for the downloaded files, in the order of completion
+        """
+
+        _apply_default_args(kwargs, self.default_args)
+
+        jobs = _walk_remote_dir(self, src_path, dst_path,
+                                max_listing_concurrency, skip_unchanged, kwargs)
+
+        try:
+            return await self.download_many(jobs, max_concurrency=max_concurrency, **kwargs)
+        finally:
+            await jobs.aclose()
+
     async def remove(self, path: str, /, **kwargs) -> Optional["OperationLinkObject"]:
         """
             Remove the resource.
@@ -1039,6 +1943,7 @@ class YaDisk:
     async def check_token(self, token: Optional[str] = None, /, **kwargs) -> bool:
         """
             Check whether the token is valid.
+            If :any:`YaDisk.token_cache` is set, the result is cached.
 
             :param token: token to check, equivalent to `self.token` if `None`
             :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
@@ -1051,6 +1956,15 @@ class YaDisk:
 
         _apply_default_args(kwargs, self.default_args)
 
+        if self.token_cache is None:
+            return await self._check_token(token, **kwargs)
+
+        if token is None:
+            token = self.token
+
+        return await self.token_cache._lookup(token, lambda: self._check_token(token, **kwargs))
+
+    async def _check_token(self, token: Optional[str], **kwargs) -> bool:
         # Any ID will do, doesn't matter whether it exists or not
         fake_operation_id = "0000"
 
@@ -1249,6 +2163,222 @@ class YaDisk:
 
         return await self.move(src_path, dst_path, **kwargs)
 
+    async def _run_many(self,
+                        items: Iterable,
+                        func: Callable[..., Awaitable[Any]],
+                        max_concurrency: int,
+                        max_requests_per_second: Optional[float],
+                        kwargs: Dict[str, Any],
+                        check_before: Optional[Callable[..., Awaitable[Any]]],
+                        check_after: Callable[..., Awaitable[bool]]) -> List[OperationResult]:
+        _apply_default_args(kwargs, self.default_args)
+
+        n_retries = kwargs.pop("n_retries", None)
+        retry_interval = kwargs.pop("retry_interval", None)
+
+        # The checks of the possibly applied items are retried as usual
+        check_kwargs = _request_kwargs(kwargs)
+
+        # Retries are done per item, with backoff, instead of per request
+        kwargs["n_retries"] = 0
+        kwargs["retry_interval"] = 0.0
+
+        if isinstance(items, dict):
+            items = items.items()
+
+        async def call(item: Any) -> Any:
+            if isinstance(item, str):
+                return await func(item, **kwargs)
+
+            return await func(*item, **kwargs)
+
+        def unpack(item: Any) -> Tuple:
+            return (item,) if isinstance(item, str) else tuple(item)
+
+        async def before(item: Any) -> Any:
+            assert check_before is not None
+
+            return await check_before(*unpack(item), **check_kwargs)
+
+        async def after(item: Any, state: Any) -> bool:
+            return await check_after(state, *unpack(item), **check_kwargs)
+
+        return await _run_operations(self, items, call,
+                                     max_concurrency, max_requests_per_second,
+                                     n_retries, retry_interval,
+                                     before if check_before is not None else None, after)
+
+    async def _get_resource_id(self, path: str, /, **kwargs) -> Optional[str]:
+        # Returns None if the resource doesn't exist
+        try:
+            meta = await self.get_meta(path, fields=["resource_id"], **kwargs)
+        except PathNotFoundError:
+            return None
+
+        return meta.resource_id
+
+    async def copy_many(self,
+                        pairs: Union[Iterable[Tuple[str, str]], Dict[str, str]], /,
+                        max_concurrency: int = 8,
+                        max_requests_per_second: Optional[float] = None,
+                        **kwargs) -> List[OperationResult]:
+        """
+            Copy many resources concurrently.
+            Asynchronous operations are tracked by :any:`YaDisk.operation_tracker`
+            until they finish. Failed items don't affect the other ones,
+            transient failures are retried with exponential backoff.
+            If a retry finds the item already done (e.g., the response to the previous
+            attempt was lost), the item is reported as successful if the destination
+            has changed since before the first attempt. Looking it up takes one extra
+            request per item, unless `n_retries` is 0.
+
+            :param pairs: iterable of `(src_path, dst_path)` tuples or a `dict`
+            :param max_concurrency: `int`, maximum number of items processed at the same time,
+                                    including the ones waiting for their operation to finish
+            :param max_requests_per_second: `float` or `None`, maximum rate at which the requests are started,
+                                            `None` means no limit
+            :param overwrite: if `True` the destination path can be overwritten,
+                              otherwise, an error will be raised
+            :param force_async: forces the operation to be executed asynchronously
+            :param fields: list of keys to be included in the response
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries of each item
+            :param retry_interval: delay before the first retry in seconds, doubled after each retry
+
+            :returns: `list` of :any:`OperationResult`, in the same order as `pairs`
+        """
+
+        async def get_dst_id(src_path: str, dst_path: str, **kwargs) -> Optional[str]:
+            return await self._get_resource_id(dst_path, **kwargs)
+
+        async def copied(old_dst_id: Optional[str], src_path: str, dst_path: str, **kwargs) -> bool:
+            # The copy is a new resource, an existing destination is kept with overwrite=False
+            dst_id = await self._get_resource_id(dst_path, **kwargs)
+
+            return dst_id is not None and dst_id != old_dst_id
+
+        return await self._run_many(pairs, self.copy,
+                                    max_concurrency, max_requests_per_second, kwargs,
+                                    get_dst_id, copied)
+
+    async def move_many(self,
+                        pairs: Union[Iterable[Tuple[str, str]], Dict[str, str]], /,
+                        max_concurrency: int = 8,
+                        max_requests_per_second: Optional[float] = None,
+                        **kwargs) -> List[OperationResult]:
+        """
+            Move many resources concurrently.
+            Asynchronous operations are tracked by :any:`YaDisk.operation_tracker`
+            until they finish. Failed items don't affect the other ones,
+            transient failures are retried with exponential backoff.
+            If a retry finds the item already done (e.g., the response to the previous
+            attempt was lost), the item is reported as successful if the destination
+            has changed since before the first attempt. Looking it up takes one extra
+            request per item, unless `n_retries` is 0.
+
+            :param pairs: iterable of `(src_path, dst_path)` tuples or a `dict`
+            :param max_concurrency: `int`, maximum number of items processed at the same time,
+                                    including the ones waiting for their operation to finish
+            :param max_requests_per_second: `float` or `None`, maximum rate at which the requests are started,
+                                            `None` means no limit
+            :param overwrite: `bool`, determines whether to overwrite the destination
+            :param force_async: forces the operation to be executed asynchronously
+            :param fields: list of keys to be included in the response
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries of each item
+            :param retry_interval: delay before the first retry in seconds, doubled after each retry
+
+            :returns: `list` of :any:`OperationResult`, in the same order as `pairs`
+        """
+
+        async def get_dst_id(src_path: str, dst_path: str, **kwargs) -> Optional[str]:
+            return await self._get_resource_id(dst_path, **kwargs)
+
+        async def moved(old_dst_id: Optional[str], src_path: str, dst_path: str, **kwargs) -> bool:
+            if await self.exists(src_path, **kwargs):
+                return False
+
+            dst_id = await self._get_resource_id(dst_path, **kwargs)
+
+            return dst_id is not None and dst_id != old_dst_id
+
+        return await self._run_many(pairs, self.move,
+                                    max_concurrency, max_requests_per_second, kwargs,
+                                    get_dst_id, moved)
+
+    async def remove_many(self,
+                          paths: Iterable[str], /,
+                          max_concurrency: int = 8,
+                          max_requests_per_second: Optional[float] = None,
+                          **kwargs) -> List[OperationResult]:
+        """
+            Remove many resources concurrently.
+            Asynchronous operations are tracked by :any:`YaDisk.operation_tracker`
+            until they finish. Failed items don't affect the other ones,
+            transient failures are retried with exponential backoff.
+            If a retry finds the item already done (e.g., the response to the previous
+            attempt was lost), the item is checked and reported as successful.
+
+            :param paths: iterable of paths to be removed
+            :param max_concurrency: `int`, maximum number of items processed at the same time,
+                                    including the ones waiting for their operation to finish
+            :param max_requests_per_second: `float` or `None`, maximum rate at which the requests are started,
+                                            `None` means no limit
+            :param permanently: `bool`, if `True`, the resources will be removed permanently,
+                                otherwise, they will be just moved to the trash
+            :param force_async: forces the operation to be executed asynchronously
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries of each item
+            :param retry_interval: delay before the first retry in seconds, doubled after each retry
+
+            :returns: `list` of :any:`OperationResult`, in the same order as `paths`
+        """
+
+        async def removed(state: None, path: str, **kwargs) -> bool:
+            return not await self.exists(path, **kwargs)
+
+        return await self._run_many(paths, self.remove,
+                                    max_concurrency, max_requests_per_second, kwargs,
+                                    None, removed)
+
+    async def batch(self,
+                    aws: Iterable[Union[Awaitable, Callable[[], Awaitable]]], /,
+                    max_concurrency: int = 8,
+                    fail_fast: bool = False,
+                    timeout: Optional[float] = None) -> List[OperationResult]:
+        """
+            Run many awaitables (e.g., coroutines of `YaDisk` methods) concurrently
+            and collect their results. Unlike :any:`asyncio.gather`, a failed item
+            doesn't affect the rest of them, unless `fail_fast` is `True`.
+            Errors of the items (:any:`YaDiskError`, :any:`aiohttp.ClientError`
+            and timeouts) are reported in the results, other exceptions are propagated
+            after cancelling the rest of the items.
+
+            .. code:: python
+
+                results = await y.batch(y.get_meta(path) for path in paths)
+
+            :param aws: iterable of awaitables or functions that return awaitables,
+                        it's consumed lazily, as the items are started
+            :param max_concurrency: `int`, maximum number of items running at the same time
+            :param fail_fast: `bool`, if `True`, the first failed item cancels the rest of them,
+                              their results will have :any:`asyncio.CancelledError` as the exception
+            :param timeout: `float` or `None`, maximum number of seconds each item may take,
+                            `None` means no limit
+
+            :raises ValueError: `max_concurrency` is less than 1
+
+            :returns: `list` of :any:`OperationResult`, in the same order as `aws`
+        """
+
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        return await _run_batch(aws, max_concurrency, fail_fast, timeout)
+
     async def remove_trash(self, path: str, /, **kwargs) -> Optional["OperationLinkObject"]:
         """
             Remove a trash resource.
@@ -1787,6 +2917,24 @@ class YaDisk:
             :param public_key: public key or public URL of the resource
             :param file_or_path: destination path or file-like object
             :param path: relative path to the resource within the public folder
+            :param verify_checksum: `bool`, hash the data while it's being received and
+                                    compare it with the hashes of the source file.
+                                    On mismatch the download is retried.
+            :param md5: `str` or `None`, expected MD5 hash (for `verify_checksum`),
+                        requested from Yandex.Disk if neither `md5` nor `sha256` is specified
+            :param sha256: `str` or `None`, expected SHA256 hash (for `verify_checksum`)
+            :param stall_min_rate: `float` or `None`, minimum transfer rate in bytes per second,
+                                   see `settings.DEFAULT_STALL_MIN_RATE`
+            :param stall_window: `float` or `None`, number of seconds the transfer rate is measured over
+            :param progress: function or coroutine function that accepts :any:`TransferProgress`,
+                             called periodically while the data is being transferred
+            :param progress_interval: `float` or `None`, minimum number of seconds between `progress` calls
+            :param bandwidth_limiter: :any:`BandwidthLimiter` or `None`, limiter to draw from,
+                                      defaults to `transfers.download_limiter`
+            :param bandwidth_weight: `float`, share of the limited bandwidth relative to other transfers
+            :param stats: :any:`TransferStats` or `None`, filled in with the statistics of the transfer
+            :param keep_alive: `bool`, keep the connection to the download server alive
+                               for the following transfers (see :any:`YaDisk.get_transfer_session`)
             :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
             :param headers: `dict` or `None`, additional request headers
             :param n_retries: `int`, maximum number of retries
@@ -1795,6 +2943,8 @@ class YaDisk:
             :raises PathNotFoundError: resource was not found on Disk
             :raises ForbiddenError: application doesn't have enough rights for this request
             :raises ResourceIsLockedError: resource is locked by another request
+            :raises ChecksumMismatchError: downloaded file is corrupted (only with `verify_checksum`)
+            :raises TransferStalledError: transfer rate was below `stall_min_rate` for `stall_window` seconds
 
             :returns: :any:`PublicResourceLinkObject`
         """
@@ -1803,9 +2953,48 @@ class YaDisk:
 
         await self._download(
             lambda *args, **kwargs: self.get_public_download_link(public_key, **kwargs),
-            "", file_or_path, **kwargs)
+            "", file_or_path,
+            get_meta_function=lambda *args, **kwargs: self.get_public_meta(public_key, **kwargs),
+            **kwargs)
         return PublicResourceLinkObject.from_public_key(public_key, yadisk=self)
 
+    async def download_public_stream(self, public_key: str, /, **kwargs) -> AsyncGenerator[bytes, None]:
+        """
+            Download the public resource as a stream of chunks.
+            If the connection is interrupted, the download is resumed from
+            the last received byte on retry.
+
+            :param public_key: public key or public URL of the resource
+            :param path: relative path to the resource within the public folder
+            :param chunk_size: `int`, maximum size of each chunk
+            :param progress: function or coroutine function that accepts :any:`TransferProgress`,
+                             called periodically while the data is being transferred
+            :param progress_interval: `float` or `None`, minimum number of seconds between `progress` calls
+            :param bandwidth_limiter: :any:`BandwidthLimiter` or `None`, limiter to draw from,
+                                      defaults to `transfers.download_limiter`
+            :param bandwidth_weight: `float`, share of the limited bandwidth relative to other transfers
+            :param stats: :any:`TransferStats` or `None`, filled in with the statistics of the transfer
+            :param keep_alive: `bool`, keep the connection to the download server alive
+                               for the following transfers (see :any:`YaDisk.get_transfer_session`)
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries
+            :param retry_interval: delay between retries in seconds
+
+            :raises PathNotFoundError: resource was not found on Disk
+            :raises ForbiddenError: application doesn't have enough rights for this request
+            :raises ResourceIsLockedError: resource is locked by another request
+
+            :returns: async generator of `bytes`
+        """
+
+        _apply_default_args(kwargs, self.default_args)
+
+        async for chunk in self._download_stream(
+                lambda *args, **kwargs: self.get_public_download_link(public_key, **kwargs),
+                "", **kwargs):
+            yield chunk
+
     async def get_operation_status(self, operation_id, **kwargs):
         """
             Get operation status.
@@ -1826,6 +3015,78 @@ class YaDisk:
 
         return await self._get_operation_status(self.get_session(), operation_id, **kwargs)
 
+    async def wait_for_operation(self,
+                                 operation_id: str, /,
+                                 deadline: Optional[float] = None,
+                                 poll_interval: Optional[float] = None,
+                                 max_poll_interval: Optional[float] = None,
+                                 poll_backoff: float = 1.5,
+                                 estimated_duration: Optional[float] = None,
+                                 **kwargs) -> str:
+        """
+            Wait until an asynchronous operation finishes.
+            The status is polled with growing delays: the first one is `poll_interval`,
+            then it's multiplied by `poll_backoff` until it reaches `max_poll_interval`.
+
+            :param operation_id: ID of the operation or a link
+            :param deadline: `float` or `None`, maximum number of seconds to wait, `None` means no limit
+            :param poll_interval: `float` or `None`, initial delay between polls in seconds,
+                                  defaults to `settings.DEFAULT_OPERATION_POLL_INTERVAL`
+            :param max_poll_interval: `float` or `None`, maximum delay between polls in seconds,
+                                      defaults to `settings.DEFAULT_OPERATION_MAX_POLL_INTERVAL`
+            :param poll_backoff: `float`, factor the delay is multiplied by after each poll
+            :param estimated_duration: `float` or `None`, expected duration of the operation in seconds.
+                                       If specified, the first poll is delayed until then.
+            :param timeout: `float` or :any:`aiohttp.ClientTimeout`, request timeout
+            :param headers: `dict` or `None`, additional request headers
+            :param n_retries: `int`, maximum number of retries
+            :param retry_interval: delay between retries in seconds
+
+            :raises OperationNotFoundError: requested operation was not found
+            :raises OperationFailedError: operation has failed
+            :raises OperationTimeoutError: operation didn't finish before the deadline
+
+            :returns: `str`, final status of the operation (`"success"`)
+        """
+
+        _apply_default_args(kwargs, self.default_args)
+
+        if poll_interval is None:
+            poll_interval = settings.DEFAULT_OPERATION_POLL_INTERVAL
+
+        if max_poll_interval is None:
+            max_poll_interval = settings.DEFAULT_OPERATION_MAX_POLL_INTERVAL
+
+        schedule = _PollSchedule(poll_interval, max_poll_interval, poll_backoff, estimated_duration)
+
+        loop = asyncio.get_running_loop()
+        end_time = None if deadline is None else loop.time() + deadline
+
+        # Operations are rarely done immediately, so the first poll is delayed too
+        delay = schedule.next_delay()
+
+        while True:
+            if end_time is not None:
+                remaining = end_time - loop.time()
+
+                if remaining <= 0:
+                    raise OperationTimeoutError(
+                        operation_id, f"Operation didn't finish in {deadline} seconds")
+
+                delay = min(delay, remaining)
+
+            await asyncio.sleep(delay)
+
+            status = await self._get_operation_status(self.get_session(), operation_id, **kwargs)
+
+            if status == "success":
+                return status
+
+            if status == "failed":
+                raise OperationFailedError(operation_id, "Operation has failed")
+
+            delay = schedule.next_delay()
+
     async def _get_operation_status(self, session: SessionWithHeaders, operation_id: str, **kwargs) -> str:
         request = GetOperationStatusRequest(session, operation_id, **kwargs)
         await request.send()